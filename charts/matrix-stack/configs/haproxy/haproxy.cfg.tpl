@@ -1,6 +1,6 @@
 {{- /*
 Copyright 2024-2025 New Vector Ltd
-Copyright 2025 Element Creations Ltd
+Copyright 2025-2026 Element Creations Ltd
 
 SPDX-License-Identifier: AGPL-3.0-only
 */ -}}
@@ -18,6 +18,12 @@ global
   # Allow HAProxy Stats sockets
   stats socket ipv4@127.0.0.1:1999 level admin
 
+{{- with (include "element-io.ess-library.sizing.profile" (dict "root" $root) | fromJson) }}
+
+  # The maximum number of concurrent connections, sized by sizing.profile
+  maxconn {{ .haproxy.maxConnections }}
+{{- end }}
+
 defaults
   mode http
 
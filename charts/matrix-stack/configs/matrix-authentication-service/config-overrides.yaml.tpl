@@ -1,6 +1,6 @@
 {{- /*
 Copyright 2025 New Vector Ltd
-Copyright 2025 Element Creations Ltd
+Copyright 2025-2026 Element Creations Ltd
 
 SPDX-License-Identifier: AGPL-3.0-only
 */ -}}
@@ -56,7 +56,11 @@ https://github.com/kubernetes/kubernetes/issues/129043 / https://github.com/kube
   uri: "postgresql://{{ .user }}:${POSTGRES_PASSWORD}@{{ tpl .host $root }}:{{ .port }}/{{ .database }}?{{ with .sslMode }}sslmode={{ . }}&{{ end }}application_name=matrix-authentication-service"
 {{- end }}
 {{- else if $root.Values.postgres.enabled }}
-  uri: "postgresql://matrixauthenticationservice_user:${POSTGRES_PASSWORD}@{{ $root.Release.Name }}-postgres.{{ $root.Release.Namespace }}.svc.{{ $root.Values.clusterDomain }}:5432/matrixauthenticationservice?sslmode=prefer&application_name=matrix-authentication-service"
+  uri: "postgresql://matrixauthenticationservice_user:${POSTGRES_PASSWORD}@{{ include "element-io.ess-library.chart-postgres-host" (dict "root" $root "context" (dict "isHook" .isHook)) }}:{{ include "element-io.ess-library.chart-postgres-port" (dict "root" $root "context" (dict "isHook" .isHook)) }}/matrixauthenticationservice?sslmode=prefer&application_name=matrix-authentication-service"
+{{- if and (not .isHook) (include "element-io.pgbouncer.enabled" (dict "root" $root)) }}
+{{- /* Every replica's connections together must fit in its PgBouncer pool */}}
+  max_connections: {{ include "element-io.pgbouncer.connectionsPerPod" (dict "root" $root "context" "matrixAuthenticationService") }}
+{{- end }}
 {{ end }}
 
 telemetry:
@@ -0,0 +1,15 @@
+{{- /*
+Copyright 2026 Element Creations Ltd
+
+SPDX-License-Identifier: AGPL-3.0-only
+*/ -}}
+
+{{- $root := .root -}}
+{{- with required "pgbouncer/pg_hba.conf.tpl missing context" .context -}}
+# The metrics exporter reads the admin console over the Pod local socket
+local pgbouncer pgbouncer_exporter trust
+{{- range $essPassword := include "element-io.pgbouncer.essPasswords" (dict "root" $root) | fromJsonArray }}
+host {{ $essPassword | lower }} {{ $essPassword | lower }}_user 0.0.0.0/0 scram-sha-256
+host {{ $essPassword | lower }} {{ $essPassword | lower }}_user ::/0 scram-sha-256
+{{- end }}
+{{- end -}}
@@ -0,0 +1,40 @@
+{{- /*
+Copyright 2026 Element Creations Ltd
+
+SPDX-License-Identifier: AGPL-3.0-only
+*/ -}}
+
+{{- $root := .root -}}
+{{- with required "pgbouncer/pgbouncer.ini.tpl missing context" .context -}}
+{{- $pgbouncer := . -}}
+[databases]
+{{- range $essPassword := include "element-io.pgbouncer.essPasswords" (dict "root" $root) | fromJsonArray }}
+{{- /* Matrix Authentication Service's migrations take session level advisory locks, which transaction pooling would break */}}
+{{ $essPassword | lower }} = host={{ $root.Release.Name }}-postgres.{{ $root.Release.Namespace }}.svc.{{ $root.Values.clusterDomain }} port=5432 dbname={{ $essPassword | lower }} pool_size={{ include "element-io.pgbouncer.poolSize" (dict "root" $root "context" $essPassword) }} pool_mode={{ eq $essPassword "synapse" | ternary $pgbouncer.poolMode "session" }}
+{{- end }}
+
+[pgbouncer]
+{{- if eq $root.Values.networking.ipFamily "ipv4" }}
+listen_addr = 0.0.0.0
+{{- else if eq $root.Values.networking.ipFamily "ipv6" }}
+listen_addr = ::
+{{- else }}
+listen_addr = 0.0.0.0,::
+{{- end }}
+listen_port = 6432
+unix_socket_dir = /var/run/pgbouncer
+
+auth_type = hba
+auth_hba_file = /config/pg_hba.conf
+auth_file = /auth/userlist.txt
+stats_users = pgbouncer_exporter
+
+pool_mode = {{ .poolMode }}
+max_client_conn = {{ .maxClientConnections }}
+# Sent by Matrix Authentication Service on connecting
+ignore_startup_parameters = extra_float_digits
+server_tls_sslmode = prefer
+
+# The stats are available from the metrics rather than the logs
+log_stats = 0
+{{- end -}}
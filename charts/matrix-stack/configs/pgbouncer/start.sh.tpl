@@ -0,0 +1,19 @@
+{{- /*
+Copyright 2026 Element Creations Ltd
+
+SPDX-License-Identifier: AGPL-3.0-only
+*/ -}}
+
+{{- $root := .root -}}
+{{- with required "pgbouncer/start.sh.tpl missing context" .context -}}
+#!/bin/sh
+set -e;
+umask 077;
+# PgBouncer logs into Postgres with the same credentials that the clients log into it with.
+# Any double quotes in the passwords are escaped by doubling them
+echo '"pgbouncer_exporter" ""' > /auth/userlist.txt;
+{{- range $essPassword := include "element-io.pgbouncer.essPasswords" (dict "root" $root) | fromJsonArray }}
+printf '"%s" "%s"\n' "{{ $essPassword | lower }}_user" "$(sed 's/"/""/g' /secrets/{{ include "element-io.pgbouncer.secret-path" (dict "root" $root "context" $essPassword) }})" >> /auth/userlist.txt;
+{{- end }}
+exec pgbouncer /config/pgbouncer.ini
+{{- end -}}
@@ -1,6 +1,6 @@
 {{- /*
 Copyright 2024-2025 New Vector Ltd
-Copyright 2025 Element Creations Ltd
+Copyright 2025-2026 Element Creations Ltd
 
 SPDX-License-Identifier: AGPL-3.0-only
 */ -}}
@@ -78,7 +78,11 @@ frontend synapse-http-in
   acl has_get_map path -m reg -M -f /synapse/path_map_file_get
 
   http-request set-var(req.backend) path,map_reg(/synapse/path_map_file_get,main) if has_get_map METH_GET
-  http-request set-var(req.backend) path,map_reg(/synapse/path_map_file,main) unless { var(req.backend) -m found }
+  # The routing table is compiled into exact and prefix maps, which are tree lookups rather than evaluating every
+  # regex in turn. Only the routes that can't be expressed that way are left in the regex map
+  http-request set-var(req.backend) path,map_str(/synapse/path_map_file_exact) unless { var(req.backend) -m found }
+  http-request set-var(req.backend) path,map_beg(/synapse/path_map_file_prefix) unless { var(req.backend) -m found }
+  http-request set-var(req.backend) path,map_reg(/synapse/path_map_file_regex,main) unless { var(req.backend) -m found }
 {{- if dig "initial-synchrotron" "enabled" false .workers }}
 
   acl has_available_initial_syncs nbsrv('synapse-initial-synchrotron') ge 1
@@ -237,10 +241,10 @@ backend synapse-{{ $workerType }}
   timeout queue 5s
 
 {{- end }}
-{{- $maxInstances := ternary 20 1 (hasKey $workerDetails "replicas") }}
+{{- $serverSlots := include "element-io.synapse.haproxy.serverSlots" (dict "root" $root "context" $workerType) }}
 {{- $workerTypeName := include "element-io.synapse.process.workerTypeName" (dict "root" $root "context" $workerType) }}
   # Use DNS SRV service discovery on the headless service
-  server-template {{ $workerTypeName }} {{ $maxInstances }} _synapse-http._tcp.{{ $root.Release.Name }}-synapse-{{ $workerTypeName }}.{{ $root.Release.Namespace }}.svc.{{ $root.Values.clusterDomain }} resolvers kubedns init-addr none check
+  server-template {{ $workerTypeName }} {{ $serverSlots }} _synapse-http._tcp.{{ $root.Release.Name }}-synapse-{{ $workerTypeName }}.{{ $root.Release.Namespace }}.svc.{{ $root.Values.clusterDomain }} resolvers kubedns init-addr none check
 {{- end }}
 {{- end }}
 
@@ -1,22 +1,24 @@
 {{- /*
 Copyright 2025 New Vector Ltd
-Copyright 2025 Element Creations Ltd
+Copyright 2025-2026 Element Creations Ltd
 
 SPDX-License-Identifier: AGPL-3.0-only
 */ -}}
 
 {{- $root := .root -}}
-
+{{- $map := .map -}}
+{{- $pathMaps := (include "element-io.synapse.haproxy.pathMaps" (dict "root" $root)) | fromJson }}
+{{- if eq $map "exact" }}
 # A map file that is used in haproxy config to map from matrix paths to the
-# named backend. The format is: path_regexp backend_name
-
-{{ $enabledWorkerTypes := keys ((include "element-io.synapse.enabledWorkers" (dict "root" $root)) | fromJson) }}
-{{- range $workerType := $enabledWorkerTypes | sortAlpha }}
-{{- $workersPaths := (include "element-io.synapse.process.workerPaths" (dict "root" $root "context" $workerType)) | fromJsonArray }}
-{{- if len $workersPaths }}
-# {{ $workerType }}
-{{- range $path := $workersPaths }}
-{{ $path }} {{ $workerType }}
-{{- end }}
+# named backend. The format is: path backend_name
+{{- else if eq $map "prefix" }}
+# A map file that is used in haproxy config to map from matrix path prefixes to the
+# named backend. The format is: path_prefix backend_name
+{{- else }}
+# A map file that is used in haproxy config to map from matrix paths to the
+# named backend, for the routes that can't be looked up by exact path or prefix.
+# The format is: path_regexp backend_name
 {{- end }}
+{{ range $pathMap := index $pathMaps $map }}
+{{ index $pathMap 0 }} {{ index $pathMap 1 }}
 {{- end }}
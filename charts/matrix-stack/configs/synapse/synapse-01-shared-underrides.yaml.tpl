@@ -1,6 +1,6 @@
 {{- /*
 Copyright 2025 New Vector Ltd
-Copyright 2025 Element Creations Ltd
+Copyright 2025-2026 Element Creations Ltd
 
 SPDX-License-Identifier: AGPL-3.0-only
 */ -}}
@@ -15,6 +15,17 @@ federation_client_minimum_tls_version: '1.2'
 experimental_features:
   msc4028_push_encrypted_events: true
 
+{{- with (include "element-io.ess-library.sizing.profile" (dict "root" $root) | fromJson) }}
+
+caches:
+  global_factor: {{ .synapse.cachesGlobalFactor }}
+
+database:
+  args:
+    cp_min: {{ min 5 .synapse.databaseMaxConnections }}
+    cp_max: {{ .synapse.databaseMaxConnections }}
+{{- end }}
+
 {{- if $root.Values.matrixRTC.enabled }}
 # The maximum allowed duration by which sent events can be delayed, as
 # per MSC4140.
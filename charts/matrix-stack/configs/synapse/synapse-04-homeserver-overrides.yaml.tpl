@@ -56,9 +56,15 @@ https://github.com/kubernetes/kubernetes/issues/129043 / https://github.com/kube
     user: "synapse_user"
     password: ${SYNAPSE_POSTGRES_PASSWORD}
     database: "synapse"
-    host: "{{ $root.Release.Name }}-postgres.{{ $root.Release.Namespace }}.svc.{{ $root.Values.clusterDomain }}"
-    port: 5432
+    host: "{{ include "element-io.ess-library.chart-postgres-host" (dict "root" $root "context" (dict "isHook" $isHook)) }}"
+    port: {{ include "element-io.ess-library.chart-postgres-port" (dict "root" $root "context" (dict "isHook" $isHook)) }}
     sslmode: prefer
+{{- if and (not $isHook) (include "element-io.pgbouncer.enabled" (dict "root" $root)) }}
+{{- /* Every Synapse process' connections together must fit in its PgBouncer pool */}}
+{{- $cpMax := include "element-io.pgbouncer.connectionsPerPod" (dict "root" $root "context" "synapse") | int }}
+    cp_min: {{ min 5 $cpMax }}
+    cp_max: {{ $cpMax }}
+{{- end }}
 {{ end }}
 
     application_name: ${APPLICATION_NAME}
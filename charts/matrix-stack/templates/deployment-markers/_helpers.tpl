@@ -1,6 +1,6 @@
 {{- /*
 Copyright 2025 New Vector Ltd
-Copyright 2025 Element Creations Ltd
+Copyright 2025-2026 Element Creations Ltd
 
 SPDX-License-Identifier: AGPL-3.0-only
 */ -}}
@@ -76,6 +76,14 @@ app.kubernetes.io/version: {{ include "element-io.ess-library.labels.makeSafe" $
            (not $root.Values.matrixAuthenticationService.syn2mas.enabled) }}
 - {{ (printf "%s-markers" $root.Release.Name) }}:MATRIX_STACK_MSC3861:delegated_auth:delegated_auth;syn2mas_migrated
 {{- end }}
+
+{{- /* Once an upgrade has succeeded the Synapse config has passed the check-config hook. We record what was checked
+   * so that the hook can be skipped on the next upgrade if nothing it would check has changed.
+  **/}}
+{{- if and (eq .step "post") $root.Values.synapse.enabled $root.Values.synapse.checkConfigHook.enabled }}
+{{- /* Quoted as any previous value is allowed, so the trailing : would otherwise make this a map */}}
+- {{ printf "%s-markers:SYNAPSE_CHECKED_CONFIG_HASH:%s:" $root.Release.Name (include "element-io.synapse-check-config.configHash" (dict "root" $root)) | quote }}
+{{- end }}
 {{- end }}
 
 {{- define "element-io.deployment-markers.overrideEnv" }}
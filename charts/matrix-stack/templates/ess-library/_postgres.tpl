@@ -1,7 +1,7 @@
 
 {{- /*
 Copyright 2025 New Vector Ltd
-Copyright 2025 Element Creations Ltd
+Copyright 2025-2026 Element Creations Ltd
 
 SPDX-License-Identifier: AGPL-3.0-only
 */ -}}
@@ -13,7 +13,7 @@ SPDX-License-Identifier: AGPL-3.0-only
 {{- if .postgres -}}
 {{ (tpl .postgres.host $root) }}:{{ .postgres.port | default 5432 }}
 {{- else if $root.Values.postgres.enabled -}}
-{{ $root.Release.Name }}-postgres.{{ $root.Release.Namespace }}.svc.{{ $root.Values.clusterDomain }}:5432
+{{ include "element-io.ess-library.chart-postgres-host" (dict "root" $root "context" .) }}:{{ include "element-io.ess-library.chart-postgres-port" (dict "root" $root "context" .) }}
 {{- else }}
 {{- fail "You need to enable the chart Postgres or configure this component postgres" -}}
 {{- end -}}
@@ -21,6 +21,32 @@ SPDX-License-Identifier: AGPL-3.0-only
 {{- end -}}
 
 
+{{- /* The chart Postgres or, if enabled, PgBouncer in front of it.
+Hooks can run before PgBouncer has been deployed and so always connect directly */}}
+{{- define "element-io.ess-library.chart-postgres-host" -}}
+{{- $root := .root -}}
+{{- with required "element-io.ess-library.chart-postgres-host requires context" .context -}}
+{{- if and (not .isHook) (include "element-io.pgbouncer.enabled" (dict "root" $root)) -}}
+{{ $root.Release.Name }}-pgbouncer.{{ $root.Release.Namespace }}.svc.{{ $root.Values.clusterDomain }}
+{{- else -}}
+{{ $root.Release.Name }}-postgres.{{ $root.Release.Namespace }}.svc.{{ $root.Values.clusterDomain }}
+{{- end -}}
+{{- end -}}
+{{- end -}}
+
+
+{{- define "element-io.ess-library.chart-postgres-port" -}}
+{{- $root := .root -}}
+{{- with required "element-io.ess-library.chart-postgres-port requires context" .context -}}
+{{- if and (not .isHook) (include "element-io.pgbouncer.enabled" (dict "root" $root)) -}}
+6432
+{{- else -}}
+5432
+{{- end -}}
+{{- end -}}
+{{- end -}}
+
+
 {{- define "element-io.ess-library.postgres-env-var" -}}
 {{- $root := .root -}}
 {{- with required "element-io.ess-library.postgres-env-var requires context" .context -}}
@@ -0,0 +1,276 @@
+{{- /*
+Copyright 2026 Element Creations Ltd
+
+SPDX-License-Identifier: AGPL-3.0-only
+*/ -}}
+
+{{- /*
+Each profile's values are used for those component values unless they've been explicitly set.
+values.yaml deliberately has no defaults for them, so that anything set is known to be explicit,
+and the small profile's values are used when no profile is set.
+The remaining properties tune config that doesn't have a chart value and are only used when a profile is set,
+apart from the Synapse workers' sizing which is needed regardless.
+
+Synapse workerReplicas is for the workers that can be autoscaled, i.e. those that handle requests.
+Synapse workerResources is for every worker, and when absent they share the Synapse resources.
+
+Synapse databaseMaxConnections is per Synapse process and with
+the Matrix Authentication Service database connections must stay comfortably
+below the max_connections that the chart Postgres derives from its memory limit.
+The PgBouncer pools likewise, as when it is enabled they're what's opened against Postgres instead.
+*/}}
+{{- define "element-io.ess-library.sizing.profiles" -}}
+small:
+  users: 100
+  values:
+    elementWeb:
+      replicas: 1
+    haproxy:
+      replicas: 1
+      resources:
+        requests:
+          memory: 100Mi
+          cpu: 100m
+        limits:
+          memory: 200Mi
+    matrixAuthenticationService:
+      replicas: 1
+      resources:
+        requests:
+          memory: 50Mi
+          cpu: 50m
+        limits:
+          memory: 350Mi
+    pgbouncer:
+      poolSize:
+        synapse: 40
+        matrixAuthenticationService: 10
+    postgres:
+      resources:
+        requests:
+          memory: 100Mi
+          cpu: 100m
+        limits:
+          memory: 4Gi
+    synapse:
+      resources:
+        requests:
+          memory: 100Mi
+          cpu: 100m
+        limits:
+          memory: 4Gi
+  haproxy:
+    maxConnections: 2000
+  matrixAuthenticationService:
+    databaseMaxConnections: 10
+  synapse:
+    cachesGlobalFactor: 0.5
+    databaseMaxConnections: 5
+    workerReplicas: 1
+medium:
+  users: 1000
+  values:
+    elementWeb:
+      replicas: 2
+    haproxy:
+      replicas: 2
+      resources:
+        requests:
+          memory: 200Mi
+          cpu: 200m
+        limits:
+          memory: 500Mi
+    matrixAuthenticationService:
+      replicas: 2
+      resources:
+        requests:
+          memory: 100Mi
+          cpu: 100m
+        limits:
+          memory: 500Mi
+    pgbouncer:
+      poolSize:
+        synapse: 80
+        matrixAuthenticationService: 20
+    postgres:
+      resources:
+        requests:
+          memory: 2Gi
+          cpu: 500m
+        limits:
+          memory: 8Gi
+    synapse:
+      resources:
+        requests:
+          memory: 1Gi
+          cpu: 500m
+        limits:
+          memory: 4Gi
+  haproxy:
+    maxConnections: 10000
+  matrixAuthenticationService:
+    databaseMaxConnections: 10
+  synapse:
+    cachesGlobalFactor: 1.0
+    databaseMaxConnections: 10
+    workerReplicas: 2
+    workerResources:
+      requests:
+        memory: 500Mi
+        cpu: 250m
+      limits:
+        memory: 2Gi
+large:
+  users: 10000
+  values:
+    elementWeb:
+      replicas: 2
+    haproxy:
+      replicas: 2
+      resources:
+        requests:
+          memory: 500Mi
+          cpu: 500m
+        limits:
+          memory: 1Gi
+    matrixAuthenticationService:
+      replicas: 2
+      resources:
+        requests:
+          memory: 200Mi
+          cpu: 200m
+        limits:
+          memory: 1Gi
+    pgbouncer:
+      poolSize:
+        synapse: 160
+        matrixAuthenticationService: 40
+    postgres:
+      resources:
+        requests:
+          memory: 8Gi
+          cpu: "2"
+        limits:
+          memory: 16Gi
+    synapse:
+      resources:
+        requests:
+          memory: 4Gi
+          cpu: "1"
+        limits:
+          memory: 8Gi
+  haproxy:
+    maxConnections: 20000
+  matrixAuthenticationService:
+    databaseMaxConnections: 20
+  synapse:
+    cachesGlobalFactor: 2.0
+    databaseMaxConnections: 20
+    workerReplicas: 2
+    workerResources:
+      requests:
+        memory: 1Gi
+        cpu: 500m
+      limits:
+        memory: 4Gi
+xlarge:
+  users: 50000
+  values:
+    elementWeb:
+      replicas: 3
+    haproxy:
+      replicas: 3
+      resources:
+        requests:
+          memory: 1Gi
+          cpu: "1"
+        limits:
+          memory: 2Gi
+    matrixAuthenticationService:
+      replicas: 3
+      resources:
+        requests:
+          memory: 500Mi
+          cpu: 500m
+        limits:
+          memory: 2Gi
+    pgbouncer:
+      poolSize:
+        synapse: 320
+        matrixAuthenticationService: 60
+    postgres:
+      resources:
+        requests:
+          memory: 16Gi
+          cpu: "4"
+        limits:
+          memory: 32Gi
+    synapse:
+      resources:
+        requests:
+          memory: 8Gi
+          cpu: "2"
+        limits:
+          memory: 16Gi
+  haproxy:
+    maxConnections: 40000
+  matrixAuthenticationService:
+    databaseMaxConnections: 30
+  synapse:
+    cachesGlobalFactor: 4.0
+    databaseMaxConnections: 40
+    workerReplicas: 3
+    workerResources:
+      requests:
+        memory: 2Gi
+        cpu: "1"
+      limits:
+        memory: 8Gi
+{{- end -}}
+
+{{- define "element-io.ess-library.sizing.profile" -}}
+{{- $root := .root -}}
+{{- $profile := dict -}}
+{{- with $root.Values.sizing.profile -}}
+{{- $profiles := include "element-io.ess-library.sizing.profiles" (dict "root" $root) | fromYaml -}}
+{{- if kindIs "string" . -}}
+{{- $profile = required (printf "sizing.profile %s isn't one of small, medium, large or xlarge" .) (get $profiles .) -}}
+{{- else -}}
+{{- $users := . | int -}}
+{{- /* The smallest profile that covers the users, with anything beyond that the largest */}}
+{{- $profile = $profiles.xlarge -}}
+{{- range $name := list "large" "medium" "small" -}}
+{{- if le $users ((get $profiles $name).users | int) -}}
+{{- $profile = get $profiles $name -}}
+{{- end -}}
+{{- end -}}
+{{- end -}}
+{{- end -}}
+{{ $profile | toJson }}
+{{- end -}}
+
+{{- /* The profile that sizes anything not explicitly set, which is the small profile when no profile is set */}}
+{{- define "element-io.ess-library.sizing.valuesProfile" -}}
+{{- $root := .root -}}
+{{- $profile := include "element-io.ess-library.sizing.profile" (dict "root" $root) | fromJson -}}
+{{- if not $profile -}}
+{{- $profile = (include "element-io.ess-library.sizing.profiles" (dict "root" $root) | fromYaml).small -}}
+{{- end -}}
+{{ $profile | toJson }}
+{{- end -}}
+
+{{- define "element-io.ess-library.sizing.overrides" -}}
+{{- $root := .root -}}
+{{- $componentName := required "element-io.ess-library.sizing.overrides missing context" .context -}}
+{{- $componentValues := get $root.Values $componentName -}}
+{{- $overrides := dict -}}
+{{- range $key, $sizedValue := get (include "element-io.ess-library.sizing.valuesProfile" (dict "root" $root) | fromJson).values $componentName -}}
+{{- if not (hasKey $componentValues $key) -}}
+{{- $_ := set $overrides $key $sizedValue -}}
+{{- else if kindIs "map" $sizedValue -}}
+{{- /* Explicitly set maps are merged over the sized values, as Helm would have merged them over a chart default */}}
+{{- $_ := set $overrides $key (mustMergeOverwrite ($sizedValue | deepCopy) (get $componentValues $key | deepCopy)) -}}
+{{- end -}}
+{{- end -}}
+{{ $overrides | toJson }}
+{{- end -}}
@@ -13,7 +13,11 @@ SPDX-License-Identifier: AGPL-3.0-only
 {{- $serviceNameSuffix := .serviceNameSuffix | default $nameSuffix -}}
 {{- $kind := required "element-io.ess-library.workloads.commonSpec missing context.kind" .kind -}}
 {{- with required "element-io.ess-library.workloads.commonSpec missing context.componentValues" .componentValues -}}
+{{- $autoscaled := dig "autoscaling" "enabled" false . -}}
+{{- /* The HorizontalPodAutoscaler owns the replicas when autoscaling, setting them here would fight it on every upgrade */}}
+{{- if not $autoscaled -}}
 replicas: {{ .replicas | default 1 }}
+{{ end -}}
 selector:
   matchLabels:
     app.kubernetes.io/instance: {{ $root.Release.Name }}-{{ $nameSuffix }}
@@ -22,7 +26,9 @@ strategy:
   type: RollingUpdate
   rollingUpdate:
     maxSurge: 2
-{{- if hasKey . "replicas" }}
+{{- if $autoscaled }}
+    maxUnavailable: {{ min (max 0 (sub (.autoscaling.minReplicas | default 1) 1)) 1 }}
+{{- else if hasKey . "replicas" }}
     maxUnavailable: {{ min (max 0 (sub .replicas 1)) 1 }}
 {{- else }}
     maxUnavailable: 0
@@ -40,3 +46,112 @@ podManagementPolicy: Parallel
 {{- end }}
 {{- end }}
 {{- end }}
+
+{{- define "element-io.ess-library.workloads.maxReplicas" -}}
+{{- /* Not a with as a component with none of its own values is still 1 replica */}}
+{{- $componentValues := required "element-io.ess-library.workloads.maxReplicas missing context" .context -}}
+{{- if dig "autoscaling" "enabled" false $componentValues -}}
+{{ $componentValues.autoscaling.maxReplicas | default 1 }}
+{{- else -}}
+{{ $componentValues.replicas | default 1 }}
+{{- end -}}
+{{- end -}}
+
+{{- define "element-io.ess-library.workloads.horizontalPodAutoscaler" -}}
+{{- $root := .root -}}
+{{- with required "element-io.ess-library.workloads.horizontalPodAutoscaler missing context" .context -}}
+{{- $nameSuffix := required "element-io.ess-library.workloads.horizontalPodAutoscaler missing context.nameSuffix" .nameSuffix -}}
+{{- $workloadNameSuffix := .workloadNameSuffix | default $nameSuffix -}}
+{{- $labelsTemplate := .labelsTemplate | default (printf "element-io.%s.labels" $nameSuffix) -}}
+{{- $kind := required "element-io.ess-library.workloads.horizontalPodAutoscaler missing context.kind" .kind -}}
+{{- with required "element-io.ess-library.workloads.horizontalPodAutoscaler missing context.componentValues" .componentValues -}}
+{{- $componentValues := . -}}
+{{- if dig "autoscaling" "enabled" false . }}
+{{- with .autoscaling }}
+{{- if gt (.minReplicas | int) (.maxReplicas | int) }}
+{{- fail (printf "%s autoscaling.minReplicas must not be more than autoscaling.maxReplicas" $workloadNameSuffix) }}
+{{- end }}
+{{- if not (or .targetCPUUtilizationPercentage .targetMemoryUtilizationPercentage .metrics) }}
+{{- fail (printf "%s autoscaling needs a targetCPUUtilizationPercentage, targetMemoryUtilizationPercentage or metrics to scale on" $workloadNameSuffix) }}
+{{- end }}
+apiVersion: autoscaling/v2
+kind: HorizontalPodAutoscaler
+metadata:
+  labels:
+    {{- include $labelsTemplate (dict "root" $root "context" $componentValues) | nindent 4 }}
+  name: {{ $root.Release.Name }}-{{ $workloadNameSuffix }}
+  namespace: {{ $root.Release.Namespace }}
+spec:
+  scaleTargetRef:
+    apiVersion: apps/v1
+    kind: {{ $kind }}
+    name: {{ $root.Release.Name }}-{{ $workloadNameSuffix }}
+  minReplicas: {{ .minReplicas }}
+  maxReplicas: {{ .maxReplicas }}
+  metrics:
+{{- with .targetCPUUtilizationPercentage }}
+  - type: Resource
+    resource:
+      name: cpu
+      target:
+        type: Utilization
+        averageUtilization: {{ . }}
+{{- end }}
+{{- with .targetMemoryUtilizationPercentage }}
+  - type: Resource
+    resource:
+      name: memory
+      target:
+        type: Utilization
+        averageUtilization: {{ . }}
+{{- end }}
+{{- with .metrics }}
+  {{- toYaml . | nindent 2 }}
+{{- end }}
+{{- with .behavior }}
+  behavior:
+    {{- toYaml . | nindent 4 }}
+{{- end }}
+{{- end }}
+{{- end }}
+{{- end }}
+{{- end }}
+{{- end }}
+
+{{- define "element-io.ess-library.workloads.podDisruptionBudget" -}}
+{{- $root := .root -}}
+{{- with required "element-io.ess-library.workloads.podDisruptionBudget missing context" .context -}}
+{{- $nameSuffix := required "element-io.ess-library.workloads.podDisruptionBudget missing context.nameSuffix" .nameSuffix -}}
+{{- $workloadNameSuffix := .workloadNameSuffix | default $nameSuffix -}}
+{{- $labelsTemplate := .labelsTemplate | default (printf "element-io.%s.labels" $nameSuffix) -}}
+{{- with required "element-io.ess-library.workloads.podDisruptionBudget missing context.componentValues" .componentValues -}}
+{{- $componentValues := . -}}
+{{- /* A single replica can't be both disrupted and kept available so there's nothing to budget for */}}
+{{- $multiReplica := or (gt (.replicas | default 1 | int) 1) (dig "autoscaling" "enabled" false .) -}}
+{{- if and $multiReplica (dig "podDisruptionBudget" "enabled" false .) }}
+{{- with .podDisruptionBudget }}
+apiVersion: policy/v1
+kind: PodDisruptionBudget
+metadata:
+  labels:
+    {{- include $labelsTemplate (dict "root" $root "context" $componentValues) | nindent 4 }}
+  name: {{ $root.Release.Name }}-{{ $workloadNameSuffix }}
+  namespace: {{ $root.Release.Namespace }}
+spec:
+  selector:
+    matchLabels:
+      app.kubernetes.io/instance: {{ $root.Release.Name }}-{{ $nameSuffix }}
+{{- if not (kindIs "invalid" .minAvailable) }}
+  minAvailable: {{ .minAvailable }}
+{{- else if not (kindIs "invalid" .maxUnavailable) }}
+  maxUnavailable: {{ .maxUnavailable }}
+{{- else }}
+  maxUnavailable: 1
+{{- end }}
+  # Pods that aren't Ready aren't serving anything, so don't let them block node drains
+  unhealthyPodEvictionPolicy: AlwaysAllow
+{{- end }}
+{{- end }}
+{{- end }}
+{{- end }}
+{{- end }}
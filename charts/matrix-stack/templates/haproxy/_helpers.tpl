@@ -1,6 +1,6 @@
 {{- /*
 Copyright 2024-2025 New Vector Ltd
-Copyright 2025 Element Creations Ltd
+Copyright 2025-2026 Element Creations Ltd
 
 SPDX-License-Identifier: AGPL-3.0-only
 */ -}}
@@ -28,3 +28,7 @@ placeholder: Ensure there's something after haproxy.cfg for https://github.com/e
 {{- define "element-io.haproxy.overrideEnv" }}
 env: []
 {{- end -}}
+
+{{- define "element-io.haproxy-reload.overrideEnv" }}
+env: []
+{{- end -}}
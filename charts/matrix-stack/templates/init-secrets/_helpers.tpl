@@ -114,3 +114,18 @@ hookshot-registration.yaml: |
 {{- end }}
 {{- end }}
 {{- end }}
+
+{{- define "element-io.init-secrets.labels-arg" -}}
+{{- $root := .root -}}
+{{- with required "element-io.init-secrets.labels-arg missing context" .context -}}
+{{ include "element-io.init-secrets.labels" (dict "root" $root "context" (dict "labels" .labels "withChartVersion" false)) | trim | replace ": " "=" | replace "\n" "," | replace "\"" "" }}
+{{- end -}}
+{{- end -}}
+
+{{- define "element-io.init-secrets.digest" -}}
+{{- $root := .root -}}
+{{- with required "element-io.init-secrets.digest missing context" .context -}}
+{{- list (include "element-io.init-secrets.generated-secrets" (dict "root" $root "context" .) | fromYamlArray | join ",")
+         (include "element-io.init-secrets.labels-arg" (dict "root" $root "context" .)) | join "\n" | sha1sum -}}
+{{- end -}}
+{{- end -}}
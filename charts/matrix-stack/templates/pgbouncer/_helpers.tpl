@@ -0,0 +1,166 @@
+{{- /*
+Copyright 2026 Element Creations Ltd
+
+SPDX-License-Identifier: AGPL-3.0-only
+*/ -}}
+
+{{- define "element-io.pgbouncer.labels" -}}
+{{- $root := .root -}}
+{{- with required "element-io.pgbouncer.labels missing context" .context -}}
+{{ include "element-io.ess-library.labels.common" (dict "root" $root "context" (dict "labels" .labels "withChartVersion" .withChartVersion)) }}
+app.kubernetes.io/component: matrix-stack-db-pooler
+app.kubernetes.io/name: pgbouncer
+app.kubernetes.io/instance: {{ $root.Release.Name }}-pgbouncer
+app.kubernetes.io/version: {{ include "element-io.ess-library.labels.makeSafe" .image.tag }}
+{{- end }}
+{{- end }}
+
+{{- define "element-io.pgbouncer.enabled" }}
+{{- $root := .root -}}
+{{- if and $root.Values.pgbouncer.enabled (include "element-io.postgres.enabled" (dict "root" $root)) -}}
+true
+{{- end }}
+{{- end }}
+
+{{- /* Every PgBouncer replica opens its own pools against Postgres, which must also have room for its superuser
+reserved connections, the exporter and the hooks that connect to it directly */}}
+{{- define "element-io.pgbouncer.validations" }}
+{{- $root := .root -}}
+{{- with required "element-io.pgbouncer.validations missing context" .context -}}
+{{- $messages := list -}}
+{{- if (include "element-io.pgbouncer.enabled" (dict "root" $root)) -}}
+{{- $pgbouncerValues := mustMergeOverwrite (. | deepCopy) (include "element-io.ess-library.sizing.overrides" (dict "root" $root "context" "pgbouncer") | fromJson) -}}
+{{- $postgresValues := mustMergeOverwrite ($root.Values.postgres | deepCopy) (include "element-io.ess-library.sizing.overrides" (dict "root" $root "context" "postgres") | fromJson) -}}
+{{- $replicas := include "element-io.ess-library.workloads.maxReplicas" (dict "root" $root "context" $pgbouncerValues) | int -}}
+{{- $poolsSize := 0 -}}
+{{- range $essPassword := include "element-io.pgbouncer.essPasswords" (dict "root" $root) | fromJsonArray -}}
+{{- $poolsSize = add $poolsSize (include "element-io.pgbouncer.poolSize" (dict "root" $root "context" $essPassword) | int) -}}
+{{- end -}}
+{{- $reservedConnections := 10 -}}
+{{- $maxConnections := include "element-io.postgres.maxConnections" (dict "root" $root "context" $postgresValues) | int -}}
+{{- if gt (add (mul $replicas $poolsSize) $reservedConnections) $maxConnections -}}
+{{- $messages = append $messages (printf "pgbouncer needs %d Postgres connections for %d replicas, each with pools totalling %d connections, and %d reserved connections, but Postgres only allows %d. Raise postgres.resources.limits.memory or lower pgbouncer.poolSize or pgbouncer.replicas" (add (mul $replicas $poolsSize) $reservedConnections) $replicas $poolsSize $reservedConnections $maxConnections) -}}
+{{- end -}}
+{{- end -}}
+{{ $messages | toJson }}
+{{- end }}
+{{- end }}
+
+{{- /* The postgres.essPasswords of the components whose chart Postgres databases are reached through PgBouncer */}}
+{{- define "element-io.pgbouncer.essPasswords" -}}
+{{- $root := .root -}}
+{{- $essPasswords := list -}}
+{{- if (include "element-io.pgbouncer.enabled" (dict "root" $root)) -}}
+{{- range $essPassword := list "matrixAuthenticationService" "synapse" -}}
+{{- $componentValues := index $root.Values $essPassword -}}
+{{- if and $componentValues.enabled (not $componentValues.postgres) -}}
+{{- $essPasswords = append $essPasswords $essPassword -}}
+{{- end -}}
+{{- end -}}
+{{- end -}}
+{{ $essPasswords | toJson }}
+{{- end -}}
+
+{{- /* The fewest database connections each Pod is given, which is also Synapse's default cp_min */}}
+{{- define "element-io.pgbouncer.minConnectionsPerPod" -}}
+5
+{{- end -}}
+
+{{- /* The most Pods of a component that could be sharing its PgBouncer pool */}}
+{{- define "element-io.pgbouncer.maxPods" -}}
+{{- $root := .root -}}
+{{- $essPassword := required "element-io.pgbouncer.maxPods missing context" .context -}}
+{{- if eq $essPassword "synapse" -}}
+{{ include "element-io.synapse.maxPods" (dict "root" $root) }}
+{{- else -}}
+{{- $componentValues := mustMergeOverwrite ((index $root.Values $essPassword) | deepCopy) (include "element-io.ess-library.sizing.overrides" (dict "root" $root "context" $essPassword) | fromJson) -}}
+{{ include "element-io.ess-library.workloads.maxReplicas" (dict "root" $root "context" $componentValues) }}
+{{- end -}}
+{{- end -}}
+
+{{- /* Pools that haven't been explicitly set grow so that every Pod that could be sharing them, e.g. with many Synapse
+workers enabled, gets at least the minimum connections */}}
+{{- define "element-io.pgbouncer.poolSize" -}}
+{{- $root := .root -}}
+{{- $essPassword := required "element-io.pgbouncer.poolSize missing context" .context -}}
+{{- $pgbouncerValues := mustMergeOverwrite ($root.Values.pgbouncer | deepCopy) (include "element-io.ess-library.sizing.overrides" (dict "root" $root "context" "pgbouncer") | fromJson) -}}
+{{- $poolSize := index $pgbouncerValues.poolSize $essPassword | int -}}
+{{- if not (hasKey ($root.Values.pgbouncer.poolSize | default dict) $essPassword) -}}
+{{- $maxPods := include "element-io.pgbouncer.maxPods" (dict "root" $root "context" $essPassword) | int -}}
+{{- $poolSize = max $poolSize (mul $maxPods (include "element-io.pgbouncer.minConnectionsPerPod" (dict "root" $root) | int)) -}}
+{{- end -}}
+{{ $poolSize }}
+{{- end -}}
+
+{{- /* How many database connections each of a component's Pods can open so that, between all of its Pods,
+they fit in the component's PgBouncer pool. This is never more than the component would otherwise open */}}
+{{- define "element-io.pgbouncer.connectionsPerPod" -}}
+{{- $root := .root -}}
+{{- $essPassword := required "element-io.pgbouncer.connectionsPerPod missing context" .context -}}
+{{- $profile := include "element-io.ess-library.sizing.profile" (dict "root" $root) | fromJson -}}
+{{- /* Synapse's cp_max & Matrix Authentication Service's max_connections both default to 10 */}}
+{{- $connections := dig $essPassword "databaseMaxConnections" 10 $profile | int -}}
+{{- $maxPods := include "element-io.pgbouncer.maxPods" (dict "root" $root "context" $essPassword) | int -}}
+{{- $poolSize := include "element-io.pgbouncer.poolSize" (dict "root" $root "context" $essPassword) | int -}}
+{{- $minConnections := include "element-io.pgbouncer.minConnectionsPerPod" (dict "root" $root) | int -}}
+{{- if lt (div $poolSize $maxPods) $minConnections -}}
+{{- fail (printf "pgbouncer.poolSize.%s of %d is too small for the up to %d Pods sharing it to have at least %d database connections each. It must be at least %d" $essPassword $poolSize $maxPods $minConnections (mul $maxPods $minConnections)) -}}
+{{- end -}}
+{{ min $connections (div $poolSize $maxPods) }}
+{{- end -}}
+
+{{- define "element-io.pgbouncer.secret-path" -}}
+{{- $root := .root -}}
+{{- $essPassword := required "element-io.pgbouncer.secret-path missing context" .context -}}
+{{- include "element-io.ess-library.init-secret-path" (dict
+      "root" $root
+      "context" (dict
+        "secretPath" (printf "postgres.essPasswords.%s" $essPassword)
+        "initSecretKey" (include "element-io.ess-library.postgres-env-var" (dict "root" $root "context" $essPassword))
+        "defaultSecretName" (include "element-io.postgres.secret-name" (dict "root" $root "context" (dict "isHook" false)))
+        "defaultSecretKey" (printf "ESS_PASSWORD_%s" ($essPassword | upper))
+      )
+    ) -}}
+{{- end -}}
+
+{{- /* Only the Secrets holding the passwords of the pooled databases, not the Postgres admin password */}}
+{{- define "element-io.pgbouncer.configSecrets" -}}
+{{- $root := .root -}}
+{{- $configSecrets := list }}
+{{- range $essPassword := include "element-io.pgbouncer.essPasswords" (dict "root" $root) | fromJsonArray }}
+{{- with index $root.Values.postgres.essPasswords $essPassword }}
+{{- if .value }}
+{{- $configSecrets = append $configSecrets (include "element-io.postgres.secret-name" (dict "root" $root "context" (dict "isHook" false))) }}
+{{- end }}
+{{- with .secret }}
+{{- $configSecrets = append $configSecrets (tpl . $root) }}
+{{- end }}
+{{- end }}
+{{- end }}
+{{ $configSecrets | uniq | toJson }}
+{{- end }}
+
+{{- define "element-io.pgbouncer.overrideEnv" }}
+env: []
+{{- end -}}
+
+{{- define "element-io.pgbouncer-exporter.overrideEnv" }}
+{{- $root := .root -}}
+{{- with required "element-io.pgbouncer-exporter.overrideEnv missing context" .context -}}
+env:
+- name: "PGBOUNCER_EXPORTER_CONNECTION_STRING"
+  value: "user=pgbouncer_exporter dbname=pgbouncer host=/var/run/pgbouncer port=6432 sslmode=disable"
+{{- end -}}
+{{- end -}}
+
+{{- define "element-io.pgbouncer.configmap-data" -}}
+{{- $root := .root -}}
+{{- with required "element-io.pgbouncer.configmap-data missing context" .context -}}
+pgbouncer.ini: |
+{{- (tpl ($root.Files.Get "configs/pgbouncer/pgbouncer.ini.tpl") (dict "root" $root "context" .)) | nindent 2 }}
+pg_hba.conf: |
+{{- (tpl ($root.Files.Get "configs/pgbouncer/pg_hba.conf.tpl") (dict "root" $root "context" .)) | nindent 2 }}
+start.sh: |
+{{- (tpl ($root.Files.Get "configs/pgbouncer/start.sh.tpl") (dict "root" $root "context" .)) | nindent 2 }}
+{{- end }}
+{{- end }}
@@ -1,6 +1,6 @@
 {{- /*
 Copyright 2025 New Vector Ltd
-Copyright 2025 Element Creations Ltd
+Copyright 2025-2026 Element Creations Ltd
 
 SPDX-License-Identifier: AGPL-3.0-only
 */ -}}
@@ -103,12 +103,19 @@ true
 {{- end -}}
 
 
+{{- define "element-io.postgres.maxConnections" -}}
+{{- $root := .root -}}
+{{- with required "element-io.postgres.maxConnections missing context" .context -}}
+{{ div (include "element-io.postgres.memoryLimitsMB" (dict "root" $root "context" .)) 16 }}
+{{- end -}}
+{{- end -}}
+
 {{- define "element-io.postgres.args" -}}
 {{- $root := .root -}}
 {{- with required "element-io.postgres.args missing context" .context -}}
 {{- $memoryLimitsMB := include "element-io.postgres.memoryLimitsMB" (dict "root" $root "context" .) }}
 - "-c"
-- "max_connections={{ printf "%d" (div $memoryLimitsMB 16) }}"
+- "max_connections={{ include "element-io.postgres.maxConnections" (dict "root" $root "context" .) }}"
 - "-c"
 - "shared_buffers={{ printf "%s" (printf "%dMB" (div $memoryLimitsMB 4)) }}"
 - "-c"
@@ -46,6 +46,28 @@ k8s.element.io/synapse-instance: {{ $root.Release.Name }}-synapse-check-config
 {{- end }}
 {{- end }}
 
+{{- /* The deployment markers record what was checked on the last successful upgrade. If nothing has changed there's
+no need to wait for a Synapse Pod to be scheduled and started just to check the same config again */}}
+{{- define "element-io.synapse-check-config.enabled" -}}
+{{- $root := .root -}}
+{{- with $root.Values.synapse -}}
+{{- $checkedConfigHash := dig "data" "SYNAPSE_CHECKED_CONFIG_HASH" "" (lookup "v1" "ConfigMap" $root.Release.Namespace (printf "%s-markers" $root.Release.Name)) }}
+{{- if and .enabled .checkConfigHook.enabled
+           (or .checkConfigHook.force (ne $checkedConfigHash (include "element-io.synapse-check-config.configHash" (dict "root" $root)))) -}}
+true
+{{- end }}
+{{- end }}
+{{- end }}
+
+{{- /* Everything the check-config hook checks (image, config & secret hashes, etc) ends up in its Pod template */}}
+{{- define "element-io.synapse-check-config.configHash" -}}
+{{- $root := .root -}}
+{{- with $root.Values.synapse -}}
+{{- $perProcessRoot := mustMergeOverwrite (. | deepCopy) (include "element-io.ess-library.sizing.overrides" (dict "root" $root "context" "synapse") | fromJson) (.checkConfigHook | deepCopy) (dict "processType" "check-config" "isHook" true) }}
+{{- include "element-io.synapse.pod-template" (dict "root" $root "context" $perProcessRoot) | sha1sum }}
+{{- end }}
+{{- end }}
+
 {{- define "element-io.synapse-ingress.labels" -}}
 {{- $root := .root -}}
 {{- with required "element-io.synapse-ingress.labels missing context" .context -}}
@@ -75,17 +97,37 @@ k8s.element.io/synapse-instance: {{ $root.Release.Name }}-synapse
 {{- end }}
 {{- end }}
 
+{{- /* The enabled workers, sized by sizing.profile where they've not been explicitly set */}}
 {{- define "element-io.synapse.enabledWorkers" -}}
 {{- $root := .root -}}
+{{- $sizing := (include "element-io.ess-library.sizing.valuesProfile" (dict "root" $root) | fromJson).synapse -}}
 {{ $enabledWorkers := dict }}
 {{- range $workerType, $workerDetails := $root.Values.synapse.workers }}
 {{- if $workerDetails.enabled }}
+{{- $workerDetails = $workerDetails | deepCopy }}
+{{- if and (hasKey $workerDetails "autoscaling") (not (hasKey $workerDetails "replicas")) }}
+{{- $_ := set $workerDetails "replicas" $sizing.workerReplicas }}
+{{- end }}
+{{- /* Explicitly set global Synapse resources are used by every process that doesn't set its own */}}
+{{- if and $sizing.workerResources (not (hasKey $workerDetails "resources")) (not (hasKey $root.Values.synapse "resources")) }}
+{{- $_ := set $workerDetails "resources" ($sizing.workerResources | deepCopy) }}
+{{- end }}
 {{ $_ := set $enabledWorkers $workerType $workerDetails }}
 {{- end }}
 {{- end }}
 {{ $enabledWorkers | toJson }}
 {{- end }}
 
+{{- /* The most Pods that all of the Synapse processes together could be running */}}
+{{- define "element-io.synapse.maxPods" -}}
+{{- $root := .root -}}
+{{- $maxPods := 0 -}}
+{{- range $processType, $processDetails := mustMergeOverwrite (dict "main" dict) ((include "element-io.synapse.enabledWorkers" (dict "root" $root)) | fromJson) -}}
+{{- $maxPods = add $maxPods (include "element-io.ess-library.workloads.maxReplicas" (dict "root" $root "context" $processDetails) | int) -}}
+{{- end -}}
+{{ $maxPods }}
+{{- end }}
+
 {{- define "element-io.synapse.pvcName" -}}
 {{- $root := .root -}}
 {{- with required "element-io.synapse.pvcName missing context" .context -}}
@@ -194,20 +236,27 @@ env:
 {{- $root := .root }}
 {{- with required "element-io.synapse.configmap-data requires context" .context }}
 {{- $isHook := required "element-io.synapse.configmap-data requires context.isHook" .isHook }}
+{{- /* When rendering for a specific process, e.g. for its config hash, only include the process-specific file that it loads.
+This way a change to one process' configuration doesn't restart every other Synapse process too */}}
+{{- $processType := .processType }}
 01-homeserver-underrides.yaml: |
 {{- (tpl ($root.Files.Get "configs/synapse/synapse-01-shared-underrides.yaml.tpl") (dict "root" $root)) | nindent 2 }}
 {{- /*02 files are user provided in Helm values and end up in the Secret*/}}
 {{- /*03 files are user provided as secrets rather than directly in Helm*/}}
 04-homeserver-overrides.yaml: |
 {{- (tpl ($root.Files.Get "configs/synapse/synapse-04-homeserver-overrides.yaml.tpl") (dict "root" $root "context" (mustMergeOverwrite ($root.Values.synapse | deepCopy) (dict "isHook" $isHook)))) | nindent 2 }}
+{{- if or (not $processType) (eq $processType "main") $isHook }}
 05-main.yaml: |
 {{- (tpl ($root.Files.Get "configs/synapse/synapse-05-process-specific.yaml.tpl") (dict "root" $root "context" (dict "processType" "main"))) | nindent 2 }}
+{{- end }}
 {{- if not $isHook }}
 {{- range $workerType, $workerDetails := (include "element-io.synapse.enabledWorkers" (dict "root" $root)) | fromJson }}
+{{- if or (not $processType) (eq $processType $workerType) }}
 05-{{ $workerType }}.yaml: |
 {{- (tpl ($root.Files.Get "configs/synapse/synapse-05-process-specific.yaml.tpl") (dict "root" $root "context" (dict "processType" $workerType))) | nindent 2 }}
 {{- end }}
 {{- end }}
+{{- end }}
 log_config.yaml: |
 {{- (tpl ($root.Files.Get "configs/synapse/synapse-log-config.yaml.tpl") (dict "root" $root)) | nindent 2 }}
 {{- end }}
@@ -218,8 +267,10 @@ log_config.yaml: |
 {{- $root := .root -}}
 429.http: |
 {{- (tpl ($root.Files.Get "configs/synapse/429.http.tpl") dict) | nindent 2 }}
-path_map_file: |
-{{- (tpl ($root.Files.Get "configs/synapse/path_map_file.tpl") (dict "root" $root)) | nindent 2 }}
+{{- range $map := list "exact" "prefix" "regex" }}
+path_map_file_{{ $map }}: |
+{{- (tpl ($root.Files.Get "configs/synapse/path_map_file.tpl") (dict "root" $root "map" $map)) | nindent 2 }}
+{{- end }}
 path_map_file_get: |
 {{- (tpl ($root.Files.Get "configs/synapse/path_map_file_get.tpl") (dict "root" $root)) | nindent 2 -}}
 {{- /* We accept this means that the ConfigMap & all hash labels using this helper changes on every chart version upgrade and the HAProxy will restart as a result.
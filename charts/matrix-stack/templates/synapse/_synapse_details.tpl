@@ -1,6 +1,6 @@
 {{- /*
 Copyright 2024-2025 New Vector Ltd
-Copyright 2025 Element Creations Ltd
+Copyright 2025-2026 Element Creations Ltd
 
 SPDX-License-Identifier: AGPL-3.0-only
 */ -}}
@@ -411,3 +411,133 @@ responsibleForMedia
 {{ $workerPaths | toJson }}
 {{- end }}
 {{- end }}
+
+{{- /* How many servers HAProxy resolves from DNS for a worker type's backend. Scalable workers get headroom above their
+replicas, or maximum replicas when autoscaled, so that Pods from scaling up can be load-balanced to before HAProxy is reconfigured */}}
+{{- define "element-io.synapse.haproxy.serverSlots" -}}
+{{- $root := .root -}}
+{{- with required "element-io.synapse.haproxy.serverSlots missing context" .context -}}
+{{- $workerDetails := index ((include "element-io.synapse.enabledWorkers" (dict "root" $root)) | fromJson) . -}}
+{{- if $workerDetails.haproxyServerSlots -}}
+{{ $workerDetails.haproxyServerSlots }}
+{{- else if hasKey $workerDetails "replicas" -}}
+{{- $replicas := $workerDetails.replicas | int -}}
+{{- if dig "autoscaling" "enabled" false $workerDetails -}}
+{{- $replicas = $workerDetails.autoscaling.maxReplicas | int -}}
+{{- end -}}
+{{ add $replicas (max 2 (div $replicas 4)) }}
+{{- else -}}
+1
+{{- end -}}
+{{- end -}}
+{{- end }}
+
+{{- /* The routing table of path regex to worker type, in priority order. The first regex to match a path picks the worker */}}
+{{- define "element-io.synapse.haproxy.pathRoutes" -}}
+{{- $root := .root -}}
+{{- $pathRoutes := list }}
+{{- $enabledWorkerTypes := keys ((include "element-io.synapse.enabledWorkers" (dict "root" $root)) | fromJson) }}
+{{- range $workerType := $enabledWorkerTypes | sortAlpha }}
+{{- range $path := (include "element-io.synapse.process.workerPaths" (dict "root" $root "context" $workerType)) | fromJsonArray }}
+{{- $pathRoutes = append $pathRoutes (list $path $workerType) }}
+{{- end }}
+{{- end }}
+{{ $pathRoutes | toJson }}
+{{- end }}
+
+{{- /*
+Compiles the routing table into the maps HAProxy looks paths up in, in order:
+* exact: routes that only match a single literal path, looked up with map_str
+* prefix: routes that match everything under a literal path prefix, looked up with map_beg
+* regex: everything else, evaluated in priority order with map_reg
+
+Alternations of literals at the start of a route, i.e. (api/v1|r0|v3|unstable), are expanded so that as many
+routes as possible have a literal stem. A route can only be looked up ahead of its priority if no higher priority
+route for another worker could match the same paths, which is determined from the literal stems of the routes.
+*/}}
+{{- define "element-io.synapse.haproxy.pathMaps" -}}
+{{- $root := .root -}}
+{{- $literal := "[A-Za-z0-9_/-]" }}
+{{- $alternative := printf `(?:%s*|\$)` $literal }}
+{{- $expandable := printf `^(\^%s*)\((%s(?:\|%s)*)\)((?:[^?*+{].*)?)$` $literal $alternative $alternative }}
+{{- $exactRoute := printf `^\^(%s+)\$$` $literal }}
+{{- $prefixRoute := printf `^\^(%s+)(?:\.\*\$?)?$` $literal }}
+{{- $pathRoutes := (include "element-io.synapse.haproxy.pathRoutes" (dict "root" $root)) | fromJsonArray }}
+{{- $exact := list }}
+{{- $exactPaths := dict }}
+{{- $prefix := list }}
+{{- $regex := list }}
+{{- /* The literal stems of the routes in the regex map, to find which later routes they could conflict with */}}
+{{- $regexStems := list }}
+{{- range $index, $pathRoute := $pathRoutes }}
+{{- $route := index $pathRoute 0 }}
+{{- $workerType := index $pathRoute 1 }}
+{{- $variants := list $route }}
+{{- range until 4 }}
+{{- $expandedVariants := list }}
+{{- range $variant := $variants }}
+{{- if regexMatch $expandable $variant }}
+{{- range $alternative := splitList "|" (regexReplaceAll $expandable $variant "${2}") }}
+{{- $expandedVariants = append $expandedVariants (printf "%s%s%s" (regexReplaceAll $expandable $variant "${1}") $alternative (regexReplaceAll $expandable $variant "${3}")) }}
+{{- end }}
+{{- else }}
+{{- $expandedVariants = append $expandedVariants $variant }}
+{{- end }}
+{{- end }}
+{{- $variants = $expandedVariants }}
+{{- end }}
+
+{{- $regexVariants := list }}
+{{- $allRegex := true }}
+{{- range $variant := $variants }}
+{{- $stem := regexFind (printf `^\^%s*` $literal) $variant | trimPrefix "^" }}
+{{- /* Every path this matches is already matched by a higher priority prefix */}}
+{{- $shadowed := false }}
+{{- range $prefix }}
+{{- if hasPrefix (index . 0) $stem }}
+{{- $shadowed = true }}
+{{- end }}
+{{- end }}
+{{- /* A higher priority route for another worker, that is only in the regex map, could match some of the same paths */}}
+{{- $conflicts := false }}
+{{- range $regexStems }}
+{{- if and (ne (index . 1) $workerType) (or (hasPrefix (index . 0) $stem) (hasPrefix $stem (index . 0))) }}
+{{- $conflicts = true }}
+{{- end }}
+{{- end }}
+
+{{- if regexMatch $exactRoute $variant }}
+{{- $allRegex = false }}
+{{- $path := regexReplaceAll $exactRoute $variant "${1}" }}
+{{- if not (hasKey $exactPaths $path) }}
+{{- /* The exact map is looked up first, so record whichever route would have matched this path first */}}
+{{- $winner := "" }}
+{{- range $higherPriorityRoute := slice $pathRoutes 0 $index }}
+{{- if and (not $winner) (regexMatch (index $higherPriorityRoute 0) $path) }}
+{{- $winner = index $higherPriorityRoute 1 }}
+{{- end }}
+{{- end }}
+{{- $_ := set $exactPaths $path true }}
+{{- $exact = append $exact (list $path ($winner | default $workerType)) }}
+{{- end }}
+{{- else if $shadowed }}
+{{- $allRegex = false }}
+{{- else if and (regexMatch $prefixRoute $variant) (not $conflicts) }}
+{{- $allRegex = false }}
+{{- $prefix = append $prefix (list $stem $workerType) }}
+{{- else }}
+{{- $regexVariants = append $regexVariants $variant }}
+{{- $regexStems = append $regexStems (list $stem $workerType) }}
+{{- end }}
+{{- end }}
+
+{{- if $allRegex }}
+{{- $regex = append $regex (list $route $workerType) }}
+{{- else }}
+{{- range $regexVariants }}
+{{- $regex = append $regex (list . $workerType) }}
+{{- end }}
+{{- end }}
+{{- end }}
+{{ dict "exact" $exact "prefix" $prefix "regex" $regex | toJson }}
+{{- end }}
@@ -1,5 +1,5 @@
 // Copyright 2025 New Vector Ltd
-// Copyright 2025 Element Creations Ltd
+// Copyright 2025-2026 Element Creations Ltd
 //
 // SPDX-License-Identifier: AGPL-3.0-only
 
@@ -11,6 +11,7 @@ import (
 
 	deploymentmarkers "github.com/element-hq/ess-helm/matrix-tools/internal/cmd/deployment-markers"
 	generatesecrets "github.com/element-hq/ess-helm/matrix-tools/internal/cmd/generate-secrets"
+	haproxyreload "github.com/element-hq/ess-helm/matrix-tools/internal/cmd/haproxy-reload"
 	renderconfig "github.com/element-hq/ess-helm/matrix-tools/internal/cmd/render-config"
 	"github.com/element-hq/ess-helm/matrix-tools/internal/cmd/syn2mas"
 	"github.com/element-hq/ess-helm/matrix-tools/internal/cmd/tcpwait"
@@ -35,6 +36,8 @@ func main() {
 		generatesecrets.Run(options.GenerateSecrets)
 	case args.DeploymentMarkers:
 		deploymentmarkers.Run(options.DeploymentMarkers)
+	case args.HAProxyReload:
+		haproxyreload.Run(options.HAProxyReload)
 	default:
 		fmt.Printf("Unknown command")
 		os.Exit(1)
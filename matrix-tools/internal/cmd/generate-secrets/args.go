@@ -20,6 +20,7 @@ const (
 type GenerateSecretsOptions struct {
 	GeneratedSecrets []GeneratedSecret
 	Labels           map[string]string
+	Digest           string
 }
 
 type GeneratedSecret struct {
@@ -55,6 +56,7 @@ func ParseArgs(args []string) (*GenerateSecretsOptions, error) {
 	generateSecretsSet := flag.NewFlagSet("generate-secrets", flag.ExitOnError)
 	secrets := generateSecretsSet.String("secrets", "", "Comma-separated list of secrets to generate, in the format of `name:key:type:args if required`, where `type` is one of: rand32, signingkey, hex32, rsa:<bits>:<der or pem>, ecdsaprime256v1")
 	secretsLabels := generateSecretsSet.String("labels", "", "Comma-separated list of labels for generated secrets, in the format of `key=value`")
+	digest := generateSecretsSet.String("digest", "", "Digest of the secrets & labels requested. Generation is skipped if the secrets have already been generated with this digest")
 
 	err := generateSecretsSet.Parse(args)
 	if err != nil {
@@ -85,5 +87,6 @@ func ParseArgs(args []string) (*GenerateSecretsOptions, error) {
 		}
 	}
 	options.Labels["app.kubernetes.io/managed-by"] = "matrix-tools-init-secrets"
+	options.Digest = *digest
 	return &options, nil
 }
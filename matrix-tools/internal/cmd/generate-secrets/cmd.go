@@ -8,6 +8,7 @@ package generatesecrets
 import (
 	"fmt"
 	"os"
+	"slices"
 
 	"github.com/element-hq/ess-helm/matrix-tools/internal/pkg/secret"
 	"github.com/element-hq/ess-helm/matrix-tools/internal/pkg/util"
@@ -26,6 +27,20 @@ func Run(options *GenerateSecretsOptions) {
 		os.Exit(1)
 	}
 
+	secretNames := make([]string, 0)
+	for _, generatedSecret := range options.GeneratedSecrets {
+		if !slices.Contains(secretNames, generatedSecret.Name) {
+			secretNames = append(secretNames, generatedSecret.Name)
+		}
+	}
+
+	if options.Digest != "" && !slices.ContainsFunc(secretNames, func(name string) bool {
+		return !secret.HasDigest(clientset, namespace, name, options.Digest)
+	}) {
+		fmt.Printf("Secrets are already generated for digest %s\n", options.Digest)
+		return
+	}
+
 	for _, generatedSecret := range options.GeneratedSecrets {
 		err := secret.GenerateSecret(clientset, options.Labels, namespace,
 			generatedSecret.Name, generatedSecret.Key, generatedSecret.Type, generatedSecret.GeneratorArgs)
@@ -35,4 +50,14 @@ func Run(options *GenerateSecretsOptions) {
 			os.Exit(1)
 		}
 	}
+
+	if options.Digest != "" {
+		for _, secretName := range secretNames {
+			if err := secret.SetDigest(clientset, namespace, secretName, options.Digest); err != nil {
+				wrappedErr := errors.Wrapf(err, "error recording digest on secret: %s", secretName)
+				fmt.Println("Error:", wrappedErr)
+				os.Exit(1)
+			}
+		}
+	}
 }
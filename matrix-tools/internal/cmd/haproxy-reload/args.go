@@ -0,0 +1,57 @@
+// Copyright 2026 Element Creations Ltd
+//
+// SPDX-License-Identifier: AGPL-3.0-only
+
+package haproxyreload
+
+import (
+	"flag"
+	"fmt"
+	"strings"
+	"time"
+)
+
+const (
+	FlagSetName = "haproxy-reload"
+)
+
+type HAProxyReloadOptions struct {
+	MasterSocket  string
+	Interval      time.Duration
+	HealthAddress string
+	Directories   []string
+}
+
+func ParseArgs(args []string) (*HAProxyReloadOptions, error) {
+	var options HAProxyReloadOptions
+
+	haproxyReloadSet := flag.NewFlagSet(FlagSetName, flag.ExitOnError)
+	masterSocket := haproxyReloadSet.String("master-socket", "", "Path to the HAProxy master CLI Unix socket to send reloads to")
+	interval := haproxyReloadSet.Duration("interval", 5*time.Second, "How often to check the configuration directories for changes")
+	healthAddress := haproxyReloadSet.String("health-address", ":8407", "Address to serve the /healthz probe endpoint on")
+
+	err := haproxyReloadSet.Parse(args)
+	if err != nil {
+		return nil, err
+	}
+	for _, directory := range haproxyReloadSet.Args() {
+		if strings.HasPrefix(directory, "-") {
+			return nil, flag.ErrHelp
+		}
+		options.Directories = append(options.Directories, directory)
+	}
+	options.MasterSocket = *masterSocket
+	if *masterSocket == "" {
+		return nil, fmt.Errorf("master-socket is required")
+	}
+	if len(options.Directories) == 0 {
+		return nil, fmt.Errorf("at least one directory to watch is required")
+	}
+	options.Interval = *interval
+	if *interval <= 0 {
+		return nil, fmt.Errorf("interval must be positive")
+	}
+	options.HealthAddress = *healthAddress
+
+	return &options, nil
+}
@@ -0,0 +1,47 @@
+// Copyright 2026 Element Creations Ltd
+//
+// SPDX-License-Identifier: AGPL-3.0-only
+
+package haproxyreload
+
+import (
+	"context"
+	"errors"
+	"fmt"
+	"net/http"
+	"os"
+	"os/signal"
+	"syscall"
+
+	"github.com/element-hq/ess-helm/matrix-tools/internal/pkg/haproxyreload"
+)
+
+func Run(options *HAProxyReloadOptions) {
+	ctx, stop := signal.NotifyContext(context.Background(), syscall.SIGINT, syscall.SIGTERM)
+	defer stop()
+
+	// The sidecar has nothing useful to report beyond being alive: a rejected configuration
+	// leaves HAProxy serving the previous one, so it mustn't take the Pod out of rotation
+	mux := http.NewServeMux()
+	mux.HandleFunc("/healthz", func(w http.ResponseWriter, r *http.Request) {
+		w.WriteHeader(http.StatusOK)
+	})
+	server := &http.Server{Addr: options.HealthAddress, Handler: mux}
+	go func() {
+		if err := server.ListenAndServe(); err != nil && !errors.Is(err, http.ErrServerClosed) {
+			fmt.Println("Error serving health endpoint:", err)
+			os.Exit(1)
+		}
+	}()
+	defer server.Close()
+
+	reloader := haproxyreload.Reloader{
+		MasterSocket: options.MasterSocket,
+		Directories:  options.Directories,
+		Interval:     options.Interval,
+	}
+	if err := reloader.Watch(ctx); err != nil {
+		fmt.Println("Error:", err)
+		os.Exit(1)
+	}
+}
@@ -1,5 +1,5 @@
 // Copyright 2025 New Vector Ltd
-// Copyright 2025 Element Creations Ltd
+// Copyright 2025-2026 Element Creations Ltd
 //
 // SPDX-License-Identifier: AGPL-3.0-only
 
@@ -10,6 +10,7 @@ import (
 
 	deploymentmarkers "github.com/element-hq/ess-helm/matrix-tools/internal/cmd/deployment-markers"
 	generatesecrets "github.com/element-hq/ess-helm/matrix-tools/internal/cmd/generate-secrets"
+	haproxyreload "github.com/element-hq/ess-helm/matrix-tools/internal/cmd/haproxy-reload"
 	renderconfig "github.com/element-hq/ess-helm/matrix-tools/internal/cmd/render-config"
 	"github.com/element-hq/ess-helm/matrix-tools/internal/cmd/syn2mas"
 	"github.com/element-hq/ess-helm/matrix-tools/internal/cmd/tcpwait"
@@ -23,6 +24,7 @@ const (
 	DeploymentMarkers
 	Syn2Mas
 	TCPWait
+	HAProxyReload
 )
 
 type Options struct {
@@ -32,6 +34,7 @@ type Options struct {
 	DeploymentMarkers *deploymentmarkers.DeploymentMarkersOptions
 	Syn2Mas           *syn2mas.Syn2MasOptions
 	TcpWait           *tcpwait.TcpWaitOptions
+	HAProxyReload     *haproxyreload.HAProxyReloadOptions
 }
 
 func ParseArgs(args []string) (*Options, error) {
@@ -73,6 +76,13 @@ func ParseArgs(args []string) (*Options, error) {
 			return nil, err
 		}
 		options.DeploymentMarkers = deploymentMarkersOptions
+	case haproxyreload.FlagSetName:
+		options.Command = HAProxyReload
+		haproxyReloadOptions, err := haproxyreload.ParseArgs(args[2:])
+		if err != nil {
+			return nil, err
+		}
+		options.HAProxyReload = haproxyReloadOptions
 	default:
 		return nil, flag.ErrHelp
 	}
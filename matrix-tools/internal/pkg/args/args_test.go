@@ -7,11 +7,13 @@ package args
 
 import (
 	"testing"
+	"time"
 
 	"github.com/stretchr/testify/assert"
 
 	deploymentmarkers "github.com/element-hq/ess-helm/matrix-tools/internal/cmd/deployment-markers"
 	generatesecrets "github.com/element-hq/ess-helm/matrix-tools/internal/cmd/generate-secrets"
+	haproxyreload "github.com/element-hq/ess-helm/matrix-tools/internal/cmd/haproxy-reload"
 	renderconfig "github.com/element-hq/ess-helm/matrix-tools/internal/cmd/render-config"
 	"github.com/element-hq/ess-helm/matrix-tools/internal/cmd/syn2mas"
 	"github.com/element-hq/ess-helm/matrix-tools/internal/cmd/tcpwait"
@@ -109,6 +111,21 @@ func TestParseArgs(t *testing.T) {
 			err: false,
 		},
 
+		{
+			name: "Correct usage of generate-secrets with a digest",
+			args: []string{"cmd", "generate-secrets", "-secrets", "secret1:value1:rand32", "-labels", "mykey=myval", "-digest", "abc123"},
+			expected: &Options{
+				GenerateSecrets: &generatesecrets.GenerateSecretsOptions{
+					GeneratedSecrets: []generatesecrets.GeneratedSecret{
+						{ArgValue: "secret1:value1:rand32", Name: "secret1", Key: "value1", Type: secret.Rand32, GeneratorArgs: make([]string, 0)},
+					},
+					Labels: map[string]string{"app.kubernetes.io/managed-by": "matrix-tools-init-secrets", "mykey": "myval"},
+					Digest: "abc123",
+				},
+				Command: GenerateSecrets,
+			},
+			err: false,
+		},
 		{
 			name: "Multiple generated secrets",
 			args: []string{"cmd", "generate-secrets", "-secrets", "secret1:value1:rand32,secret2:value2:signingkey,secret3:value3:registration:/registration-templates/registration.yaml"},
@@ -217,6 +234,46 @@ func TestParseArgs(t *testing.T) {
 			},
 			err: true,
 		},
+		{
+			name: "Correct usage of haproxy-reload",
+			args: []string{"cmd", "haproxy-reload", "-master-socket", "/haproxy-run/master.sock", "-interval", "10s", "-health-address", ":9000", "/usr/local/etc/haproxy", "/synapse"},
+			expected: &Options{
+				HAProxyReload: &haproxyreload.HAProxyReloadOptions{
+					MasterSocket:  "/haproxy-run/master.sock",
+					Interval:      10 * time.Second,
+					HealthAddress: ":9000",
+					Directories:   []string{"/usr/local/etc/haproxy", "/synapse"},
+				},
+				Command: HAProxyReload,
+			},
+			err: false,
+		},
+		{
+			name: "Default interval of haproxy-reload",
+			args: []string{"cmd", "haproxy-reload", "-master-socket", "/haproxy-run/master.sock", "/usr/local/etc/haproxy"},
+			expected: &Options{
+				HAProxyReload: &haproxyreload.HAProxyReloadOptions{
+					MasterSocket:  "/haproxy-run/master.sock",
+					Interval:      5 * time.Second,
+					HealthAddress: ":8407",
+					Directories:   []string{"/usr/local/etc/haproxy"},
+				},
+				Command: HAProxyReload,
+			},
+			err: false,
+		},
+		{
+			name:     "Missing directories for haproxy-reload",
+			args:     []string{"cmd", "haproxy-reload", "-master-socket", "/haproxy-run/master.sock"},
+			expected: &Options{},
+			err:      true,
+		},
+		{
+			name:     "Missing master socket for haproxy-reload",
+			args:     []string{"cmd", "haproxy-reload", "/usr/local/etc/haproxy"},
+			expected: &Options{},
+			err:      true,
+		},
 	}
 
 	for _, tc := range testCases {
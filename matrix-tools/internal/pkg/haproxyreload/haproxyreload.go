@@ -0,0 +1,158 @@
+// Copyright 2026 Element Creations Ltd
+//
+// SPDX-License-Identifier: AGPL-3.0-only
+
+package haproxyreload
+
+import (
+	"context"
+	"crypto/sha256"
+	"encoding/hex"
+	"errors"
+	"fmt"
+	"io"
+	"net"
+	"os"
+	"path/filepath"
+	"strings"
+	"time"
+)
+
+// ReloadTimeout is how long HAProxy has to parse its new configuration and start its new workers
+const ReloadTimeout = 30 * time.Second
+
+// ErrConfigurationRejected is returned when HAProxy couldn't load its new configuration.
+// The existing workers carry on serving with the previous configuration.
+var ErrConfigurationRejected = errors.New("HAProxy rejected the new configuration")
+
+// Fingerprint hashes the contents of the files in the given directories.
+//
+// Kubelet projects ConfigMaps as symlinks into a `..data` directory that it atomically swaps on update.
+// Entries starting with `..` are its bookkeeping and are skipped, the files are read through their symlinks.
+func Fingerprint(directories []string) (string, error) {
+	hash := sha256.New()
+	for _, directory := range directories {
+		entries, err := os.ReadDir(directory)
+		if err != nil {
+			return "", err
+		}
+		for _, entry := range entries {
+			if strings.HasPrefix(entry.Name(), "..") {
+				continue
+			}
+			path := filepath.Join(directory, entry.Name())
+			info, err := os.Stat(path)
+			if err != nil {
+				return "", err
+			}
+			if info.IsDir() {
+				continue
+			}
+			contents, err := os.ReadFile(path)
+			if err != nil {
+				return "", err
+			}
+			fmt.Fprintf(hash, "%s\x00%d\x00", path, len(contents))
+			hash.Write(contents)
+		}
+	}
+	return hex.EncodeToString(hash.Sum(nil)), nil
+}
+
+// Reload asks the HAProxy master process to reload over its master CLI socket.
+//
+// The master re-executes HAProxy which validates and loads the configuration from disk. The listening sockets are
+// handed over to the new workers and the old workers finish their in-flight connections before exiting, so no
+// connections are dropped. The master replies with whether it succeeded, followed by HAProxy's startup logs.
+func Reload(socketPath string, timeout time.Duration) (string, error) {
+	conn, err := net.DialTimeout("unix", socketPath, timeout)
+	if err != nil {
+		return "", err
+	}
+	defer func() {
+		if err := conn.Close(); err != nil {
+			fmt.Println("Error closing the HAProxy master socket:", err)
+		}
+	}()
+
+	if err := conn.SetDeadline(time.Now().Add(timeout)); err != nil {
+		return "", err
+	}
+	if _, err := conn.Write([]byte("reload\n")); err != nil {
+		return "", err
+	}
+	response, err := io.ReadAll(conn)
+	output := string(response)
+	if err != nil {
+		return output, err
+	}
+
+	status, _, _ := strings.Cut(output, "\n")
+	switch strings.TrimSpace(status) {
+	case "Success=1":
+		return output, nil
+	case "Success=0":
+		return output, ErrConfigurationRejected
+	default:
+		return output, fmt.Errorf("unexpected response from the HAProxy master socket: %q", status)
+	}
+}
+
+// Reloader reloads HAProxy whenever the configuration in any of Directories changes
+type Reloader struct {
+	MasterSocket string
+	Directories  []string
+	Interval     time.Duration
+}
+
+// Watch polls the configuration every Interval until the context is done.
+//
+// Each ConfigMap is updated by kubelet independently, so a change has to be unchanged for an Interval before HAProxy is
+// reloaded. If HAProxy rejects a configuration it isn't retried until the configuration changes again, whereas if
+// HAProxy couldn't be reached the reload is retried every Interval.
+func (r *Reloader) Watch(ctx context.Context) error {
+	loaded, err := Fingerprint(r.Directories)
+	if err != nil {
+		return err
+	}
+	fmt.Printf("Watching %s for HAProxy configuration changes\n", strings.Join(r.Directories, ", "))
+
+	ticker := time.NewTicker(r.Interval)
+	defer ticker.Stop()
+	pending := ""
+	rejected := ""
+	for {
+		select {
+		case <-ctx.Done():
+			return nil
+		case <-ticker.C:
+		}
+
+		current, err := Fingerprint(r.Directories)
+		if err != nil {
+			fmt.Println("Error reading the HAProxy configuration:", err)
+			continue
+		}
+		if current == loaded || current == rejected {
+			pending = ""
+			continue
+		}
+		if current != pending {
+			pending = current
+			continue
+		}
+
+		output, err := Reload(r.MasterSocket, ReloadTimeout)
+		if errors.Is(err, ErrConfigurationRejected) {
+			fmt.Printf("HAProxy continues with its previous configuration as it rejected the new one:\n%s\n", output)
+			rejected = current
+			continue
+		} else if err != nil {
+			fmt.Println("Error reloading HAProxy, will retry:", err)
+			continue
+		}
+		fmt.Printf("HAProxy reloaded with configuration %s\n", current)
+		loaded = current
+		pending = ""
+	}
+}
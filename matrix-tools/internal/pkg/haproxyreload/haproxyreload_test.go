@@ -0,0 +1,177 @@
+// Copyright 2026 Element Creations Ltd
+//
+// SPDX-License-Identifier: AGPL-3.0-only
+
+package haproxyreload
+
+import (
+	"bufio"
+	"context"
+	"errors"
+	"net"
+	"os"
+	"path/filepath"
+	"sync/atomic"
+	"testing"
+	"time"
+)
+
+// fakeMaster listens like the HAProxy master CLI, replying to each reload with the given status
+func fakeMaster(t *testing.T, status string) (string, *atomic.Int32) {
+	socketPath := filepath.Join(t.TempDir(), "master.sock")
+	listener, err := net.Listen("unix", socketPath)
+	if err != nil {
+		t.Fatalf("Failed to start listener: %v", err)
+	}
+	t.Cleanup(func() {
+		_ = listener.Close()
+	})
+
+	reloads := &atomic.Int32{}
+	go func() {
+		for {
+			conn, err := listener.Accept()
+			if err != nil {
+				return
+			}
+			command, err := bufio.NewReader(conn).ReadString('\n')
+			if err == nil && command == "reload\n" {
+				reloads.Add(1)
+				_, _ = conn.Write([]byte(status + "\n--\n[NOTICE]   (1) : Loading success.\n"))
+			}
+			_ = conn.Close()
+		}
+	}()
+	return socketPath, reloads
+}
+
+// writeConfigMap lays out files like kubelet does, with the visible files being symlinks into `..data`
+func writeConfigMap(t *testing.T, directory string, files map[string]string) {
+	version := filepath.Join(directory, ".."+time.Now().Format("2006_01_02_15_04_05.000000000"))
+	if err := os.MkdirAll(version, 0o755); err != nil {
+		t.Fatal(err)
+	}
+	for name, contents := range files {
+		if err := os.WriteFile(filepath.Join(version, name), []byte(contents), 0o644); err != nil {
+			t.Fatal(err)
+		}
+	}
+	dataLink := filepath.Join(directory, "..data_tmp")
+	if err := os.Symlink(filepath.Base(version), dataLink); err != nil {
+		t.Fatal(err)
+	}
+	if err := os.Rename(dataLink, filepath.Join(directory, "..data")); err != nil {
+		t.Fatal(err)
+	}
+	for name := range files {
+		link := filepath.Join(directory, name)
+		if _, err := os.Lstat(link); err == nil {
+			continue
+		}
+		if err := os.Symlink(filepath.Join("..data", name), link); err != nil {
+			t.Fatal(err)
+		}
+	}
+}
+
+func TestFingerprintFollowsConfigMapUpdates(t *testing.T) {
+	directory := t.TempDir()
+	writeConfigMap(t, directory, map[string]string{"haproxy.cfg": "global\n", "path_map_file": "/a main\n"})
+	first, err := Fingerprint([]string{directory})
+	if err != nil {
+		t.Fatal(err)
+	}
+	again, err := Fingerprint([]string{directory})
+	if err != nil {
+		t.Fatal(err)
+	}
+	if first != again {
+		t.Errorf("Fingerprint changed without the files changing: %s != %s", first, again)
+	}
+
+	writeConfigMap(t, directory, map[string]string{"haproxy.cfg": "global\n", "path_map_file": "/b main\n"})
+	updated, err := Fingerprint([]string{directory})
+	if err != nil {
+		t.Fatal(err)
+	}
+	if first == updated {
+		t.Errorf("Fingerprint didn't change when the ConfigMap was updated")
+	}
+}
+
+func TestReload(t *testing.T) {
+	socketPath, reloads := fakeMaster(t, "Success=1")
+	output, err := Reload(socketPath, time.Second)
+	if err != nil {
+		t.Fatalf("Reload failed: %v", err)
+	}
+	if reloads.Load() != 1 {
+		t.Errorf("Expected 1 reload, got %d", reloads.Load())
+	}
+	if output == "" {
+		t.Errorf("Expected the startup logs to be returned")
+	}
+
+	socketPath, _ = fakeMaster(t, "Success=0")
+	if _, err := Reload(socketPath, time.Second); !errors.Is(err, ErrConfigurationRejected) {
+		t.Errorf("Expected ErrConfigurationRejected, got %v", err)
+	}
+
+	if _, err := Reload(filepath.Join(t.TempDir(), "missing.sock"), time.Second); err == nil {
+		t.Errorf("Expected an error when HAProxy isn't listening")
+	}
+}
+
+func TestWatchReloadsOnceChangesSettle(t *testing.T) {
+	directory := t.TempDir()
+	writeConfigMap(t, directory, map[string]string{"haproxy.cfg": "global\n"})
+	socketPath, reloads := fakeMaster(t, "Success=1")
+
+	ctx, cancel := context.WithCancel(context.Background())
+	defer cancel()
+	reloader := Reloader{MasterSocket: socketPath, Directories: []string{directory}, Interval: 10 * time.Millisecond}
+	done := make(chan error)
+	go func() {
+		done <- reloader.Watch(ctx)
+	}()
+
+	time.Sleep(100 * time.Millisecond)
+	if reloads.Load() != 0 {
+		t.Fatalf("Reloaded without the configuration changing")
+	}
+
+	writeConfigMap(t, directory, map[string]string{"haproxy.cfg": "global\n  maxconn 100\n"})
+	deadline := time.Now().Add(5 * time.Second)
+	for reloads.Load() == 0 && time.Now().Before(deadline) {
+		time.Sleep(10 * time.Millisecond)
+	}
+	time.Sleep(100 * time.Millisecond)
+	if reloads.Load() != 1 {
+		t.Errorf("Expected exactly 1 reload after the configuration changed, got %d", reloads.Load())
+	}
+
+	cancel()
+	if err := <-done; err != nil {
+		t.Errorf("Watch returned an error: %v", err)
+	}
+}
+
+func TestWatchDoesntRetryRejectedConfiguration(t *testing.T) {
+	directory := t.TempDir()
+	writeConfigMap(t, directory, map[string]string{"haproxy.cfg": "global\n"})
+	socketPath, reloads := fakeMaster(t, "Success=0")
+
+	ctx, cancel := context.WithTimeout(context.Background(), 300*time.Millisecond)
+	defer cancel()
+	reloader := Reloader{MasterSocket: socketPath, Directories: []string{directory}, Interval: 10 * time.Millisecond}
+	go func() {
+		time.Sleep(20 * time.Millisecond)
+		writeConfigMap(t, directory, map[string]string{"haproxy.cfg": "invalid\n"})
+	}()
+	if err := reloader.Watch(ctx); err != nil {
+		t.Fatalf("Watch returned an error: %v", err)
+	}
+	if reloads.Load() != 1 {
+		t.Errorf("Expected the rejected configuration to be tried once, got %d reloads", reloads.Load())
+	}
+}
@@ -31,6 +31,9 @@ const (
 	EcdsaPrime256v1
 )
 
+// DigestLabel records the digest of the full list of secrets requested from a Secret once they've all been generated
+const DigestLabel = "k8s.element.io/init-secrets-hash"
+
 func GenerateSecret(client kubernetes.Interface, secretLabels map[string]string,
 	namespace string, name string, key string, secretType SecretType, generatorArgs []string) error {
 	ctx := context.Background()
@@ -119,6 +122,36 @@ func GenerateSecret(client kubernetes.Interface, secretLabels map[string]string,
 	return nil
 }
 
+// HasDigest reports whether the Secret exists and was last completely generated from a request list with this digest
+func HasDigest(client kubernetes.Interface, namespace string, name string, digest string) bool {
+	existingSecret, err := client.CoreV1().Secrets(namespace).Get(context.Background(), name, metav1.GetOptions{})
+	if err != nil {
+		return false
+	}
+	return existingSecret.Labels[DigestLabel] == digest
+}
+
+// SetDigest labels the Secret with the digest of the request list that has been completely generated into it.
+// GenerateSecret resets the labels on every update, so a partially generated Secret never carries a digest
+func SetDigest(client kubernetes.Interface, namespace string, name string, digest string) error {
+	ctx := context.Background()
+
+	secretsClient := client.CoreV1().Secrets(namespace)
+	existingSecret, err := secretsClient.Get(ctx, name, metav1.GetOptions{})
+	if err != nil {
+		return fmt.Errorf("failed to get secret: %w", err)
+	}
+	if existingSecret.Labels == nil {
+		existingSecret.Labels = make(map[string]string)
+	}
+	existingSecret.Labels[DigestLabel] = digest
+	_, err = secretsClient.Update(ctx, existingSecret, metav1.UpdateOptions{})
+	if err != nil {
+		return fmt.Errorf("failed to update secret: %w", err)
+	}
+	return nil
+}
+
 func generateRandomString(size int) ([]byte, error) {
 	const charset = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
 	bytes := make([]byte, size)
@@ -206,3 +206,41 @@ func TestGenerateSecret(t *testing.T) {
 		})
 	}
 }
+
+func TestDigest(t *testing.T) {
+	client := testclient.NewClientset()
+	namespace := "digest"
+	labels := map[string]string{"app.kubernetes.io/managed-by": "matrix-tools-init-secrets"}
+
+	if HasDigest(client, namespace, "test-secret", "digest1") {
+		t.Fatalf("HasDigest() is true for a secret that doesn't exist")
+	}
+	if err := SetDigest(client, namespace, "test-secret", "digest1"); err == nil {
+		t.Fatalf("SetDigest() error is nil for a secret that doesn't exist")
+	}
+
+	if err := GenerateSecret(client, labels, namespace, "test-secret", "key1", Rand32, make([]string, 0)); err != nil {
+		t.Fatalf("GenerateSecret() error = %v, want nil", err)
+	}
+	if HasDigest(client, namespace, "test-secret", "digest1") {
+		t.Fatalf("HasDigest() is true before the digest has been set")
+	}
+
+	if err := SetDigest(client, namespace, "test-secret", "digest1"); err != nil {
+		t.Fatalf("SetDigest() error = %v, want nil", err)
+	}
+	if !HasDigest(client, namespace, "test-secret", "digest1") {
+		t.Fatalf("HasDigest() is false after the digest has been set")
+	}
+	if HasDigest(client, namespace, "test-secret", "digest2") {
+		t.Fatalf("HasDigest() is true for a different digest")
+	}
+
+	// Generating further keys must drop the digest until they've all been generated
+	if err := GenerateSecret(client, labels, namespace, "test-secret", "key2", Rand32, make([]string, 0)); err != nil {
+		t.Fatalf("GenerateSecret() error = %v, want nil", err)
+	}
+	if HasDigest(client, namespace, "test-secret", "digest1") {
+		t.Fatalf("HasDigest() is true after the secret has been regenerated without a digest")
+	}
+}
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
 # Copyright 2025 New Vector Ltd
-# Copyright 2025 Element Creations Ltd
+# Copyright 2025-2026 Element Creations Ltd
 #
 # SPDX-License-Identifier: AGPL-3.0-only
 
@@ -18,6 +18,57 @@ copyright_pattern = re.compile(r"^Copyright (?P<from>20\d{2})(-(?P<to>20\d{2}))?
 # REUSE-IgnoreEnd
 
 
+def check_file_details(name: str, textual_licenses: list[str], copyright_text: str) -> list[str]:
+    failure_messages = []
+    if len(textual_licenses) != 1:
+        failure_messages.append(f'{name} should have exactly 1 license. It has "{", ".join(textual_licenses)}"')
+        return failure_messages
+
+    if set(["AGPL-3.0-only"]) != set(textual_licenses):
+        failure_messages.append(f'{name} has an unexpected licenses. It has "{", ".join(textual_licenses)}"')
+
+    has_element_copyright = False
+    copyrights = copyright_text.splitlines()
+    for copyright in copyrights:
+        copyright_details = copyright_pattern.match(copyright)
+        if copyright_details is None:
+            continue
+
+        from_year = int(copyright_details.group("from"))
+        to_year = copyright_details.group("to")
+        to_year = int(to_year) if to_year else from_year
+
+        entity = copyright_details.group("entity")
+        if entity in ["Element Creations Ltd"]:
+            has_element_copyright = True
+
+        # REUSE-IgnoreStart
+        if entity == "New Vector Ltd":
+            if from_year > 2025:
+                failure_messages.append(
+                    f'{name} has a New Vector Copyright header starting after the entity rename. It has "{copyright}"'
+                )
+            if to_year > 2025:
+                failure_messages.append(
+                    f'{name} has a New Vector Copyright header ending after the entity rename. It has "{copyright}"'
+                )
+
+        if entity == "Element Creations Ltd":
+            if from_year < 2025:
+                failure_messages.append(
+                    f'{name} has a Element Copyright header starting before the entity rename. It has "{copyright}"'
+                )
+            if to_year < 2025:
+                failure_messages.append(
+                    f'{name} has a Element Copyright header ending before the entity rename. It has "{copyright}"'
+                )
+
+    if not has_element_copyright:
+        failure_messages.append(f'{name} doesn\'t have an Element Copyright header. It has "{copyright_text}"')
+    # REUSE-IgnoreEnd
+    return failure_messages
+
+
 def run_spdx_checks(input_file: Annotated[typer.FileText, typer.Argument()]):
     parser = Parser()
 
@@ -25,60 +76,7 @@ def run_spdx_checks(input_file: Annotated[typer.FileText, typer.Argument()]):
     failure_messages = []
     for file in document.files:
         textual_licenses = [license.render() for license in file.license_info_in_file]
-        if len(textual_licenses) != 1:
-            failure_messages.append(
-                f'{file.name} should have exactly 1 license. It has "{", ".join(textual_licenses)}"'
-            )
-            continue
-
-        if set(["AGPL-3.0-only"]) != set(textual_licenses):
-            failure_messages.append(f'{file.name} has an unexpected licenses. It has "{", ".join(textual_licenses)}"')
-
-        has_element_copyright = False
-        copyrights = file.copyright_text.splitlines()
-        for copyright in copyrights:
-            copyright_details = copyright_pattern.match(copyright)
-            if copyright_details is None:
-                continue
-
-            from_year = int(copyright_details.group("from"))
-            to_year = copyright_details.group("to")
-            to_year = int(to_year) if to_year else from_year
-
-            entity = copyright_details.group("entity")
-            if entity in ["Element Creations Ltd"]:
-                has_element_copyright = True
-
-            # REUSE-IgnoreStart
-            if entity == "New Vector Ltd":
-                if from_year > 2025:
-                    failure_messages.append(
-                        f"{file.name} has a New Vector Copyright header starting after the entity rename. "
-                        f'It has "{copyright}"'
-                    )
-                if to_year > 2025:
-                    failure_messages.append(
-                        f"{file.name} has a New Vector Copyright header ending after the entity rename. "
-                        f'It has "{copyright}"'
-                    )
-
-            if entity == "Element Creations Ltd":
-                if from_year < 2025:
-                    failure_messages.append(
-                        f"{file.name} has a Element Copyright header starting before the entity rename. "
-                        f'It has "{copyright}"'
-                    )
-                if to_year < 2025:
-                    failure_messages.append(
-                        f"{file.name} has a Element Copyright header ending before the entity rename. "
-                        f'It has "{copyright}"'
-                    )
-
-        if not has_element_copyright:
-            failure_messages.append(
-                f'{file.name} doesn\'t have an Element Copyright header. It has "{file.copyright_text}"'
-            )
-        # REUSE-IgnoreEnd
+        failure_messages += check_file_details(file.name, textual_licenses, file.copyright_text)
 
     for failure_message in failure_messages:
         print(failure_message)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+# Runs the same checks as spdx_check_all_files.py but without needing a full `reuse spdx` document.
+#
+# Each file's verdict is cached against the git blob hash of the file (and of its .license
+# sidecar if it has one). Only files whose blob has changed since the last run have their
+# licensing information re-parsed. Any change to REUSE.toml or to the checks themselves
+# invalidates the whole cache.
+
+import hashlib
+import json
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from reuse.project import Project
+from reuse.report import FileReport
+from spdx_check_all_files import check_file_details
+
+CACHE_VERSION = 1
+
+
+def git_blob_hashes(root: Path, paths: list[str]) -> dict[str, str]:
+    # Unmodified tracked files can have their blob hash read straight from the index
+    blob_hashes = {}
+    ls_files = subprocess.run(
+        ["git", "ls-files", "--stage", "-z"], cwd=root, check=True, capture_output=True, text=True
+    )
+    for entry in ls_files.stdout.split("\0"):
+        if not entry:
+            continue
+        details, path = entry.split("\t", 1)
+        blob_hashes[path] = details.split()[1]
+
+    modified = subprocess.run(
+        ["git", "ls-files", "--modified", "-z"], cwd=root, check=True, capture_output=True, text=True
+    )
+    for path in modified.stdout.split("\0"):
+        blob_hashes.pop(path, None)
+
+    # Anything modified or untracked needs hashing as it is on disk, including .license sidecars
+    candidates = paths + [f"{path}.license" for path in paths] + ["REUSE.toml"]
+    to_hash = [path for path in candidates if path not in blob_hashes and (root / path).is_file()]
+    if to_hash:
+        hash_object = subprocess.run(
+            ["git", "hash-object", "--no-filters", "--stdin-paths"],
+            cwd=root,
+            check=True,
+            capture_output=True,
+            text=True,
+            input="\n".join(to_hash) + "\n",
+        )
+        blob_hashes.update(zip(to_hash, hash_object.stdout.splitlines(), strict=True))
+    return blob_hashes
+
+
+def cache_key(blob_hashes: dict[str, str]) -> str:
+    # Changes to REUSE.toml or to how files are checked can change the verdict of any file
+    hasher = hashlib.sha256(str(CACHE_VERSION).encode())
+    hasher.update(blob_hashes.get("REUSE.toml", "").encode())
+    scripts_dir = Path(__file__).parent
+    for script in ["spdx_check_all_files.py", "spdx_check_cached.py"]:
+        hasher.update((scripts_dir / script).read_bytes())
+    return hasher.hexdigest()
+
+
+def file_blob_key(path: str, blob_hashes: dict[str, str]) -> str:
+    return f"{blob_hashes.get(path, '')}:{blob_hashes.get(f'{path}.license', '')}"
+
+
+def check_file(project: Project, path: str) -> list[str]:
+    file_report = FileReport.generate(project, path, do_checksum=False)
+    return check_file_details(file_report.name, file_report.licenses_in_file, file_report.copyright)
+
+
+def load_cache(cache_file: Path, key: str) -> dict[str, dict]:
+    if not cache_file.exists():
+        return {}
+    try:
+        cache = json.loads(cache_file.read_text())
+    except json.JSONDecodeError:
+        return {}
+    if cache.get("key") != key:
+        return {}
+    return cache.get("files", {})
+
+
+def run_cached_spdx_checks(
+    cache_file: Annotated[Path, typer.Option(help="Where to store per-file verdicts")] = Path(".spdx_check_cache.json"),
+    jobs: Annotated[int | None, typer.Option(help="Number of parallel processes checking files")] = None,
+):
+    project = Project.from_directory(".")
+    root = Path(project.root)
+    paths = sorted(str(project.relative_from_root(path)) for path in project.all_files())
+
+    blob_hashes = git_blob_hashes(root, paths)
+    key = cache_key(blob_hashes)
+    cached_files = load_cache(cache_file, key)
+
+    verdicts = {}
+    to_check = []
+    for path in paths:
+        cached = cached_files.get(path)
+        if cached is not None and cached["blob"] == file_blob_key(path, blob_hashes):
+            verdicts[path] = cached["failures"]
+        else:
+            to_check.append(path)
+
+    if to_check:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = executor.map(partial(check_file, project), to_check, chunksize=16)
+            verdicts.update(zip(to_check, results, strict=True))
+
+    cache_file.write_text(
+        json.dumps(
+            {
+                "key": key,
+                "files": {
+                    path: {"blob": file_blob_key(path, blob_hashes), "failures": verdicts[path]} for path in paths
+                },
+            },
+            indent=2,
+        )
+    )
+
+    print(f"Checked {len(to_check)} files, {len(paths) - len(to_check)} verdicts from cache", file=sys.stderr)
+    failure_messages = [failure_message for path in paths for failure_message in verdicts[path]]
+    for failure_message in failure_messages:
+        print(failure_message)
+    sys.exit(0 if len(failure_messages) == 0 else 1)
+
+
+def main():
+    typer.run(run_cached_spdx_checks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+import yaml
+
+from . import verify_images as verify_images_module
+from .verify_images import Image, ImageSource, find_images, load_cache, verify_images
+
+
+def test_find_images_walks_nested_values():
+    values = {
+        "matrixTools": {"image": {"registry": "ghcr.io", "repository": "element-hq/matrix-tools", "tag": "1.0"}},
+        "synapse": {
+            "enabled": True,
+            "extras": [{"image": {"repository": "library/haproxy", "digest": "sha256:abcd"}}],
+        },
+    }
+    assert find_images(values) == {
+        Image(registry="ghcr.io", repository="element-hq/matrix-tools", tag="1.0", digest=None),
+        Image(registry="docker.io", repository="library/haproxy", tag=None, digest="sha256:abcd"),
+    }
+
+
+def test_image_source_offline_stand_ins():
+    image = Image(registry="ghcr.io", repository="element-hq/matrix-tools", tag="1.0", digest=None)
+    assert ImageSource().skopeo_args(image) == ["docker://ghcr.io/element-hq/matrix-tools:1.0"]
+    assert ImageSource(registry_mirror="localhost:5000").skopeo_args(image) == [
+        "--tls-verify=false",
+        "docker://localhost:5000/element-hq/matrix-tools:1.0",
+    ]
+    assert ImageSource(oci_layout=Path("/layouts")).skopeo_args(image) == [
+        "oci:/layouts/ghcr.io/element-hq/matrix-tools:1.0"
+    ]
+
+
+def test_load_cache_expires_only_tagged_images(tmp_path):
+    cache_file = tmp_path / "cache.json"
+    stale = time.time() - 1000
+    cache_file.write_text(
+        json.dumps(
+            {
+                "tagged": {"architectures": ["amd64"], "immutable": False, "inspected_at": stale},
+                "digest": {"architectures": ["amd64"], "immutable": True, "inspected_at": stale},
+            }
+        )
+    )
+    assert set(load_cache(cache_file, 10)) == {"digest"}
+    assert set(load_cache(cache_file, 10000)) == {"tagged", "digest"}
+
+
+def test_verify_images_only_inspects_changed_images(tmp_path, monkeypatch):
+    inspected = []
+
+    def fake_inspect_architectures(image_source, image):
+        inspected.append(str(image))
+        return ["amd64", "arm64"]
+
+    monkeypatch.setattr(verify_images_module, "inspect_architectures", fake_inspect_architectures)
+
+    values = {
+        "a": {"image": {"registry": "ghcr.io", "repository": "a", "tag": "1"}},
+        "b": {"image": {"registry": "ghcr.io", "repository": "b", "tag": "1"}},
+    }
+    values_file = tmp_path / "values.yaml"
+    cache_file = tmp_path / "cache.json"
+
+    def run():
+        values_file.write_text(yaml.dump(values))
+        with pytest.raises(SystemExit) as exit_info:
+            verify_images(values_file, cache_file, 86400, 4, None, None)
+        assert exit_info.value.code == 0
+
+    run()
+    assert sorted(inspected) == ["ghcr.io/a:1", "ghcr.io/b:1"]
+
+    inspected.clear()
+    values["b"]["image"]["tag"] = "2"
+    run()
+    assert inspected == ["ghcr.io/b:2"]
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+# Copyright 2025-2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+# Verifies that every image referenced in the chart values is available for all required architectures.
+#
+# Images are inspected concurrently with `skopeo inspect --raw`. The architectures found for each image
+# are cached on disk. Images referenced by digest are immutable and so are cached forever, images
+# referenced by tag are re-inspected once the cache TTL expires.
+
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Annotated, Any
+
+import typer
+import yaml
+
+REQUIRED_ARCHITECTURES = ["amd64", "arm64"]
+
+
+@dataclass(frozen=True)
+class Image:
+    registry: str
+    repository: str
+    tag: str | None
+    digest: str | None
+
+    def __str__(self) -> str:
+        if self.digest:
+            return f"{self.registry}/{self.repository}@{self.digest}"
+        return f"{self.registry}/{self.repository}:{self.tag}"
+
+    @property
+    def immutable(self) -> bool:
+        return self.digest is not None
+
+
+@dataclass(frozen=True)
+class ImageSource:
+    # An OCI layout directory containing <registry>/<repository> layouts, for offline testing
+    oci_layout: Path | None = None
+    # A registry that stands in for every upstream registry, for offline testing
+    registry_mirror: str | None = None
+
+    def skopeo_args(self, image: Image) -> list[str]:
+        reference = f"@{image.digest}" if image.digest else f":{image.tag}"
+        if self.oci_layout:
+            return [f"oci:{self.oci_layout / image.registry / image.repository}{reference}"]
+        if self.registry_mirror:
+            return ["--tls-verify=false", f"docker://{self.registry_mirror}/{image.repository}{reference}"]
+        return [f"docker://{image}"]
+
+    def cache_key(self, image: Image) -> str:
+        return " ".join(self.skopeo_args(image))
+
+
+def find_images(values: Any) -> set[Image]:
+    images = set()
+    if isinstance(values, dict):
+        if "repository" in values:
+            images.add(
+                Image(
+                    registry=values.get("registry", "docker.io"),
+                    repository=values["repository"],
+                    tag=values.get("tag"),
+                    digest=values.get("digest"),
+                )
+            )
+        for value in values.values():
+            images.update(find_images(value))
+    elif isinstance(values, list):
+        for value in values:
+            images.update(find_images(value))
+    return images
+
+
+def inspect_architectures(image_source: ImageSource, image: Image) -> list[str]:
+    raw_manifest = subprocess.run(
+        ["skopeo", "inspect", "--raw", *image_source.skopeo_args(image)], check=True, capture_output=True, text=True
+    ).stdout
+    manifest = json.loads(raw_manifest)
+    architectures = [
+        manifest_details["platform"]["architecture"]
+        for manifest_details in manifest.get("manifests", [])
+        if manifest_details.get("platform", {}).get("os") == "linux"
+    ]
+
+    # Image is a single arch / no wrapper manifest and so we assume it is amd64
+    return architectures if architectures else ["amd64"]
+
+
+def load_cache(cache_file: Path, cache_ttl: int) -> dict[str, dict[str, Any]]:
+    if not cache_file.exists():
+        return {}
+    try:
+        cache = json.loads(cache_file.read_text())
+    except json.JSONDecodeError:
+        return {}
+
+    now = time.time()
+    return {
+        key: entry
+        for key, entry in cache.items()
+        if entry.get("immutable") or (now - entry.get("inspected_at", 0)) < cache_ttl
+    }
+
+
+def verify_images(
+    values_file: Annotated[Path, typer.Argument()] = Path("charts/matrix-stack/values.yaml"),
+    cache_file: Annotated[Path, typer.Option(help="Where to cache the architectures of each image")] = Path(
+        ".verify_images_cache.json"
+    ),
+    cache_ttl: Annotated[int, typer.Option(help="Seconds to trust the cached architectures of tagged images")] = 86400,
+    jobs: Annotated[int, typer.Option(help="Maximum number of concurrent skopeo inspections")] = 8,
+    oci_layout: Annotated[Path | None, typer.Option(help="Inspect images from OCI layouts in this directory")] = None,
+    registry_mirror: Annotated[str | None, typer.Option(help="Inspect images from this registry instead")] = None,
+):
+    image_source = ImageSource(oci_layout=oci_layout, registry_mirror=registry_mirror)
+    images = sorted(find_images(yaml.load(values_file.read_text(), Loader=yaml.SafeLoader)), key=str)
+    cache = load_cache(cache_file, cache_ttl)
+
+    to_inspect = [image for image in images if image_source.cache_key(image) not in cache]
+    failure_messages = []
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {image: executor.submit(inspect_architectures, image_source, image) for image in to_inspect}
+        for image, future in futures.items():
+            print(f"Checking {image}")
+            try:
+                architectures = future.result()
+            except subprocess.CalledProcessError as e:
+                failure_messages.append(f"- {image} couldn't be inspected: {e.stderr.strip()}")
+                continue
+            cache[image_source.cache_key(image)] = {
+                "architectures": architectures,
+                "immutable": image.immutable,
+                "inspected_at": time.time(),
+            }
+
+    cache_file.write_text(json.dumps(cache, indent=2, sort_keys=True))
+
+    for image in images:
+        if image_source.cache_key(image) not in cache:
+            continue
+        architectures = cache[image_source.cache_key(image)]["architectures"]
+        for arch in REQUIRED_ARCHITECTURES:
+            if arch not in architectures:
+                failure_messages.append(f"- {image} doesn't have {arch}, only '{','.join(architectures)}'")
+
+    print(f"Inspected {len(to_inspect)} images, {len(images) - len(to_inspect)} from cache")
+    for failure_message in failure_messages:
+        print(failure_message)
+    if failure_messages:
+        print("One or more images didn't have all architectures. Failing")
+    sys.exit(0 if len(failure_messages) == 0 else 1)
+
+
+def main():
+    typer.run(verify_images)
+
+
+if __name__ == "__main__":
+    main()
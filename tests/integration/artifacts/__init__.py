@@ -1,8 +1,8 @@
 # Copyright 2024 New Vector Ltd
-# Copyright 2025 Element Creations Ltd
+# Copyright 2025-2026 Element Creations Ltd
 #
 # SPDX-License-Identifier: AGPL-3.0-only
 
-from .certs import CertKey, generate_ca, generate_cert, get_ca
+from .certs import CertKey, generate_ca, generate_cert, get_ca, get_cert
 
-__all__ = ["get_ca", "generate_ca", "generate_cert", "CertKey"]
+__all__ = ["get_ca", "get_cert", "generate_ca", "generate_cert", "CertKey"]
@@ -1,34 +1,44 @@
 # Copyright 2024-2025 New Vector Ltd
-# Copyright 2025 Element Creations Ltd
+# Copyright 2025-2026 Element Creations Ltd
 #
 # SPDX-License-Identifier: AGPL-3.0-only
 
 from __future__ import annotations
 
 import datetime
+import hashlib
 import os
 import uuid
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 import pytz
 from cryptography import x509
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from cryptography.hazmat.primitives.asymmetric.ec import EllipticCurvePrivateKey
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey
 from cryptography.hazmat.primitives.serialization import load_pem_private_key
 from cryptography.x509 import Certificate
 from cryptography.x509.oid import NameOID
 from platformdirs import user_cache_dir
 
+KeyAlgorithm = Literal["rsa", "ecdsa"]
+
+# ECDSA P-256 keys are much quicker to generate than RSA keys
+DEFAULT_KEY_ALGORITHM: KeyAlgorithm = "ecdsa" if os.environ.get("PYTEST_TLS_KEY_ALGORITHM") == "ecdsa" else "rsa"
+
+# Don't reuse a cached leaf certificate that would expire during the test run
+LEAF_MINIMUM_REMAINING_VALIDITY = datetime.timedelta(hours=6)
+
 
 @dataclass(frozen=True)
 class CertKey:
     ca: CertKey | None
     cert: Certificate
-    key: RSAPrivateKey
+    key: RSAPrivateKey | EllipticCurvePrivateKey
 
     def get_root_ca(self) -> CertKey:
         if self.ca is None:
@@ -83,8 +93,8 @@ def get_ca(name, issuing_ca=None) -> CertKey:
     if cert_path.exists() and key_path.exists():
         with open(key_path, "rb") as pem_in:
             private_key = load_pem_private_key(pem_in.read(), None, default_backend())
-            if not isinstance(private_key, rsa.RSAPrivateKey):
-                raise ValueError("Expected RSA private key")
+            if not isinstance(private_key, rsa.RSAPrivateKey | ec.EllipticCurvePrivateKey):
+                raise ValueError("Expected RSA or ECDSA private key")
         with open(cert_path, "rb") as pem_in:
             cert = x509.load_pem_x509_certificate(pem_in.read(), default_backend())
         if cert.not_valid_after_utc > pytz.UTC.localize(datetime.datetime.now()):
@@ -106,10 +116,16 @@ def get_ca(name, issuing_ca=None) -> CertKey:
     return certkey
 
 
-def generate_ca(name, issuing_ca=None) -> CertKey:
+def generate_private_key(key_algorithm: KeyAlgorithm) -> RSAPrivateKey | EllipticCurvePrivateKey:
+    if key_algorithm == "ecdsa":
+        return ec.generate_private_key(ec.SECP256R1(), backend=default_backend())
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048, backend=default_backend())
+
+
+def generate_ca(name, issuing_ca=None, key_algorithm: KeyAlgorithm = DEFAULT_KEY_ALGORITHM) -> CertKey:
     two_days = datetime.timedelta(2, 0, 0)
     three_months = datetime.timedelta(90, 0, 0)
-    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048, backend=default_backend())
+    private_key = generate_private_key(key_algorithm)
     public_key = private_key.public_key()
     builder = x509.CertificateBuilder()
     builder = builder.subject_name(
@@ -159,24 +175,30 @@ def generate_ca(name, issuing_ca=None) -> CertKey:
     return ca
 
 
-def generate_cert(ca, dns_names: list[str]) -> CertKey:
+def generate_cert(
+    ca,
+    dns_names: list[str],
+    key_algorithm: KeyAlgorithm = DEFAULT_KEY_ALGORITHM,
+    validity: datetime.timedelta = datetime.timedelta(1, 0, 0),
+) -> CertKey:
     one_day = datetime.timedelta(1, 0, 0)
 
     # Now we want to generate a cert from that root
-    cert_key = rsa.generate_private_key(public_exponent=65537, key_size=2048, backend=default_backend())
+    cert_key = generate_private_key(key_algorithm)
     new_subject = x509.Name(
         [
             x509.NameAttribute(NameOID.COMMON_NAME, dns_names[0]),
         ]
     )
+    now = datetime.datetime.now(datetime.UTC)
     x509_certificate = (
         x509.CertificateBuilder()
         .subject_name(new_subject)
         .issuer_name(ca.cert.subject)
         .public_key(cert_key.public_key())
         .serial_number(x509.random_serial_number())
-        .not_valid_before(datetime.datetime.today() - one_day)
-        .not_valid_after(datetime.datetime.today() + one_day)
+        .not_valid_before(now - one_day)
+        .not_valid_after(min(now + validity, ca.cert.not_valid_after_utc))
         .add_extension(
             x509.SubjectAlternativeName([x509.DNSName(dns_name) for dns_name in dns_names]),
             critical=False,
@@ -187,3 +209,39 @@ def generate_cert(ca, dns_names: list[str]) -> CertKey:
     cert = x509_certificate.sign(ca.key, hashes.SHA256(), default_backend())
 
     return CertKey(ca=ca, cert=cert, key=cert_key)
+
+
+def get_cert(ca: CertKey, dns_names: list[str], key_algorithm: KeyAlgorithm = DEFAULT_KEY_ALGORITHM) -> CertKey:
+    """A leaf certificate for the DNS names, reused from the on-disk cache while it remains valid.
+
+    Cached certificates are keyed by the issuing CA's fingerprint, the set of DNS names and the key algorithm.
+    """
+    cache_key = hashlib.sha256(
+        "\0".join(
+            [ca.cert.fingerprint(hashes.SHA256()).hex(), key_algorithm, dns_names[0], *sorted(set(dns_names))]
+        ).encode("utf-8")
+    ).hexdigest()
+    leaf_filename = Path(user_cache_dir("pytest-ess", "element")) / "leaves" / cache_key
+    cert_path = leaf_filename.with_suffix(".crt")
+    key_path = leaf_filename.with_suffix(".key")
+    os.makedirs(leaf_filename.parent, exist_ok=True)
+
+    if cert_path.exists() and key_path.exists():
+        cert = x509.load_pem_x509_certificate(cert_path.read_bytes(), default_backend())
+        if cert.not_valid_after_utc > datetime.datetime.now(datetime.UTC) + LEAF_MINIMUM_REMAINING_VALIDITY:
+            # We generated this key ourselves, so the expensive RSA key consistency checks can be skipped
+            private_key = load_pem_private_key(
+                key_path.read_bytes(), None, default_backend(), unsafe_skip_rsa_key_validation=True
+            )
+            if not isinstance(private_key, rsa.RSAPrivateKey | ec.EllipticCurvePrivateKey):
+                raise ValueError("Expected RSA or ECDSA private key")
+            return CertKey(ca=ca, cert=cert, key=private_key)
+
+    # Cached leaves are valid for longer, so that they can be reused across sessions
+    certkey = generate_cert(ca, dns_names, key_algorithm, validity=datetime.timedelta(30, 0, 0))
+    # Written to temporary files first so concurrent sessions never read a partially written certificate
+    for path, pem in [(key_path, certkey.key_as_pem()), (cert_path, certkey.cert_as_pem())]:
+        temporary_path = path.with_suffix(f"{path.suffix}.{os.getpid()}")
+        temporary_path.write_text(pem)
+        os.replace(temporary_path, path)
+    return certkey
@@ -28,6 +28,9 @@ def pytest_addoption(parser):
 
 def pytest_configure(config):
     config.addinivalue_line("markers", "env_setup: mark test as run only when doing env setup")
+    config.addinivalue_line(
+        "markers", "multi_deployment: mark test as run only when deploying multiple values files side by side"
+    )
 
 
 def pytest_collection_modifyitems(config, items):
@@ -40,10 +43,19 @@ def pytest_collection_modifyitems(config, items):
 
     else:
         skip_env_setup = pytest.mark.skip(reason="need --env-setup option to run")
+        skip_multi_deployment = pytest.mark.skip(reason="need TEST_VALUES_FILES to run")
+        skip_single_deployment = pytest.mark.skip(reason="running with TEST_VALUES_FILES, tests run per deployment")
 
-        if not os.environ.get("TEST_VALUES_FILE"):
+        multi_deployment = bool(os.environ.get("TEST_VALUES_FILES"))
+        if multi_deployment and os.environ.get("TEST_VALUES_FILE"):
+            pytest.exit("Only one of TEST_VALUES_FILE and TEST_VALUES_FILES can be set")
+        if not multi_deployment and not os.environ.get("TEST_VALUES_FILE"):
             pytest.exit("TEST_VALUES_FILE is not set")
 
         for item in items:
             if "env_setup" in item.keywords:
                 item.add_marker(skip_env_setup)
+            elif multi_deployment and "multi_deployment" not in item.keywords:
+                item.add_marker(skip_single_deployment)
+            elif not multi_deployment and "multi_deployment" in item.keywords:
+                item.add_marker(skip_multi_deployment)
@@ -3,14 +3,26 @@
 #
 # SPDX-License-Identifier: AGPL-3.0-only
 
+from .bootstrap import bootstrap
 from .ca import delegated_ca, root_ca, ssl_context
-from .cluster import cert_manager, cluster, ess_namespace, helm_client, ingress, kube_client, prometheus_operator_crds
+from .cluster import (
+    cert_manager,
+    cluster,
+    ess_namespace,
+    helm_client,
+    ingress,
+    kube_client,
+    prometheus_operator_crds,
+    readiness,
+)
 from .data import ESSData, generated_data
+from .haproxy import haproxy_log_analytics, haproxy_log_bus
 from .helm import helm_prerequisites, ingress_ready, matrix_stack, secrets_generated
 from .matrix_tools import build_matrix_tools, loaded_matrix_tools
-from .users import User, users
+from .users import User, UserProvisioner, user_provisioner, users
 
 __all__ = [
+    "bootstrap",
     "build_matrix_tools",
     "cert_manager",
     "cluster",
@@ -18,6 +30,8 @@ __all__ = [
     "ess_namespace",
     "ESSData",
     "generated_data",
+    "haproxy_log_analytics",
+    "haproxy_log_bus",
     "helm_client",
     "helm_prerequisites",
     "ingress_ready",
@@ -26,9 +40,12 @@ __all__ = [
     "loaded_matrix_tools",
     "matrix_stack",
     "prometheus_operator_crds",
+    "readiness",
     "root_ca",
     "secrets_generated",
     "ssl_context",
     "User",
+    "user_provisioner",
+    "UserProvisioner",
     "users",
 ]
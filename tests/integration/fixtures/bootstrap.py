@@ -0,0 +1,61 @@
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+import os
+from functools import partial
+
+import pytest
+from lightkube.resources.core_v1 import Namespace
+
+from ..lib.bootstrap import Bootstrap
+from ..lib.deployments import deploys_matrix_stack
+from ..lib.readiness import ReadinessEngine
+from .cluster import (
+    PotentiallyExistingK3dCluster,
+    create_ess_namespace,
+    setup_cert_manager,
+    setup_prometheus_operator_crds,
+    wait_for_ingress,
+)
+from .data import ESSData
+from .helm import prepull_matrix_stack_images
+from .matrix_tools import build_matrix_tools_image, load_matrix_tools_image
+
+
+@pytest.fixture(autouse=True, scope="session")
+async def bootstrap(
+    pytestconfig,
+    cluster: PotentiallyExistingK3dCluster,
+    helm_client,
+    kube_client,
+    readiness: ReadinessEngine,
+    generated_data: ESSData,
+):
+    """Sets up everything the deployment under test needs from the cluster, concurrently.
+
+    Helm releases already deployed with the same chart version and values are left alone, so against
+    a reused cluster this is mostly waiting on the API server.
+    """
+    steps = Bootstrap()
+    steps.add("cert_manager", partial(setup_cert_manager, helm_client, kube_client, readiness))
+    steps.add("prometheus_operator_crds", partial(setup_prometheus_operator_crds, helm_client))
+    steps.add("build_matrix_tools", build_matrix_tools_image)
+    steps.add("loaded_matrix_tools", load_matrix_tools_image, depends_on=("build_matrix_tools",))
+    steps.add("ingress", partial(wait_for_ingress, readiness))
+
+    if deploys_matrix_stack(pytestconfig):
+        steps.add("ess_namespace", partial(create_ess_namespace, cluster, kube_client, generated_data))
+        steps.add(
+            "prepulled_images",
+            partial(prepull_matrix_stack_images, pytestconfig, cluster.cluster_name, helm_client, generated_data),
+            depends_on=("ingress", "loaded_matrix_tools"),
+        )
+
+    results = await steps.run()
+    print(f"Bootstrapped in {steps.summary()}")
+
+    yield results
+
+    if deploys_matrix_stack(pytestconfig) and os.environ.get("PYTEST_KEEP_CLUSTER", "") != "1":
+        await kube_client.delete(Namespace, name=generated_data.ess_namespace)
@@ -1,5 +1,5 @@
 # Copyright 2024-2025 New Vector Ltd
-# Copyright 2025 Element Creations Ltd
+# Copyright 2025-2026 Element Creations Ltd
 #
 # SPDX-License-Identifier: AGPL-3.0-only
 
@@ -8,6 +8,7 @@ import ssl
 import pytest
 
 from ..artifacts import get_ca
+from ..lib.utils import http_client_pool
 
 
 @pytest.fixture(scope="session")
@@ -24,4 +25,7 @@ async def delegated_ca(root_ca):
 async def ssl_context(root_ca):
     context = ssl.create_default_context()
     context.load_verify_locations(cadata=root_ca.cert_as_pem())
-    return context
+    yield context
+
+    # Requests made with this context share keep-alive connections for the whole session
+    await http_client_pool.close()
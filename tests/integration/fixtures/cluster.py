@@ -24,6 +24,8 @@ from lightkube.resources.core_v1 import Namespace, Secret, Service
 from pytest_kubernetes.options import ClusterOptions
 from pytest_kubernetes.providers import K3dManagerBase
 
+from ..lib.bootstrap import ensure_helm_release
+from ..lib.readiness import ReadinessEngine, custom_resource_is_ready
 from ..lib.utils import b64encode
 from .data import ESSData
 
@@ -128,40 +130,33 @@ async def kube_client(cluster):
 
 
 @pytest.fixture(scope="session")
-async def ingress(cluster, kube_client):
-    attempt = 0
-    while attempt < 120:
-        try:
-            # We can't just kubectl wait as that doesn't work with non-existent objects
-            # This can be setup before the LB port is accessible externally, so we do it afterwards
-            service = await kube_client.get(Service, name="traefik", namespace="kube-system")
-            await asyncio.to_thread(
-                cluster.wait,
-                name="service/traefik",
-                waitfor="jsonpath='{.status.loadBalancer.ingress[0].ip}'",
-                namespace="kube-system",
-            )
-            return service.spec.clusterIP
-        except ApiError:
-            await asyncio.sleep(1)
-            attempt += 1
-    raise Exception("Couldn't fetch Trafeik Service IP afrter 120s")
+async def readiness(kube_client):
+    engine = ReadinessEngine(kube_client)
+    yield engine
+    await engine.close()
 
 
-@pytest.fixture(autouse=True, scope="session")
-async def cert_manager(helm_client, kube_client):
+async def wait_for_ingress(readiness: ReadinessEngine):
+    # This can be setup before the LB port is accessible externally, so we wait for the LB IP to be assigned
+    service = await readiness.load_balancer_assigned(Service, "traefik", "kube-system")
+    return service.spec.clusterIP
+
+
+@pytest.fixture(scope="session")
+async def ingress(bootstrap):
+    return bootstrap["ingress"]
+
+
+async def setup_cert_manager(helm_client: pyhelm3.Client, kube_client: AsyncClient, readiness: ReadinessEngine):
     if os.environ.get("SKIP_CERT_MANAGER", "false") != "false":
         return
 
-    chart = await helm_client.get_chart("oci://quay.io/jetstack/charts/cert-manager")
-    await helm_client.install_or_upgrade_release(
+    await ensure_helm_release(
+        helm_client,
         "cert-manager",
-        chart,
+        "oci://quay.io/jetstack/charts/cert-manager",
         yaml.safe_load((Path(__file__).parent / "files/charts/cert-manager.yml").open()),
         namespace="cert-manager",
-        create_namespace=True,
-        atomic=True,
-        wait=True,
     )
 
     ca_folder = Path(__file__).parent.parent.parent.parent / ".ca"
@@ -170,10 +165,10 @@ async def cert_manager(helm_client, kube_client):
     ca_crt_path = Path(ca_folder) / "ca.crt"
     ca_pem_path = Path(ca_folder) / "ca.pem"
     if not (ca_crt_path.exists() and ca_pem_path.exists()):
-        await kube_client.create(ClusterIssuer(metadata={"name": "ess-ca"}, spec={"selfSigned": {}}))
+        await kube_client.create(ClusterIssuer(metadata=ObjectMeta(name="ess-ca"), spec={"selfSigned": {}}))
         await kube_client.create(
             Certificate(
-                metadata={"name": "ess-ca", "namespace": "cert-manager"},
+                metadata=ObjectMeta(name="ess-ca", namespace="cert-manager"),
                 spec={
                     "isCA": True,
                     "commonName": "ess-ca",
@@ -185,16 +180,7 @@ async def cert_manager(helm_client, kube_client):
             )
         )
 
-        # Wait for certificate to be ready
-        cert_ready = False
-        while not cert_ready:
-            cert = await kube_client.get(Certificate, name="ess-ca", namespace="cert-manager")
-            if cert.status and cert.status.get("conditions"):
-                for condition in cert.status["conditions"]:
-                    if condition["type"] == "Ready" and condition["status"] == "True":
-                        cert_ready = True
-                        break
-            await asyncio.sleep(1)
+        await readiness.wait_for(Certificate, "ess-ca", "cert-manager", custom_resource_is_ready)
     else:
         # Delete existing resources
         with contextlib.suppress(Exception):
@@ -215,37 +201,43 @@ async def cert_manager(helm_client, kube_client):
             )
         )
     await kube_client.apply(
-        ClusterIssuer(metadata={"name": "ess-selfsigned"}, spec={"ca": {"secretName": "ess-ca"}}),
+        ClusterIssuer(metadata=ObjectMeta(name="ess-selfsigned"), spec={"ca": {"secretName": "ess-ca"}}),
         field_manager="pytest",
     )
     ess_ca_secret = await kube_client.get(Secret, name="ess-ca", namespace="cert-manager")
 
     if not ca_crt_path.exists() or not ca_pem_path.exists():
+        assert ess_ca_secret.data is not None, "The ess-ca Secret has no data"
         with open(ca_crt_path, "w") as crt_file, open(ca_pem_path, "w") as pem_file:
             crt_file.write(base64.standard_b64decode(ess_ca_secret.data["ca.crt"]).decode("utf-8"))
             pem_file.write(base64.standard_b64decode(ess_ca_secret.data["tls.key"]).decode("utf-8"))
 
 
-@pytest.fixture(scope="session")
-async def prometheus_operator_crds(helm_client):
-    if os.environ.get("SKIP_SERVICE_MONITORS_CRDS", "false") == "false":
-        chart = await helm_client.get_chart("oci://ghcr.io/prometheus-community/charts/prometheus-operator-crds")
+@pytest.fixture(autouse=True, scope="session")
+async def cert_manager(bootstrap):
+    return bootstrap["cert_manager"]
+
 
-        # Install or upgrade a release
-        await helm_client.install_or_upgrade_release(
+async def setup_prometheus_operator_crds(helm_client: pyhelm3.Client):
+    if os.environ.get("SKIP_SERVICE_MONITORS_CRDS", "false") == "false":
+        await ensure_helm_release(
+            helm_client,
             "prometheus-operator-crds",
-            chart,
+            "oci://ghcr.io/prometheus-community/charts/prometheus-operator-crds",
             {},
             namespace="prometheus-operator",
-            create_namespace=True,
-            atomic=True,
-            wait=True,
         )
 
 
 @pytest.fixture(scope="session")
-async def ess_namespace(cluster: PotentiallyExistingK3dCluster, kube_client: AsyncClient, generated_data: ESSData):
-    (major_version, minor_version) = cluster.version()
+async def prometheus_operator_crds(bootstrap):
+    return bootstrap["prometheus_operator_crds"]
+
+
+async def create_ess_namespace(
+    cluster: PotentiallyExistingK3dCluster, kube_client: AsyncClient, generated_data: ESSData
+) -> str:
+    (major_version, minor_version) = await asyncio.to_thread(cluster.version)
     try:
         await kube_client.get(Namespace, name=generated_data.ess_namespace)
     except ApiError:
@@ -268,8 +260,9 @@ async def ess_namespace(cluster: PotentiallyExistingK3dCluster, kube_client: Asy
                 )
             )
         )
+    return generated_data.ess_namespace
 
-    yield
 
-    if os.environ.get("PYTEST_KEEP_CLUSTER", "") != "1":
-        await kube_client.delete(Namespace, name=generated_data.ess_namespace)
+@pytest.fixture(scope="session")
+async def ess_namespace(bootstrap):
+    return bootstrap["ess_namespace"]
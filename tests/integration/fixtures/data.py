@@ -1,5 +1,5 @@
 # Copyright 2024-2025 New Vector Ltd
-# Copyright 2025 Element Creations Ltd
+# Copyright 2025-2026 Element Creations Ltd
 #
 # SPDX-License-Identifier: AGPL-3.0-only
 
@@ -11,6 +11,7 @@ from dataclasses import dataclass
 import pytest
 
 from ..artifacts import CertKey
+from ..lib.utils import pytest_cache_key
 
 
 def unsafe_token(size):
@@ -61,7 +62,7 @@ class ESSData:
 
 @pytest.fixture(scope="session")
 async def generated_data(pytestconfig, root_ca):
-    serialized_data = pytestconfig.cache.get("ess-helm/generated-data", None)
+    serialized_data = pytestconfig.cache.get(pytest_cache_key("generated-data"), None)
     if serialized_data:
         data = ESSData.from_dict(serialized_data)
     else:
@@ -70,5 +71,5 @@ async def generated_data(pytestconfig, root_ca):
             _root_ca=root_ca,
             mas_oidc_client_secret=secrets.token_urlsafe(36),
         )
-        pytestconfig.cache.set("ess-helm/generated-data", data.to_json_mapping())
+        pytestconfig.cache.set(pytest_cache_key("generated-data"), data.to_json_mapping())
     return data
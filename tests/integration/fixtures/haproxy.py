@@ -0,0 +1,67 @@
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+import asyncio
+import contextlib
+
+import pytest
+from lightkube import AsyncClient
+
+from ..lib.deployments import deploys_matrix_stack
+from ..lib.haproxy_logs import HAPROXY_LOG_LINE, HAProxyLogAggregator
+from ..lib.log_bus import LogBus
+from ..lib.utils import stream_logs_from_pods_matching_labels, value_file_has
+from .data import ESSData
+
+
+@pytest.fixture(scope="session")
+async def haproxy_log_bus(pytestconfig, kube_client: AsyncClient, generated_data: ESSData):
+    """A single stream of the HAProxy logs for the whole session that tests and analytics subscribe to"""
+    if not deploys_matrix_stack(pytestconfig) or not value_file_has("synapse.enabled", True):
+        yield None
+        return
+
+    log_bus = LogBus()
+    # HAProxy pods are picked up as they start, so this doesn't need to wait for matrix-stack to be deployed
+    streaming_task = asyncio.create_task(
+        stream_logs_from_pods_matching_labels(
+            kube_client, generated_data.ess_namespace, {"app.kubernetes.io/name": "haproxy"}, log_bus
+        )
+    )
+
+    yield log_bus
+
+    streaming_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await streaming_task
+
+
+@pytest.fixture(autouse=True, scope="session")
+async def haproxy_log_analytics(pytestconfig, haproxy_log_bus: LogBus | None):
+    """Aggregates the HAProxy access logs for the whole session and reports the per-backend timings at the end"""
+    if haproxy_log_bus is None:
+        yield None
+        return
+
+    aggregator = HAProxyLogAggregator()
+    # Only the access logs, so the bus can still discard the lines that no subscription wants
+    subscription = haproxy_log_bus.subscribe(HAPROXY_LOG_LINE.pattern, buffer_size=100_000)
+    consuming_task = asyncio.create_task(aggregator.consume(subscription))
+
+    yield aggregator
+
+    consuming_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await consuming_task
+    while subscription.lines:
+        aggregator.feed(subscription.lines.popleft())
+    subscription.close()
+
+    # Written directly to the terminal as output from fixture teardown is otherwise captured
+    terminal_reporter = pytestconfig.pluginmanager.get_plugin("terminalreporter")
+    if terminal_reporter and aggregator.backends:
+        terminal_reporter.write_sep("=", "HAProxy backend timings")
+        terminal_reporter.write_line(aggregator.report())
+        if subscription.dropped:
+            terminal_reporter.write_line(f"{subscription.dropped} log lines were dropped before being aggregated")
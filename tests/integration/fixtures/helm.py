@@ -14,11 +14,13 @@ import pytest
 import yaml
 from lightkube import AsyncClient
 from lightkube.models.meta_v1 import ObjectMeta
-from lightkube.resources.core_v1 import Namespace, Secret, Service
+from lightkube.resources.core_v1 import Secret
 from lightkube.resources.networking_v1 import Ingress
 
-from ..artifacts.certs import CertKey, generate_cert
-from ..lib.helpers import kubernetes_docker_secret, kubernetes_tls_secret, wait_for_endpoint_ready
+from ..artifacts.certs import CertKey, get_cert
+from ..lib.helpers import kubernetes_docker_secret, kubernetes_tls_secret
+from ..lib.images import images_from_resources, prepull_images
+from ..lib.readiness import ReadinessEngine
 from ..lib.utils import DockerAuth, docker_config_json, value_file_has
 from .data import ESSData
 
@@ -33,6 +35,8 @@ async def helm_prerequisites(
 ):
     resources = []
     setups: list[Awaitable] = []
+    # Secret name to the DNS names of the certificate in it
+    tls_secrets: dict[str, list[str]] = {}
 
     # On CI, public runners should login to dockerhub.io to avoid rate-limits
     if os.environ.get("CI") and ("DOCKERHUB_USERNAME" in os.environ) and ("DOCKERHUB_TOKEN" in os.environ):
@@ -53,52 +57,22 @@ async def helm_prerequisites(
         )
 
     if value_file_has("matrixRTC.enabled", True):
-        resources.append(
-            kubernetes_tls_secret(
-                f"{generated_data.release_name}-matrix-rtc-tls",
-                generated_data.ess_namespace,
-                generate_cert(delegated_ca, [f"mrtc.{generated_data.server_name}"]),
-            )
-        )
+        tls_secrets[f"{generated_data.release_name}-matrix-rtc-tls"] = [f"mrtc.{generated_data.server_name}"]
         if value_file_has("matrixRTC.sfu.exposedServices.turnTLS.enabled", True):
-            resources.append(
-                kubernetes_tls_secret(
-                    f"{generated_data.release_name}-turn-tls",
-                    generated_data.ess_namespace,
-                    generate_cert(delegated_ca, [f"turn.{generated_data.server_name}"]),
-                )
-            )
+            tls_secrets[f"{generated_data.release_name}-turn-tls"] = [f"turn.{generated_data.server_name}"]
 
     if value_file_has("elementAdmin.enabled", True):
-        resources.append(
-            kubernetes_tls_secret(
-                f"{generated_data.release_name}-element-admin-tls",
-                generated_data.ess_namespace,
-                generate_cert(delegated_ca, [f"admin.{generated_data.server_name}"]),
-            )
-        )
+        tls_secrets[f"{generated_data.release_name}-element-admin-tls"] = [f"admin.{generated_data.server_name}"]
 
     if value_file_has("elementWeb.enabled", True):
-        resources.append(
-            kubernetes_tls_secret(
-                f"{generated_data.release_name}-element-web-tls",
-                generated_data.ess_namespace,
-                generate_cert(delegated_ca, [f"element.{generated_data.server_name}"]),
-            )
-        )
+        tls_secrets[f"{generated_data.release_name}-element-web-tls"] = [f"element.{generated_data.server_name}"]
 
     # if MAS is disabled but syn2mas is enabled, we are going to enable MAS later on during the test
     # So let's initilize everything it needs
     if value_file_has("matrixAuthenticationService.enabled", True) or value_file_has(
         "matrixAuthenticationService.syn2mas.enabled", True
     ):
-        resources.append(
-            kubernetes_tls_secret(
-                f"{generated_data.release_name}-mas-web-tls",
-                generated_data.ess_namespace,
-                generate_cert(delegated_ca, [f"mas.{generated_data.server_name}"]),
-            )
-        )
+        tls_secrets[f"{generated_data.release_name}-mas-web-tls"] = [f"mas.{generated_data.server_name}"]
         resources.append(
             Secret(
                 metadata=ObjectMeta(
@@ -122,13 +96,7 @@ clients:
         )
 
     if value_file_has("synapse.enabled", True):
-        resources.append(
-            kubernetes_tls_secret(
-                f"{generated_data.release_name}-synapse-web-tls",
-                generated_data.ess_namespace,
-                generate_cert(delegated_ca, [f"synapse.{generated_data.server_name}"]),
-            )
-        )
+        tls_secrets[f"{generated_data.release_name}-synapse-web-tls"] = [f"synapse.{generated_data.server_name}"]
         resources.append(
             Secret(
                 metadata=ObjectMeta(
@@ -146,33 +114,23 @@ retention:
         )
 
     if value_file_has("wellKnownDelegation.enabled", True):
-        resources.append(
-            kubernetes_tls_secret(
-                f"{generated_data.release_name}-well-known-web-tls",
-                generated_data.ess_namespace,
-                generate_cert(delegated_ca, [generated_data.server_name]),
-            )
-        )
+        tls_secrets[f"{generated_data.release_name}-well-known-web-tls"] = [generated_data.server_name]
+
+    # Key generation is CPU bound, so cache misses are generated in parallel in threads
+    certificates = await asyncio.gather(
+        *[asyncio.to_thread(get_cert, delegated_ca, dns_names) for dns_names in tls_secrets.values()]
+    )
+    resources += [
+        kubernetes_tls_secret(name, generated_data.ess_namespace, certificate)
+        for name, certificate in zip(tls_secrets, certificates, strict=True)
+    ]
 
     return await asyncio.gather(
         *setups, *[kube_client.apply(resource, field_manager="pytest") for resource in resources]
     )
 
 
-@pytest.fixture(scope="session")
-async def matrix_stack(
-    helm_client: pyhelm3.Client,
-    ingress,
-    helm_prerequisites,
-    prometheus_operator_crds,
-    ess_namespace: Namespace,
-    generated_data: ESSData,
-    loaded_matrix_tools: dict,
-):
-    # If we do not have TEST_VALUES_FILE define, we skip setting up matrix-stack
-    if not os.environ.get("TEST_VALUES_FILE"):
-        return False
-
+def matrix_stack_values(generated_data: ESSData, ingress: str, loaded_matrix_tools: dict) -> dict:
     with open(os.environ["TEST_VALUES_FILE"]) as stream:
         values = yaml.safe_load(stream)
 
@@ -195,7 +153,51 @@ async def matrix_stack(
         }
     ]
     values["synapse"]["hostAliases"] = values["matrixRTC"]["hostAliases"]
+    return values
+
+
+async def prepull_matrix_stack_images(
+    pytestconfig,
+    cluster_name: str,
+    helm_client: pyhelm3.Client,
+    generated_data: ESSData,
+    ingress: str,
+    loaded_matrix_tools: dict,
+):
+    """Pulls every image the deployment will use into the cluster nodes ahead of installing it.
+
+    Otherwise `helm install --wait` ends up pulling the images one pod at a time.
+    """
+    if os.environ.get("SKIP_IMAGE_PREPULL", "false") != "false":
+        return
+
+    chart = await helm_client.get_chart("charts/matrix-stack")
+    resources = await helm_client.template_resources(
+        chart,
+        generated_data.release_name,
+        matrix_stack_values(generated_data, ingress, loaded_matrix_tools),
+        namespace=generated_data.ess_namespace,
+    )
+    # The images pulled into each node are shared by every deployment in the cluster, but not with other clusters
+    cache_dir = pytestconfig.cache.mkdir(f"ess-helm-prepulled-images-{cluster_name}")
+    await prepull_images(cluster_name, images_from_resources(resources), cache_dir)
+
 
+@pytest.fixture(scope="session")
+async def matrix_stack(
+    helm_client: pyhelm3.Client,
+    ingress,
+    helm_prerequisites,
+    prometheus_operator_crds,
+    ess_namespace: str,
+    generated_data: ESSData,
+    loaded_matrix_tools: dict,
+):
+    # If we do not have TEST_VALUES_FILE define, we skip setting up matrix-stack
+    if not os.environ.get("TEST_VALUES_FILE"):
+        return False
+
+    values = matrix_stack_values(generated_data, ingress, loaded_matrix_tools)
     chart = await helm_client.get_chart("charts/matrix-stack")
 
     # Install or upgrade a release
@@ -211,23 +213,18 @@ async def matrix_stack(
 
 
 @pytest.fixture(scope="session")
-def ingress_ready(cluster, kube_client: AsyncClient, matrix_stack, generated_data: ESSData, ssl_context: SSLContext):
+def ingress_ready(readiness: ReadinessEngine, matrix_stack, generated_data: ESSData, ssl_context: SSLContext):
     async def _ingress_ready(ingress_suffix):
-        await asyncio.to_thread(
-            cluster.wait,
-            name=f"ingress/{generated_data.release_name}-{ingress_suffix}",
-            namespace=generated_data.ess_namespace,
-            waitfor="jsonpath='{.status.loadBalancer.ingress[0].ip}'",
-        )
-        ingress = await kube_client.get(
-            Ingress, f"{generated_data.release_name}-{ingress_suffix}", namespace=generated_data.ess_namespace
+        ingress = await readiness.load_balancer_assigned(
+            Ingress, f"{generated_data.release_name}-{ingress_suffix}", generated_data.ess_namespace
         )
         for rule in ingress.spec.rules:
-            for path in rule.http.paths:
-                service = await kube_client.get(
-                    Service, path.backend.service.name, namespace=generated_data.ess_namespace
-                )
-                await wait_for_endpoint_ready(service.metadata.name, generated_data.ess_namespace, cluster, kube_client)
+            await asyncio.gather(
+                *[
+                    readiness.endpoints_ready(path.backend.service.name, generated_data.ess_namespace)
+                    for path in rule.http.paths
+                ]
+            )
 
             if rule.host:
                 attempt = 0
@@ -254,14 +251,9 @@ def ingress_ready(cluster, kube_client: AsyncClient, matrix_stack, generated_dat
 
 
 @pytest.fixture(scope="session")
-def secrets_generated(cluster, kube_client: AsyncClient, matrix_stack, generated_data: ESSData):
+def secrets_generated(kube_client: AsyncClient, readiness: ReadinessEngine, matrix_stack, generated_data: ESSData):
     async def _secrets_generated(secret_key) -> str:
-        await asyncio.to_thread(
-            cluster.wait,
-            name=f"job/{generated_data.release_name}-init-secrets",
-            namespace=generated_data.ess_namespace,
-            waitfor="condition=complete",
-        )
+        await readiness.job_complete(f"{generated_data.release_name}-init-secrets", generated_data.ess_namespace)
         generated_secret = await kube_client.get(
             Secret, namespace=generated_data.ess_namespace, name=f"{generated_data.release_name}-generated"
         )
@@ -1,41 +1,119 @@
 # Copyright 2024 New Vector Ltd
-# Copyright 2025 Element Creations Ltd
+# Copyright 2025-2026 Element Creations Ltd
 #
 # SPDX-License-Identifier: AGPL-3.0-only
 
+import asyncio
+import hashlib
+import json
 import os
 from pathlib import Path
 
+import aiohttp
 import pytest
-from python_on_whales import Image, docker
+from python_on_whales import docker
 
+MATRIX_TOOLS_REGISTRY = "localhost:5000"
+MATRIX_TOOLS_IMAGE = f"{MATRIX_TOOLS_REGISTRY}/matrix-tools:pytest"
 
-@pytest.fixture(autouse=True, scope="session")
-async def build_matrix_tools():
+# Everything in the matrix-tools folder that affects the built image
+MATRIX_TOOLS_SOURCES = ["go.mod", "go.sum", "cmd", "internal", "Dockerfile"]
+
+MANIFEST_MEDIA_TYPES = [
+    "application/vnd.oci.image.index.v1+json",
+    "application/vnd.oci.image.manifest.v1+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+    "application/vnd.docker.distribution.manifest.v2+json",
+]
+
+
+def matrix_tools_source_hash(matrix_tools_folder: Path) -> str:
+    digest = hashlib.sha256()
+    for source in MATRIX_TOOLS_SOURCES:
+        source_path = matrix_tools_folder / source
+        files = [source_path]
+        if source_path.is_dir():
+            files = sorted(path for path in source_path.rglob("*") if path.is_file())
+        for file in files:
+            digest.update(file.relative_to(matrix_tools_folder).as_posix().encode("utf-8") + b"\0")
+            digest.update(file.read_bytes() + b"\0")
+    return digest.hexdigest()[:16]
+
+
+async def registry_has_digest(registry: str, repository: str, digest: str) -> bool:
+    try:
+        async with (
+            aiohttp.ClientSession() as session,
+            session.head(
+                f"http://{registry}/v2/{repository}/manifests/{digest}",
+                headers={"Accept": ", ".join(MANIFEST_MEDIA_TYPES)},
+            ) as response,
+        ):
+            return response.status == 200
+    except aiohttp.ClientError:
+        return False
+
+
+def pushed_digest(image: str) -> str | None:
+    # Digests are only recorded against a local image once it has been pushed
+    for repo_digest in docker.image.inspect(image).repo_digests:
+        if repo_digest.startswith(f"{MATRIX_TOOLS_REGISTRY}/matrix-tools@"):
+            return repo_digest.split("@")[-1]
+    return None
+
+
+async def build_matrix_tools_image():
     # Until the image is made publicly available
     # In local runs we always have to build it
     if os.environ.get("BUILD_MATRIX_TOOLS"):
         project_folder = Path(__file__).parent.parent.parent.parent.resolve()
-        docker.buildx.bake(
-            files=str(project_folder / "docker-bake.hcl"),
-            targets="matrix-tools",
-            set={"*.tags": "localhost:5000/matrix-tools:pytest"},
-            load=True,
-        )
+        source_hash = matrix_tools_source_hash(project_folder / "matrix-tools")
+        source_image = f"{MATRIX_TOOLS_REGISTRY}/matrix-tools:src-{source_hash}"
+        if docker.image.exists(source_image):
+            print(f"matrix-tools sources unchanged, reusing {source_image}")
+        else:
+            print(f"matrix-tools sources changed, building {source_image}")
+            await asyncio.to_thread(
+                docker.buildx.bake,
+                files=str(project_folder / "docker-bake.hcl"),
+                targets="matrix-tools",
+                set={"*.tags": source_image},
+                load=True,
+            )
+        docker.image.tag(source_image, MATRIX_TOOLS_IMAGE)
 
 
 @pytest.fixture(autouse=True, scope="session")
-async def loaded_matrix_tools(cluster, build_matrix_tools: Image):
+async def build_matrix_tools(bootstrap):
+    return bootstrap["build_matrix_tools"]
+
+
+async def load_matrix_tools_image(build_matrix_tools) -> dict:
+    # Side by side deployments share the image built and pushed by the parent session
+    if os.environ.get("PYTEST_MATRIX_TOOLS_IMAGE"):
+        return json.loads(os.environ["PYTEST_MATRIX_TOOLS_IMAGE"])
+
     # Until the image is made publicly available
     # In local runs we always have to build it
     if os.environ.get("BUILD_MATRIX_TOOLS"):
-        docker.push("localhost:5000/matrix-tools:pytest")
-        matrix_tools = docker.image.inspect("localhost:5000/matrix-tools:pytest")
+        digest = pushed_digest(MATRIX_TOOLS_IMAGE)
+        if digest and await registry_has_digest(MATRIX_TOOLS_REGISTRY, "matrix-tools", digest):
+            print(f"matrix-tools {digest} already in {MATRIX_TOOLS_REGISTRY}, not pushing")
+        else:
+            print(f"Pushing {MATRIX_TOOLS_IMAGE}")
+            await asyncio.to_thread(docker.push, MATRIX_TOOLS_IMAGE)
+            digest = pushed_digest(MATRIX_TOOLS_IMAGE)
+
         return {
             "repository": "matrix-tools",
-            "registry": "localhost:5000",
-            "digest": matrix_tools.repo_digests[0].split("@")[-1],
+            "registry": MATRIX_TOOLS_REGISTRY,
+            "digest": digest,
             "tag": "pytest",
         }
     else:
         return {}
+
+
+@pytest.fixture(autouse=True, scope="session")
+async def loaded_matrix_tools(bootstrap) -> dict:
+    return bootstrap["loaded_matrix_tools"]
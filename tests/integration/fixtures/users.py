@@ -1,22 +1,30 @@
 # Copyright 2024-2025 New Vector Ltd
-# Copyright 2025 Element Creations Ltd
+# Copyright 2025-2026 Element Creations Ltd
 #
 # SPDX-License-Identifier: AGPL-3.0-only
 
 import asyncio
+import time
 from collections.abc import Iterable
 from dataclasses import dataclass, field
+from ssl import SSLContext
+from typing import Any
 
 import pytest
 
 from ..lib.matrix_authentication_service import (
+    ClientToken,
     create_mas_user,
-    get_client_token,
+    get_site_config,
+    request_client_token,
 )
 from ..lib.synapse import create_synapse_user
 from ..lib.utils import value_file_has
 from .data import ESSData
 
+# Don't use a MAS admin token that will expire before the requests made with it complete
+CLIENT_TOKEN_EXPIRY_MARGIN = 30
+
 
 @dataclass
 class User:
@@ -25,48 +33,100 @@ class User:
     access_token: str | None = field(default=None)
 
 
-@pytest.fixture
-async def users(
-    request, pytestconfig, matrix_stack, secrets_generated, generated_data: ESSData, ssl_context, ingress_ready
-):
-    await ingress_ready("synapse")
-    if value_file_has("matrixAuthenticationService.enabled", True):
-        await ingress_ready("matrix-authentication-service")
+class UserProvisioner:
+    """Creates test users, with up to `concurrency` users being created at once.
 
-    users = request.param
-    assert isinstance(users, Iterable)
+    With MAS the admin client token is reused until it is about to expire and the site config is only fetched once.
+    """
 
-    wait_for_users = []
-    if value_file_has("matrixAuthenticationService.enabled", True):
-        admin_token = await get_client_token(f"mas.{generated_data.server_name}", generated_data, ssl_context)
-        for user in users:
-            wait_for_users.append(
-                create_mas_user(
-                    f"mas.{generated_data.server_name}",
-                    f"synapse.{generated_data.server_name}",
+    def __init__(
+        self,
+        generated_data: ESSData,
+        ssl_context: SSLContext,
+        pytestconfig: pytest.Config,
+        registration_shared_secret: str | None,
+        concurrency: int = 16,
+    ):
+        self.generated_data = generated_data
+        self.ssl_context = ssl_context
+        self.pytestconfig = pytestconfig
+        self.registration_shared_secret = registration_shared_secret
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._lock = asyncio.Lock()
+        self._client_token: ClientToken | None = None
+        self._site_config: dict[str, Any] | None = None
+
+    @property
+    def mas_fqdn(self) -> str:
+        return f"mas.{self.generated_data.server_name}"
+
+    @property
+    def synapse_fqdn(self) -> str:
+        return f"synapse.{self.generated_data.server_name}"
+
+    async def _admin_token_and_site_config(self) -> tuple[str, dict[str, Any]]:
+        async with self._lock:
+            if self._client_token is None or self._client_token.expires_at - CLIENT_TOKEN_EXPIRY_MARGIN < time.time():
+                self._client_token = await request_client_token(self.mas_fqdn, self.generated_data, self.ssl_context)
+            if self._site_config is None:
+                self._site_config = await get_site_config(
+                    self.mas_fqdn, self._client_token.access_token, self.ssl_context
+                )
+            return self._client_token.access_token, self._site_config
+
+    async def _create_user(self, user: User) -> User:
+        async with self._semaphore:
+            if self.registration_shared_secret is None:
+                admin_token, site_config = await self._admin_token_and_site_config()
+                user.access_token = await create_mas_user(
+                    self.mas_fqdn,
+                    self.synapse_fqdn,
                     user.name,
-                    generated_data.secrets_random,
+                    self.generated_data.secrets_random,
                     user.admin,
                     admin_token,
-                    ssl_context,
-                    pytestconfig,
+                    self.ssl_context,
+                    self.pytestconfig,
+                    site_config=site_config,
                 )
-            )
-    else:
-        synapse_registration_shared_secret = await secrets_generated("SYNAPSE_REGISTRATION_SHARED_SECRET")
-        for user in request.param:
-            wait_for_users.append(
-                create_synapse_user(
-                    f"synapse.{generated_data.server_name}",
+            else:
+                user.access_token = await create_synapse_user(
+                    self.synapse_fqdn,
                     user.name,
-                    generated_data.secrets_random,
+                    self.generated_data.secrets_random,
                     user.admin,
-                    synapse_registration_shared_secret,
-                    ssl_context,
-                    pytestconfig,
+                    self.registration_shared_secret,
+                    self.ssl_context,
+                    self.pytestconfig,
                 )
-            )
-    tokens = await asyncio.gather(*wait_for_users)
-    for i, user in enumerate(users):
-        user.access_token = tokens[i]
-    return users
+        return user
+
+    async def provision(self, users: Iterable[User]) -> list[User]:
+        """Creates the given users, or reuses them if they already exist, setting their access tokens"""
+        return await asyncio.gather(*[self._create_user(user) for user in users])
+
+    async def provision_users(self, n: int, prefix: str, admin: bool = False) -> list[User]:
+        """Creates `n` users named `<prefix>-<index>`, e.g. for load testing"""
+        return await self.provision([User(name=f"{prefix}-{index}", admin=admin) for index in range(n)])
+
+
+@pytest.fixture(scope="session")
+async def user_provisioner(
+    pytestconfig, matrix_stack, secrets_generated, generated_data: ESSData, ssl_context
+) -> UserProvisioner:
+    registration_shared_secret = None
+    if not value_file_has("matrixAuthenticationService.enabled", True):
+        registration_shared_secret = await secrets_generated("SYNAPSE_REGISTRATION_SHARED_SECRET")
+    return UserProvisioner(generated_data, ssl_context, pytestconfig, registration_shared_secret)
+
+
+@pytest.fixture
+async def users(request, user_provisioner: UserProvisioner, ingress_ready):
+    await ingress_ready("synapse")
+    if value_file_has("matrixAuthenticationService.enabled", True):
+        await ingress_ready("matrix-authentication-service")
+
+    users = request.param
+    assert isinstance(users, Iterable)
+
+    return await user_provisioner.provision(users)
@@ -0,0 +1,81 @@
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from graphlib import TopologicalSorter
+from typing import Any
+
+import pyhelm3
+
+
+@dataclass(frozen=True)
+class BootstrapStep:
+    name: str
+    # Called with the result of each dependency as a keyword argument named after that dependency
+    run: Callable[..., Awaitable[Any]]
+    depends_on: tuple[str, ...] = ()
+
+
+@dataclass
+class Bootstrap:
+    """The session prerequisites, run concurrently with each step starting as soon as its dependencies are done"""
+
+    steps: dict[str, BootstrapStep] = field(default_factory=dict)
+    durations: dict[str, float] = field(default_factory=dict)
+
+    def add(self, name: str, run: Callable[..., Awaitable[Any]], depends_on: tuple[str, ...] = ()):
+        self.steps[name] = BootstrapStep(name, run, depends_on)
+
+    async def run(self) -> dict[str, Any]:
+        # Raises graphlib.CycleError on a cycle, so that we don't deadlock awaiting ourselves
+        order = list(TopologicalSorter({name: step.depends_on for name, step in self.steps.items()}).static_order())
+        missing = set(order) - set(self.steps)
+        if missing:
+            raise ValueError(f"Bootstrap steps depend on unknown steps: {', '.join(sorted(missing))}")
+
+        tasks: dict[str, asyncio.Task] = {}
+
+        async def run_step(step: BootstrapStep) -> Any:
+            dependency_results = {dependency: await tasks[dependency] for dependency in step.depends_on}
+            start = time.monotonic()
+            result = await step.run(**dependency_results)
+            self.durations[step.name] = time.monotonic() - start
+            return result
+
+        async with asyncio.TaskGroup() as task_group:
+            for name in order:
+                tasks[name] = task_group.create_task(run_step(self.steps[name]), name=f"bootstrap-{name}")
+
+        return {name: task.result() for name, task in tasks.items()}
+
+    def summary(self) -> str:
+        return ", ".join(f"{name} {duration:.1f}s" for name, duration in self.durations.items())
+
+
+async def ensure_helm_release(
+    helm_client: pyhelm3.Client, release_name: str, chart_ref: str, values: dict, namespace: str
+) -> pyhelm3.ReleaseRevision:
+    """Installs or upgrades the release unless it is already deployed with this chart version and values"""
+    chart = await helm_client.get_chart(chart_ref)
+    try:
+        current_revision = await helm_client.get_current_revision(release_name, namespace=namespace)
+    except pyhelm3.errors.ReleaseNotFoundError:
+        current_revision = None
+
+    # This checks the revision was successfully deployed and has the same chart name, version and values
+    if current_revision and not await helm_client.should_install_or_upgrade_release(current_revision, chart, values):
+        return current_revision
+
+    return await helm_client.install_or_upgrade_release(
+        release_name,
+        chart,
+        values,
+        namespace=namespace,
+        create_namespace=True,
+        atomic=True,
+        wait=True,
+    )
@@ -0,0 +1,62 @@
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+import asyncio
+import json
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+
+def multi_deployment_values_files() -> list[str]:
+    """The values files to deploy side by side, from the space separated TEST_VALUES_FILES"""
+    return os.environ.get("TEST_VALUES_FILES", "").split()
+
+
+def deploys_matrix_stack(pytestconfig) -> bool:
+    """Whether this session deploys matrix-stack itself, rather than doing --env-setup or running side by side ones"""
+    return bool(os.environ.get("TEST_VALUES_FILE")) and not pytestconfig.getoption("--env-setup")
+
+
+def deployment_name(values_file: str) -> str:
+    return Path(values_file).name.removeprefix("pytest-").removesuffix(".yaml").removesuffix("-values")
+
+
+@dataclass(frozen=True)
+class DeploymentResult:
+    values_file: str
+    returncode: int
+    output: str
+
+
+async def run_deployment_tests(values_file: str, matrix_tools_image: dict, pytest_args: list[str]) -> DeploymentResult:
+    """Runs the integration tests against a single values file in its own pytest session.
+
+    The cluster wide prerequisites (cert-manager, the CAs, Prometheus Operator CRDs and matrix-tools)
+    must already have been setup by the calling session. Each deployment gets its own ESSData,
+    and so its own namespace, release name, server name and certificates, via ESS_DEPLOYMENT.
+    """
+    env = os.environ.copy()
+    env.pop("TEST_VALUES_FILES")
+    env.pop("BUILD_MATRIX_TOOLS", None)
+    env["TEST_VALUES_FILE"] = values_file
+    env["ESS_DEPLOYMENT"] = deployment_name(values_file)
+    env["SKIP_CERT_MANAGER"] = "true"
+    env["SKIP_SERVICE_MONITORS_CRDS"] = "true"
+    env["PYTEST_MATRIX_TOOLS_IMAGE"] = json.dumps(matrix_tools_image)
+
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        "pytest",
+        *pytest_args,
+        str(Path(__file__).parent.parent),
+        env=env,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+    )
+    stdout, _ = await process.communicate()
+    assert process.returncode is not None
+    return DeploymentResult(values_file, process.returncode, stdout.decode("utf-8"))
@@ -0,0 +1,123 @@
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+import bisect
+import re
+from dataclasses import dataclass, field
+
+from .log_bus import Subscription
+
+# Matches the start of our log-format, up to the server and backend queue lengths:
+# %ci:%cp [%tr] %ft %b/%s %Th/%TR/%Tw/%Tc/%Tr/%Ta %ST %B %CC %CS %tsc %ac/%fc/%bc/%sc/%rc %sq/%bq ...
+HAPROXY_LOG_LINE = re.compile(
+    r"(?P<client>\S+) \[(?P<accept_date>[^\]]+)\] (?P<frontend>\S+) (?P<backend>[^/\s]+)/(?P<server>\S+) "
+    r"(?P<Th>-?\d+)/(?P<TR>-?\d+)/(?P<Tw>-?\d+)/(?P<Tc>-?\d+)/(?P<Tr>-?\d+)/\+?(?P<Ta>-?\d+) "
+    r"(?P<status>-?\d+) \+?(?P<bytes>\d+) \S+ \S+ (?P<termination_state>\S+) "
+    r"(?P<ac>\d+)/(?P<fc>\d+)/(?P<bc>\d+)/(?P<sc>\d+)/(?P<redispatched>\+?)(?P<retries>\d+) "
+    r"(?P<server_queue>\d+)/(?P<backend_queue>\d+)"
+)
+
+# The timers we keep histograms of, see https://docs.haproxy.org/3.2/configuration.html#8.4
+TIMERS = {
+    "Th": "handshake",
+    "TR": "request",
+    "Tw": "queue",
+    "Tc": "connect",
+    "Tr": "response",
+    "Ta": "total",
+}
+
+# Upper bounds, in milliseconds, of the histogram buckets. Anything slower goes in a final overflow bucket
+BUCKET_BOUNDS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000]
+
+
+@dataclass
+class Histogram:
+    counts: list[int] = field(default_factory=lambda: [0] * (len(BUCKET_BOUNDS) + 1))
+    count: int = 0
+    total: int = 0
+    maximum: int = 0
+
+    def observe(self, milliseconds: int):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, milliseconds)] += 1
+        self.count += 1
+        self.total += milliseconds
+        self.maximum = max(self.maximum, milliseconds)
+
+    def quantile(self, quantile: float) -> int:
+        """The upper bound of the bucket containing the quantile, or the maximum if that's lower"""
+        if self.count == 0:
+            return 0
+        rank = quantile * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(BUCKET_BOUNDS[index], self.maximum) if index < len(BUCKET_BOUNDS) else self.maximum
+        return self.maximum
+
+
+@dataclass
+class BackendStats:
+    requests: int = 0
+    # Requests where HAProxy retried connecting to a server
+    retried: int = 0
+    retries: int = 0
+    # Requests that were redispatched to a different server after failing to connect
+    redispatched: int = 0
+    errors: int = 0
+    max_backend_queue: int = 0
+    timers: dict[str, Histogram] = field(default_factory=lambda: {timer: Histogram() for timer in TIMERS})
+
+
+@dataclass
+class HAProxyLogAggregator:
+    """Aggregates HAProxy access logs, line by line, into per-backend timing histograms"""
+
+    backends: dict[str, BackendStats] = field(default_factory=dict)
+    unparsed_lines: int = 0
+
+    def feed(self, log_line: str) -> bool:
+        match = HAPROXY_LOG_LINE.search(log_line)
+        if not match:
+            self.unparsed_lines += 1
+            return False
+
+        stats = self.backends.setdefault(match["backend"], BackendStats())
+        stats.requests += 1
+        for timer in TIMERS:
+            # Timers are -1 when the request never reached that stage
+            if (milliseconds := int(match[timer])) >= 0:
+                stats.timers[timer].observe(milliseconds)
+        if (retries := int(match["retries"])) > 0:
+            stats.retried += 1
+            stats.retries += retries
+        if match["redispatched"]:
+            stats.redispatched += 1
+        if int(match["status"]) >= 500 or int(match["status"]) < 0:
+            stats.errors += 1
+        stats.max_backend_queue = max(stats.max_backend_queue, int(match["backend_queue"]))
+        return True
+
+    async def consume(self, subscription: Subscription):
+        async for log_line in subscription:
+            self.feed(log_line)
+
+    def report(self) -> str:
+        lines = [
+            f"{'backend':<32}{'requests':>9}{'errors':>7}{'retried':>8}{'redisp':>7}{'maxq':>6}"
+            + "".join(f"{name + ' p50/p95/p99 ms':>26}" for name in ("queue", "connect", "response", "total"))
+        ]
+        for backend, stats in sorted(self.backends.items()):
+            percentiles = [
+                "/".join(str(stats.timers[timer].quantile(quantile)) for quantile in (0.5, 0.95, 0.99))
+                for timer in ("Tw", "Tc", "Tr", "Ta")
+            ]
+            lines.append(
+                f"{backend:<32}{stats.requests:>9}{stats.errors:>7}{stats.retried:>8}{stats.redispatched:>7}"
+                f"{stats.max_backend_queue:>6}" + "".join(f"{percentile:>26}" for percentile in percentiles)
+            )
+        if self.unparsed_lines:
+            lines.append(f"{self.unparsed_lines} log lines weren't HAProxy access logs")
+        return "\n".join(lines)
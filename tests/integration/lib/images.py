@@ -0,0 +1,107 @@
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+import asyncio
+import hashlib
+import shutil
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from python_on_whales import docker
+
+# Kinds whose pod template is at spec.template
+POD_TEMPLATE_KINDS = {"Deployment", "StatefulSet", "DaemonSet", "ReplicaSet", "Job"}
+
+
+def pod_spec(resource: dict[str, Any]) -> dict[str, Any] | None:
+    kind = resource.get("kind")
+    if kind == "Pod":
+        return resource.get("spec")
+    if kind in POD_TEMPLATE_KINDS:
+        return resource.get("spec", {}).get("template", {}).get("spec")
+    if kind == "CronJob":
+        return resource.get("spec", {}).get("jobTemplate", {}).get("spec", {}).get("template", {}).get("spec")
+    return None
+
+
+def images_from_resources(resources: Iterable[dict[str, Any]]) -> set[str]:
+    """Every container and initContainer image used by the rendered resources"""
+    images = set()
+    for resource in resources:
+        spec = pod_spec(resource) or {}
+        for container in spec.get("initContainers", []) + spec.get("containers", []):
+            images.add(container["image"])
+    return images
+
+
+def cluster_nodes(cluster_name: str) -> list[str]:
+    """The k3d node containers that run pods, i.e. excluding the load balancer and registry"""
+    return sorted(
+        container.name
+        for container in docker.container.list(filters={"label": f"k3d.cluster={cluster_name}"})
+        if (container.config.labels or {}).get("k3d.role") in ("server", "agent")
+    )
+
+
+def node_id(node: str) -> str:
+    # Changes whenever the cluster is recreated, invalidating anything cached against the old node
+    return docker.container.inspect(node).id
+
+
+async def pull_image_into_node(node: str, image: str, semaphore: asyncio.Semaphore) -> bool:
+    """Pulls the image with the node's containerd, so it goes through the k3d registries config"""
+    async with semaphore:
+        process = await asyncio.create_subprocess_exec(
+            "docker",
+            "exec",
+            node,
+            "crictl",
+            "pull",
+            image,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        _, stderr = await process.communicate()
+    if process.returncode != 0:
+        # Not fatal, the kubelet will try again when it starts the pod
+        print(f"Failed to pre-pull {image} into {node}: {stderr.decode('utf-8').strip()}")
+    return process.returncode == 0
+
+
+def pulled_marker(cache_dir: Path, node_id: str, image: str) -> Path:
+    # One file per node and image, so concurrent sessions record their pulls without rewriting a shared manifest
+    return cache_dir / node_id / hashlib.sha256(image.encode("utf-8")).hexdigest()
+
+
+async def prepull_images(cluster_name: str, images: set[str], cache_dir: Path, concurrency: int = 8):
+    """Pulls the images into every node concurrently, skipping those already pulled into that node.
+
+    `cache_dir` records the images pulled into each node by previous sessions. Nodes that no longer exist are
+    removed from it.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    pulls = {}
+    cached = 0
+    current_node_ids = set()
+    for node in await asyncio.to_thread(cluster_nodes, cluster_name):
+        current_node_id = await asyncio.to_thread(node_id, node)
+        current_node_ids.add(current_node_id)
+        for image in sorted(images):
+            if pulled_marker(cache_dir, current_node_id, image).exists():
+                cached += 1
+            else:
+                pulls[(current_node_id, image)] = pull_image_into_node(node, image, semaphore)
+
+    for stale_node_dir in cache_dir.iterdir():
+        if stale_node_dir.name not in current_node_ids:
+            shutil.rmtree(stale_node_dir, ignore_errors=True)
+
+    results = await asyncio.gather(*pulls.values())
+    for (current_node_id, image), succeeded in zip(pulls, results, strict=True):
+        if succeeded:
+            marker = pulled_marker(cache_dir, current_node_id, image)
+            marker.parent.mkdir(parents=True, exist_ok=True)
+            marker.touch()
+    print(f"Pre-pulled {sum(results)} of {len(pulls)} images into the cluster nodes, {cached} already present")
@@ -0,0 +1,9 @@
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+from .client import SimulatedClient
+from .runner import OPERATIONS, LoadProfile, run_load
+from .stats import EndpointStats, LoadReport
+
+__all__ = ["EndpointStats", "LoadProfile", "LoadReport", "OPERATIONS", "SimulatedClient", "run_load"]
@@ -0,0 +1,110 @@
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+import json
+import os
+import time
+import uuid
+from typing import Any
+from urllib.parse import quote
+
+import aiohttp
+
+from .stats import LoadReport
+
+SLIDING_SYNC_PATH = "/_matrix/client/unstable/org.matrix.simplified_msc3575/sync"
+
+
+class SimulatedClient:
+    """A Matrix client for one simulated user, recording the latency of every request it makes.
+
+    Requests are made directly against the ingress with the SNI and Host set to Synapse's hostname, so they go through
+    HAProxy and are routed to the appropriate workers. Requests aren't retried, so errors show up in the report.
+    """
+
+    def __init__(
+        self, session: aiohttp.ClientSession, synapse_fqdn: str, server_name: str, access_token: str, report: LoadReport
+    ):
+        self.session = session
+        self.synapse_fqdn = synapse_fqdn
+        self.server_name = server_name
+        self.access_token = access_token
+        self.report = report
+        self.rooms: list[str] = []
+        self.media: list[str] = []
+        self._since: str | None = None
+        self._sliding_sync_pos: str | None = None
+
+    async def _request(self, endpoint_class: str, method: str, path: str, **kwargs) -> Any:
+        headers = {"Host": self.synapse_fqdn, "Authorization": f"Bearer {self.access_token}"}
+        headers |= kwargs.pop("headers", {})
+        start = time.monotonic()
+        try:
+            async with self.session.request(
+                method, f"https://127.0.0.1{path}", headers=headers, server_hostname=self.synapse_fqdn, **kwargs
+            ) as response:
+                body = await response.read()
+                response.raise_for_status()
+        except (aiohttp.ClientError, TimeoutError):
+            self.report.endpoint(endpoint_class).errors += 1
+            raise
+        self.report.endpoint(endpoint_class).record(time.monotonic() - start)
+
+        if response.content_type == "application/json":
+            return json.loads(body)
+        return body
+
+    async def create_room(self) -> str:
+        response = await self._request(
+            "create_room",
+            "POST",
+            "/_matrix/client/v3/createRoom",
+            json={"name": f"Load test {uuid.uuid4().hex[:8]}", "preset": "private_chat", "visibility": "private"},
+        )
+        self.rooms.append(response["room_id"])
+        return response["room_id"]
+
+    async def send_message(self, room_id: str):
+        await self._request(
+            "send_message",
+            "PUT",
+            f"/_matrix/client/v3/rooms/{quote(room_id)}/send/m.room.message/{uuid.uuid4().hex}",
+            json={"msgtype": "m.text", "body": f"Load test message {time.time()}"},
+        )
+
+    async def sync(self):
+        params = {"timeout": "0"}
+        if self._since:
+            params["since"] = self._since
+        response = await self._request("sync", "GET", "/_matrix/client/v3/sync", params=params)
+        self._since = response["next_batch"]
+
+    async def sliding_sync(self):
+        params = {"timeout": "0"}
+        if self._sliding_sync_pos:
+            params["pos"] = self._sliding_sync_pos
+        response = await self._request(
+            "sliding_sync",
+            "POST",
+            SLIDING_SYNC_PATH,
+            params=params,
+            json={"lists": {"all": {"ranges": [[0, 19]], "timeline_limit": 1, "required_state": []}}},
+        )
+        self._sliding_sync_pos = response["pos"]
+
+    async def upload_media(self, size: int) -> str:
+        response = await self._request(
+            "media_upload",
+            "POST",
+            "/_matrix/media/v3/upload",
+            params={"filename": "load-test.bin"},
+            headers={"Content-Type": "application/octet-stream"},
+            data=os.urandom(size),
+        )
+        self.media.append(response["content_uri"])
+        return response["content_uri"]
+
+    async def download_media(self, content_uri: str):
+        media_id = content_uri.removeprefix(f"mxc://{self.server_name}/")
+        await self._request("media_download", "GET", f"/_matrix/client/v1/media/download/{self.server_name}/{media_id}")
@@ -0,0 +1,94 @@
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+import asyncio
+import contextlib
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from ssl import SSLContext
+
+import aiohttp
+
+from .client import SimulatedClient
+from .stats import LoadReport
+
+
+@dataclass(frozen=True)
+class LoadProfile:
+    # Seconds to generate load for
+    duration: float = 30
+    # The relative weight of each operation, see OPERATIONS
+    mix: dict[str, int] = field(
+        default_factory=lambda: {"sync": 4, "sliding_sync": 2, "send_message": 4, "create_room": 1, "media": 1}
+    )
+    # Seconds each user waits between operations, 0 to send the next request as soon as the last completes
+    think_time: float = 0
+    media_size: int = 64 * 1024
+    request_timeout: float = 30
+
+
+async def _media(client: SimulatedClient, rng: random.Random, profile: LoadProfile):
+    await client.download_media(await client.upload_media(profile.media_size))
+
+
+OPERATIONS: dict[str, Callable[[SimulatedClient, random.Random, LoadProfile], Awaitable]] = {
+    "sync": lambda client, rng, profile: client.sync(),
+    "sliding_sync": lambda client, rng, profile: client.sliding_sync(),
+    "send_message": lambda client, rng, profile: client.send_message(rng.choice(client.rooms)),
+    "create_room": lambda client, rng, profile: client.create_room(),
+    "media": _media,
+}
+
+
+async def _simulate_user(client: SimulatedClient, rng: random.Random, profile: LoadProfile, deadline: float):
+    operations = list(profile.mix)
+    weights = [profile.mix[operation] for operation in operations]
+
+    # Every user needs a room to send messages to
+    while not client.rooms and time.monotonic() < deadline:
+        try:
+            await client.create_room()
+        except (aiohttp.ClientError, TimeoutError):
+            await asyncio.sleep(1)
+
+    while time.monotonic() < deadline:
+        operation = rng.choices(operations, weights)[0]
+        # Failures are already counted against the endpoint, carry on generating load
+        with contextlib.suppress(aiohttp.ClientError, TimeoutError):
+            await OPERATIONS[operation](client, rng, profile)
+        if profile.think_time:
+            await asyncio.sleep(profile.think_time)
+
+
+async def run_load(
+    access_tokens: list[str],
+    synapse_fqdn: str,
+    server_name: str,
+    ssl_context: SSLContext,
+    profile: LoadProfile,
+    seed: int | None = None,
+) -> LoadReport:
+    """Drives a mix of client operations from each user concurrently and reports the latency per endpoint class"""
+    unknown_operations = set(profile.mix) - set(OPERATIONS)
+    if unknown_operations:
+        raise ValueError(f"Unknown load operations: {', '.join(sorted(unknown_operations))}")
+
+    report = LoadReport(duration=profile.duration, users=len(access_tokens))
+    # Enough connections for every user to have a request in flight, separate from the shared keep-alive pool
+    connector = aiohttp.TCPConnector(ssl=ssl_context, limit=len(access_tokens))
+    timeout = aiohttp.ClientTimeout(total=profile.request_timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        seeds = random.Random(seed)
+        clients = [
+            SimulatedClient(session, synapse_fqdn, server_name, access_token, report) for access_token in access_tokens
+        ]
+        start = time.monotonic()
+        deadline = start + profile.duration
+        await asyncio.gather(
+            *[_simulate_user(client, random.Random(seeds.random()), profile, deadline) for client in clients]
+        )
+        report.duration = time.monotonic() - start
+    return report
@@ -0,0 +1,60 @@
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+import math
+from dataclasses import dataclass, field
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return math.nan
+    rank = math.ceil(percent / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+@dataclass
+class EndpointStats:
+    # Seconds taken by each successful request
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    def record(self, latency: float):
+        self.latencies.append(latency)
+
+    def percentiles(self, *percents: float) -> list[float]:
+        sorted_latencies = sorted(self.latencies)
+        return [percentile(sorted_latencies, percent) for percent in percents]
+
+
+@dataclass
+class LoadReport:
+    # Seconds the load was generated for
+    duration: float
+    users: int
+    endpoints: dict[str, EndpointStats] = field(default_factory=dict)
+
+    def endpoint(self, endpoint_class: str) -> EndpointStats:
+        return self.endpoints.setdefault(endpoint_class, EndpointStats())
+
+    def throughput(self, endpoint_class: str) -> float:
+        """Successful requests per second"""
+        return len(self.endpoints[endpoint_class].latencies) / self.duration if self.duration else 0
+
+    @property
+    def total_errors(self) -> int:
+        return sum(stats.errors for stats in self.endpoints.values())
+
+    def summary(self) -> str:
+        lines = [
+            f"{self.users} users for {self.duration:.1f}s",
+            f"{'endpoint':<16}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}",
+        ]
+        for endpoint_class, stats in sorted(self.endpoints.items()):
+            p50, p95, p99 = (latency * 1000 for latency in stats.percentiles(50, 95, 99))
+            lines.append(
+                f"{endpoint_class:<16}{len(stats.latencies):>10}{stats.errors:>8}"
+                f"{self.throughput(endpoint_class):>10.1f}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}"
+            )
+        return "\n".join(lines)
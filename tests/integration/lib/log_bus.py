@@ -0,0 +1,158 @@
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+import asyncio
+import re
+import time
+from collections import deque
+
+# The start of named groups and their backreferences in a pattern, so they can be namespaced per subscription
+NAMED_GROUP = re.compile(r"(?<!\\)(\(\?P[<=])(\w+)")
+
+
+class Subscription:
+    """The log lines matching a pattern, held in a bounded ring buffer.
+
+    When the subscriber falls behind the oldest lines are dropped and counted, rather than buffering without limit.
+    """
+
+    def __init__(self, bus: "LogBus", pattern: re.Pattern | None, buffer_size: int, window: float | None):
+        self.bus = bus
+        self.pattern = pattern
+        self.lines: deque[str] = deque(maxlen=buffer_size)
+        self.dropped = 0
+        self.expires_at = time.monotonic() + window if window is not None else None
+        self.closed = False
+        self._available = asyncio.Event()
+
+    def matches(self, log_line: str) -> bool:
+        return self.pattern is None or self.pattern.search(log_line) is not None
+
+    def deliver(self, log_line: str):
+        if len(self.lines) == self.lines.maxlen:
+            self.dropped += 1
+        self.lines.append(log_line)
+        self._available.set()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.bus.unsubscribe(self)
+            self._available.set()
+
+    def expired(self, now: float) -> bool:
+        return self.expires_at is not None and now >= self.expires_at
+
+    async def get(self, timeout: float | None = None) -> str:
+        """The next matching line. Raises TimeoutError if there isn't one in time and EOFError once closed/expired"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while not self.lines:
+            now = time.monotonic()
+            if self.closed or self.expired(now):
+                self.close()
+                raise EOFError("Subscription closed")
+
+            wake_at = [when for when in (deadline, self.expires_at) if when is not None]
+            self._available.clear()
+            try:
+                await asyncio.wait_for(self._available.wait(), timeout=min(wake_at) - now if wake_at else None)
+            except TimeoutError:
+                # The window ending is handled at the top of the loop
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise
+        return self.lines.popleft()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        try:
+            return await self.get()
+        except EOFError:
+            raise StopAsyncIteration from None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class LogBus:
+    """Fans log lines out to subscribers, only evaluating their patterns for lines that something wants.
+
+    All the subscriptions' patterns are compiled into a single regex, with an optional lookahead per subscription
+    that captures into a group named for that subscription. Matching a line once says which subscriptions want it.
+    Named groups in the subscriptions' patterns are namespaced per subscription, so different subscriptions can use
+    the same group names. Numbered backreferences aren't supported. This has `put_nowait` so it can be used
+    anywhere an asyncio.Queue of log lines is expected.
+    """
+
+    def __init__(self, buffer_size: int = 1000):
+        self.buffer_size = buffer_size
+        self.subscriptions: list[Subscription] = []
+        self.published = 0
+        self._combined: re.Pattern | None = None
+        self._dispatch: dict[str, Subscription] = {}
+        self._match_all: list[Subscription] = []
+
+    def subscribe(
+        self,
+        pattern: str | None = None,
+        *,
+        substring: str | None = None,
+        buffer_size: int | None = None,
+        window: float | None = None,
+    ) -> Subscription:
+        """Subscribes to lines matching the regex `pattern` or containing `substring`, or all lines if neither is given.
+
+        With a `window` the subscription closes itself that many seconds after subscribing.
+        """
+        if pattern is not None and substring is not None:
+            raise ValueError("Only one of pattern and substring can be given")
+        if substring is not None:
+            pattern = re.escape(substring)
+        subscription = Subscription(
+            self, re.compile(pattern) if pattern is not None else None, buffer_size or self.buffer_size, window
+        )
+        self.subscriptions.append(subscription)
+        self._compile()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+            self._compile()
+
+    def _compile(self):
+        self._match_all = [subscription for subscription in self.subscriptions if subscription.pattern is None]
+        self._dispatch = {}
+        lookaheads = []
+        for index, subscription in enumerate(self.subscriptions):
+            if subscription.pattern is None:
+                continue
+            group = f"_s{index}"
+            pattern = NAMED_GROUP.sub(rf"\g<1>{group}_\g<2>", subscription.pattern.pattern)
+            lookaheads.append(f"(?:(?=[\\s\\S]*?(?P<{group}>{pattern})))?")
+            self._dispatch[group] = subscription
+        self._combined = re.compile("".join(lookaheads)) if lookaheads else None
+
+    def publish(self, log_line: str):
+        self.published += 1
+        wanted = list(self._match_all)
+        if self._combined is not None and (match := self._combined.match(log_line)) is not None:
+            wanted += [subscription for group, subscription in self._dispatch.items() if match.group(group) is not None]
+        if not wanted:
+            return
+
+        now = time.monotonic()
+        for subscription in wanted:
+            if subscription.closed:
+                continue
+            if subscription.expired(now):
+                subscription.close()
+            else:
+                subscription.deliver(log_line)
+
+    put_nowait = publish
@@ -1,20 +1,34 @@
 # Copyright 2024-2025 New Vector Ltd
-# Copyright 2025 Element Creations Ltd
+# Copyright 2025-2026 Element Creations Ltd
 #
 # SPDX-License-Identifier: AGPL-3.0-only
 
+import asyncio
+import time
+from dataclasses import dataclass
 from ssl import SSLContext
+from typing import Any
 from urllib.parse import urlparse
 
 import aiohttp
 import pytest
-from aiohttp_retry import RetryClient
 
 from ..fixtures import ESSData
-from .utils import aiohttp_get_json, aiohttp_post_json, retry_options
+from .utils import aiohttp_client, aiohttp_get_json, aiohttp_post_json, pytest_cache_key
+
+
+@dataclass(frozen=True)
+class ClientToken:
+    access_token: str
+    # Unix timestamp after which the token can no longer be used
+    expires_at: float
 
 
 async def get_client_token(mas_fqdn: str, generated_data: ESSData, ssl_context: SSLContext) -> str:
+    return (await request_client_token(mas_fqdn, generated_data, ssl_context)).access_token
+
+
+async def request_client_token(mas_fqdn: str, generated_data: ESSData, ssl_context: SSLContext) -> ClientToken:
     client_credentials_data = {"grant_type": "client_credentials", "scope": "urn:mas:admin urn:mas:graphql:*"}
     url = f"https://{mas_fqdn}/oauth2/token"
     host = urlparse(url).hostname
@@ -22,9 +36,8 @@ async def get_client_token(mas_fqdn: str, generated_data: ESSData, ssl_context:
         raise ValueError(f"{url} does not have a hostname")
 
     async with (
-        aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context)) as session,
-        RetryClient(session, retry_options=retry_options, raise_for_status=True) as retry,
-        retry.post(
+        aiohttp_client(ssl_context) as client,
+        client.post(
             url.replace(host, "127.0.0.1"),
             headers={"Host": host},
             server_hostname=host,
@@ -32,7 +45,15 @@ async def get_client_token(mas_fqdn: str, generated_data: ESSData, ssl_context:
             auth=aiohttp.BasicAuth("000000000000000PYTESTADM1N", generated_data.mas_oidc_client_secret),
         ) as response,
     ):
-        return (await response.json())["access_token"]
+        token_response = await response.json()
+        return ClientToken(token_response["access_token"], time.time() + token_response["expires_in"])
+
+
+async def get_site_config(mas_fqdn: str, bearer_token: str, ssl_context: SSLContext) -> dict[str, Any]:
+    headers = {"Authorization": f"Bearer {bearer_token}"}
+    return await aiohttp_get_json(
+        f"https://{mas_fqdn}/api/admin/v1/site-config", headers=headers, ssl_context=ssl_context
+    )
 
 
 async def create_mas_user(
@@ -44,11 +65,14 @@ async def create_mas_user(
     bearer_token: str,
     ssl_context: SSLContext,
     pytestconfig: pytest.Config,
+    site_config: dict[str, Any] | None = None,
 ) -> str:
     """
     Create the user and return their access token
+
+    The site config is fetched if it isn't provided, callers creating many users should fetch it once and pass it in.
     """
-    cached_user_token = pytestconfig.cache.get(f"ess-helm/cached-tokens/{username}", None)
+    cached_user_token = pytestconfig.cache.get(pytest_cache_key(f"cached-tokens/{username}"), None)
     if cached_user_token:
         # Locally the cached token may be from a previous run but we don't know whether it is with the same DB or not
         # We still want the caching in-case we request this for the same user multiple times in the same run
@@ -62,7 +86,7 @@ async def create_mas_user(
         except aiohttp.ClientResponseError:
             pass
 
-        pytestconfig.cache.set(f"ess-helm/cached-tokens/{username}", None)
+        pytestconfig.cache.set(pytest_cache_key(f"cached-tokens/{username}"), None)
 
     headers = {"Authorization": f"Bearer {bearer_token}"}
     try:
@@ -76,24 +100,30 @@ async def create_mas_user(
         )
     user_id = response["data"]["id"]
 
-    response = await aiohttp_get_json(
-        f"https://{mas_fqdn}/api/admin/v1/site-config", headers=headers, ssl_context=ssl_context
-    )
-    if response["password_login_enabled"]:
+    if site_config is None:
+        site_config = await get_site_config(mas_fqdn, bearer_token, ssl_context)
+
+    # None of these depend on each other, so they're all sent at once
+    user_updates = []
+    if site_config["password_login_enabled"]:
         set_password_data = {"password": password, "skip_password_check": True}
-        response = await aiohttp_post_json(
-            f"https://{mas_fqdn}/api/admin/v1/users/{user_id}/set-password",
-            headers=headers,
-            data=set_password_data,
-            ssl_context=ssl_context,
+        user_updates.append(
+            aiohttp_post_json(
+                f"https://{mas_fqdn}/api/admin/v1/users/{user_id}/set-password",
+                headers=headers,
+                data=set_password_data,
+                ssl_context=ssl_context,
+            )
         )
 
     set_admin_data = {"admin": admin}
-    response = await aiohttp_post_json(
-        f"https://{mas_fqdn}/api/admin/v1/users/{user_id}/set-admin",
-        headers=headers,
-        data=set_admin_data,
-        ssl_context=ssl_context,
+    user_updates.append(
+        aiohttp_post_json(
+            f"https://{mas_fqdn}/api/admin/v1/users/{user_id}/set-admin",
+            headers=headers,
+            data=set_admin_data,
+            ssl_context=ssl_context,
+        )
     )
 
     check_user_query = """
@@ -104,8 +134,11 @@ async def create_mas_user(
         }
     """
     check_user_data = {"query": check_user_query, "variables": {"username": username}}
-    response = await aiohttp_post_json(
-        f"https://{mas_fqdn}/graphql", headers=headers, data=check_user_data, ssl_context=ssl_context
+    *_, response = await asyncio.gather(
+        *user_updates,
+        aiohttp_post_json(
+            f"https://{mas_fqdn}/graphql", headers=headers, data=check_user_data, ssl_context=ssl_context
+        ),
     )
     graphql_user_id = response["data"]["userByUsername"]["id"]
 
@@ -129,5 +162,7 @@ async def create_mas_user(
     response = await aiohttp_post_json(
         f"https://{mas_fqdn}/graphql", headers=headers, data=add_access_token_data, ssl_context=ssl_context
     )
-    pytestconfig.cache.set(f"ess-helm/cached-tokens/{username}", response["data"]["createOauth2Session"]["accessToken"])
+    pytestconfig.cache.set(
+        pytest_cache_key(f"cached-tokens/{username}"), response["data"]["createOauth2Session"]["accessToken"]
+    )
     return response["data"]["createOauth2Session"]["accessToken"]
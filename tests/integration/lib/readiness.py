@@ -0,0 +1,197 @@
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+import asyncio
+import contextlib
+from collections.abc import Callable
+from typing import Any
+
+from lightkube import AsyncClient
+from lightkube.resources.apps_v1 import Deployment
+from lightkube.resources.batch_v1 import Job
+from lightkube.resources.core_v1 import Endpoints, Pod
+from lightkube.types import on_error_retry
+
+# Given all the current objects of a type in a namespace, returns a value once the awaited condition is met
+# or None if it isn't met yet
+Condition = Callable[[dict[str, Any]], Any]
+
+
+class ResourceWatch:
+    """A single watch of one resource type in one namespace, shared by everything waiting on those resources.
+
+    The current state of every object is kept up to date from the watch events and every pending
+    condition is re-evaluated as events arrive.
+    """
+
+    def __init__(self, kube_client: AsyncClient, resource: type, namespace: str):
+        self.kube_client = kube_client
+        self.resource = resource
+        self.namespace = namespace
+        self.objects: dict[str, Any] = {}
+        self._synced = False
+        self._waiters: list[tuple[Condition, asyncio.Future]] = []
+        self._task = asyncio.create_task(self._run())
+        self._task.add_done_callback(self._fail_waiters)
+
+    async def _run(self):
+        initial_objects = self.kube_client.list(self.resource, namespace=self.namespace)
+        async for obj in initial_objects:
+            self.objects[obj.metadata.name] = obj
+        self._synced = True
+        self._resolve_waiters()
+
+        async for event, obj in self.kube_client.watch(
+            self.resource,
+            namespace=self.namespace,
+            resource_version=initial_objects.resourceVersion,
+            on_error=on_error_retry,
+        ):
+            if event == "DELETED":
+                self.objects.pop(obj.metadata.name, None)
+            else:
+                self.objects[obj.metadata.name] = obj
+            self._resolve_waiters()
+
+    def _resolve_waiters(self):
+        for waiter in list(self._waiters):
+            condition, future = waiter
+            if not future.done():
+                result = condition(self.objects)
+                if result is None:
+                    continue
+                future.set_result(result)
+            self._waiters.remove(waiter)
+
+    def _fail_waiters(self, task: asyncio.Task):
+        if task.cancelled():
+            return
+        exception = task.exception() or RuntimeError(f"Watch of {self.resource.__name__} unexpectedly stopped")
+        for _, future in self._waiters:
+            if not future.done():
+                future.set_exception(exception)
+        self._waiters.clear()
+
+    async def wait_for(self, condition: Condition, timeout: float, description: str) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((condition, future))
+        if self._synced:
+            self._resolve_waiters()
+        if self._task.done():
+            self._fail_waiters(self._task)
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except TimeoutError as e:
+            raise TimeoutError(f"{description} in {self.namespace} after {timeout}s") from e
+        finally:
+            with contextlib.suppress(ValueError):
+                self._waiters.remove((condition, future))
+
+    async def close(self):
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+
+
+def _named(name: str, check: Callable[[Any], bool]) -> Condition:
+    def condition(objects: dict[str, Any]) -> Any:
+        obj = objects.get(name)
+        return obj if obj is not None and check(obj) else None
+
+    return condition
+
+
+def endpoints_are_ready(endpoints: Endpoints) -> bool:
+    if not endpoints.subsets:
+        return False
+    return all(subset.addresses and subset.ports and not subset.notReadyAddresses for subset in endpoints.subsets)
+
+
+def deployment_is_rolled_out(deployment: Deployment) -> bool:
+    # replicas: Total number of non-terminating pods targeted by this deployment
+    # updatedReplicas: Total number of non-terminating pods targeted by this deployment that have
+    #                  the desired template spec.
+    if not deployment.metadata or not deployment.spec or not deployment.status:
+        return False
+    if deployment.metadata.generation and (deployment.status.observedGeneration or 0) < deployment.metadata.generation:
+        return False
+    desired_replicas = deployment.spec.replicas if deployment.spec.replicas is not None else 1
+    return (deployment.status.updatedReplicas or 0) == (deployment.status.replicas or 0) == desired_replicas
+
+
+def job_is_complete(job: Job) -> bool:
+    return any(
+        condition.type == "Complete" and condition.status == "True"
+        for condition in (job.status.conditions if job.status and job.status.conditions else [])
+    )
+
+
+def pod_has_completed(pod: Pod) -> bool:
+    return bool(
+        pod.status
+        and pod.status.containerStatuses
+        and pod.status.containerStatuses[0].state
+        and pod.status.containerStatuses[0].state.terminated
+        and pod.status.containerStatuses[0].state.terminated.reason == "Completed"
+    )
+
+
+def load_balancer_is_assigned(obj: Any) -> bool:
+    return bool(obj.status and obj.status.loadBalancer and obj.status.loadBalancer.ingress)
+
+
+def custom_resource_is_ready(obj: Any) -> bool:
+    return any(
+        condition["type"] == "Ready" and condition["status"] == "True"
+        for condition in ((obj.status or {}).get("conditions") or [])
+    )
+
+
+class ReadinessEngine:
+    """Awaitable readiness conditions for Kubernetes resources, resolved from shared watches rather than polling"""
+
+    def __init__(self, kube_client: AsyncClient):
+        self.kube_client = kube_client
+        self._watches: dict[tuple[type, str], ResourceWatch] = {}
+
+    def _watch(self, resource: type, namespace: str) -> ResourceWatch:
+        if (resource, namespace) not in self._watches:
+            self._watches[(resource, namespace)] = ResourceWatch(self.kube_client, resource, namespace)
+        return self._watches[(resource, namespace)]
+
+    async def wait_for(
+        self, resource: type, name: str, namespace: str, check: Callable[[Any], bool], timeout: float = 120
+    ) -> Any:
+        return await self._watch(resource, namespace).wait_for(
+            _named(name, check), timeout, f"{resource.__name__}/{name} didn't become ready"
+        )
+
+    async def endpoints_ready(self, name: str, namespace: str, timeout: float = 120) -> Endpoints:
+        return await self.wait_for(Endpoints, name, namespace, endpoints_are_ready, timeout)
+
+    async def rollout_complete(self, name: str, namespace: str, timeout: float = 120) -> Deployment:
+        return await self.wait_for(Deployment, name, namespace, deployment_is_rolled_out, timeout)
+
+    async def all_rollouts_complete(self, namespace: str, timeout: float = 120) -> list[Deployment]:
+        def all_rolled_out(deployments: dict[str, Deployment]) -> list[Deployment] | None:
+            if all(deployment_is_rolled_out(deployment) for deployment in deployments.values()):
+                return list(deployments.values())
+            return None
+
+        return await self._watch(Deployment, namespace).wait_for(
+            all_rolled_out, timeout, "Not all Deployments rolled out"
+        )
+
+    async def job_complete(self, name: str, namespace: str, timeout: float = 300) -> Job:
+        return await self.wait_for(Job, name, namespace, job_is_complete, timeout)
+
+    async def pod_completed(self, name: str, namespace: str, timeout: float = 60) -> Pod:
+        return await self.wait_for(Pod, name, namespace, pod_has_completed, timeout)
+
+    async def load_balancer_assigned(self, resource: type, name: str, namespace: str, timeout: float = 120) -> Any:
+        return await self.wait_for(resource, name, namespace, load_balancer_is_assigned, timeout)
+
+    async def close(self):
+        await asyncio.gather(*[watch.close() for watch in self._watches.values()])
+        self._watches.clear()
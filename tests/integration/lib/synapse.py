@@ -1,18 +1,21 @@
 # Copyright 2024-2025 New Vector Ltd
-# Copyright 2025 Element Creations Ltd
+# Copyright 2025-2026 Element Creations Ltd
 #
 # SPDX-License-Identifier: AGPL-3.0-only
 
+import asyncio
 import hashlib
 import hmac
 import mimetypes
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass
 from pathlib import Path
 from ssl import SSLContext
 
 import aiohttp
 import pytest
 
-from .utils import KubeCtl, aiohttp_client, aiohttp_get_json, aiohttp_post_json
+from .utils import KubeCtl, aiohttp_client, aiohttp_get_json, aiohttp_post_json, pytest_cache_key
 
 
 async def get_nonce(synapse_fqdn: str, ssl_context) -> str:
@@ -55,7 +58,7 @@ async def create_synapse_user(
     """
     Create the user and return access_token
     """
-    cached_user_token = pytestconfig.cache.get(f"ess-helm/cached-tokens/{username}", None)
+    cached_user_token = pytestconfig.cache.get(pytest_cache_key(f"cached-tokens/{username}"), None)
     if cached_user_token:
         # Locally the cached token may be from a previous run but we don't know whether it is with the same DB or not
         # We still want the caching in-case we request this for the same user multiple times in the same run
@@ -69,7 +72,7 @@ async def create_synapse_user(
         except aiohttp.ClientResponseError:
             pass
 
-        pytestconfig.cache.set(f"ess-helm/cached-tokens/{username}", None)
+        pytestconfig.cache.set(pytest_cache_key(f"cached-tokens/{username}"), None)
         # The below is going to fail if this is a subsequent run against the same DB (as the user ID will exist) but
         # the access token wasn't valid/for the correct user. Unsure how we could ever get into this state, but at
         # least now we're succeeding in the case that this is a run against a new DB. `pytest --cache-clear` would
@@ -85,48 +88,107 @@ async def create_synapse_user(
         "mac": mac,
     }
     response = await aiohttp_post_json(f"https://{synapse_fqdn}/_synapse/admin/v1/register", data, {}, ssl_context)
-    pytestconfig.cache.set(f"ess-helm/cached-tokens/{username}", response["access_token"])
+    pytestconfig.cache.set(pytest_cache_key(f"cached-tokens/{username}"), response["access_token"])
     return response["access_token"]
 
 
-async def upload_media(synapse_fqdn: str, user_access_token: str, file_path: Path, ssl_context: SSLContext):
-    headers = {}
-    headers["Authorization"] = f"Bearer {user_access_token}"
-    headers["Host"] = synapse_fqdn
+# Media is streamed to and from Synapse in chunks of this size, so large files are never held in memory in full
+MEDIA_CHUNK_SIZE = 1024 * 1024
+
+# How many paths are passed to each sha256sum in the media pod, well within the maximum command line length
+MEDIA_STORE_HASH_BATCH_SIZE = 500
+
+
+@dataclass(frozen=True)
+class UploadedMedia:
+    file_path: Path
+    content_upload_json: dict
+    sha256: str
+    size: int
+
+    @property
+    def content_uri(self) -> str:
+        return self.content_upload_json["content_uri"]
+
+    def media_id(self, server_name: str) -> str:
+        return self.content_uri.replace(f"mxc://{server_name}/", "")
+
+
+class _FileChunks:
+    """A file's chunks, read and hashed afresh each time it is iterated.
+
+    The pooled client retries on some errors. aiohttp iterates the request body again for each attempt, so each
+    retry sends the whole file and the hash is of the attempt that succeeded.
+    """
+
+    def __init__(self, file_path: Path, chunk_size: int):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.sha256 = hashlib.sha256()
+
+    async def __aiter__(self) -> AsyncGenerator[bytes]:
+        self.sha256 = hashlib.sha256()
+        with open(self.file_path, "rb") as f:
+            while chunk := await asyncio.to_thread(f.read, self.chunk_size):
+                self.sha256.update(chunk)
+                yield chunk
 
+
+async def upload_media_file(
+    synapse_fqdn: str,
+    user_access_token: str,
+    file_path: Path,
+    ssl_context: SSLContext,
+    chunk_size: int = MEDIA_CHUNK_SIZE,
+) -> UploadedMedia:
+    """
+    Stream a file to Synapse, hashing it as it is sent
+    """
     content_type, _ = mimetypes.guess_type(file_path)
-    if not content_type:
-        content_type = "application/octet-stream"
+    size = file_path.stat().st_size
+    headers = {
+        "Authorization": f"Bearer {user_access_token}",
+        "Host": synapse_fqdn,
+        "Content-Type": content_type or "application/octet-stream",
+        # Synapse rejects uploads without a Content-Length, so this is streamed rather than chunked transfer encoded
+        "Content-Length": str(size),
+    }
 
-    params = {"filename": file_path.name}
+    file_chunks = _FileChunks(file_path, chunk_size)
+    async with (
+        aiohttp_client(ssl_context) as client,
+        client.post(
+            "https://127.0.0.1/_matrix/media/v3/upload",
+            server_hostname=synapse_fqdn,
+            headers=headers,
+            params={"filename": file_path.name},
+            data=file_chunks,
+        ) as response,
+    ):
+        response_json = await response.json()
 
-    with open(file_path, "rb") as f:
-        async with (
-            aiohttp_client(ssl_context) as client,
-            client.post(
-                "https://127.0.0.1/_matrix/media/v3/upload",
-                server_hostname=synapse_fqdn,
-                headers=headers,
-                params=params,
-                data=f.read(),
-            ) as response,
-        ):
-            response_json = await response.json()
+    assert response_json["content_uri"].startswith("mxc://")
+    return UploadedMedia(file_path, response_json, file_chunks.sha256.hexdigest(), size)
 
-            assert response_json["content_uri"].startswith("mxc://")
 
-            return response_json
+async def upload_media(synapse_fqdn: str, user_access_token: str, file_path: Path, ssl_context: SSLContext):
+    uploaded_media = await upload_media_file(synapse_fqdn, user_access_token, file_path, ssl_context)
+    return uploaded_media.content_upload_json
 
 
 async def download_media(
-    server_name: str, synapse_fqdn: str, user_access_token, content_upload_json: dict, ssl_context: SSLContext
+    server_name: str,
+    synapse_fqdn: str,
+    user_access_token,
+    content_upload_json: dict,
+    ssl_context: SSLContext,
+    chunk_size: int = MEDIA_CHUNK_SIZE,
 ):
     headers = {}
     headers["Authorization"] = f"Bearer {user_access_token}"
     headers["Host"] = synapse_fqdn
     content_id = content_upload_json["content_uri"].replace(f"mxc://{server_name}/", "")
 
-    # Initialize SHA-256 hasher
     sha256_hash = hashlib.sha256()
     async with (
         aiohttp_client(ssl_context) as client,
@@ -136,23 +198,90 @@ async def download_media(
             server_hostname=synapse_fqdn,
         ) as response,
     ):
-        # Process the stream in chunks
-        while True:
-            chunk = await response.content.read(8192)  # 8KB chunks
-            if not chunk:
-                break
+        async for chunk in response.content.iter_chunked(chunk_size):
             sha256_hash.update(chunk)
     return sha256_hash.hexdigest()
 
 
+async def upload_media_files(
+    synapse_fqdn: str,
+    user_access_token: str,
+    file_paths: list[Path],
+    ssl_context: SSLContext,
+    concurrency: int = 8,
+) -> list[UploadedMedia]:
+    """
+    Upload many files to Synapse, at most `concurrency` at once
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def upload(file_path: Path) -> UploadedMedia:
+        async with semaphore:
+            return await upload_media_file(synapse_fqdn, user_access_token, file_path, ssl_context)
+
+    return await asyncio.gather(*[upload(file_path) for file_path in file_paths])
+
+
+async def download_media_files(
+    server_name: str,
+    synapse_fqdn: str,
+    user_access_token: str,
+    uploaded_media: list[UploadedMedia],
+    ssl_context: SSLContext,
+    concurrency: int = 8,
+) -> list[str]:
+    """
+    Download many pieces of media from Synapse, at most `concurrency` at once, returning the SHA-256 of each
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def download(media: UploadedMedia) -> str:
+        async with semaphore:
+            return await download_media(
+                server_name, synapse_fqdn, user_access_token, media.content_upload_json, ssl_context
+            )
+
+    return await asyncio.gather(*[download(media) for media in uploaded_media])
+
+
+def media_store_path(content_id: str) -> str:
+    # Synapse's short-term disk storage for local media
+    return f"/media/media_store/local_content/{content_id[0:2]}/{content_id[2:4]}/{content_id[4:]}"
+
+
+async def hash_media_store_files(kubectl: KubeCtl, media_pod, namespace, content_ids: list[str]) -> dict[str, str]:
+    """
+    The SHA-256 of each piece of media in the media pod's media_store, hashing a batch of files in each exec.
+
+    Media that isn't in the media_store is missing from the result.
+    """
+    paths_to_content_ids = {media_store_path(content_id): content_id for content_id in content_ids}
+    paths = list(paths_to_content_ids)
+    batches = [paths[i : i + MEDIA_STORE_HASH_BATCH_SIZE] for i in range(0, len(paths), MEDIA_STORE_HASH_BATCH_SIZE)]
+    # sha256sum exits non-zero if any file is missing, which would otherwise fail the whole batch
+    outputs = await asyncio.gather(
+        *[
+            kubectl.exec(media_pod, namespace, ["sh", "-c", 'sha256sum "$@" || true', "sha256sum", *batch])
+            for batch in batches
+        ]
+    )
+
+    content_sha256s = {}
+    for output in outputs:
+        for line in output.splitlines():
+            sha256, _, path = line.strip().partition("  ")
+            if path in paths_to_content_ids:
+                content_sha256s[paths_to_content_ids[path]] = sha256
+    return content_sha256s
+
+
+async def assert_media_store_contents(kubectl: KubeCtl, media_pod, namespace, content_ids_to_sha256: dict[str, str]):
+    media_store_sha256s = await hash_media_store_files(kubectl, media_pod, namespace, list(content_ids_to_sha256))
+    assert media_store_sha256s == content_ids_to_sha256
+
+
 async def assert_downloaded_content(
     kubectl: KubeCtl, media_pod, namespace, source_sha256, content_id, content_download_sha256
 ):
     assert source_sha256 == content_download_sha256.split(" ")[0]
-
-    # Look in Synapse's short-term disk storage for the file
-    path = f"local_content/{content_id[0:2]}/{content_id[2:4]}/{content_id[4:]}"
-    local_path = f"/media/media_store/{path}"
-
-    local_media_sha256 = await kubectl.exec(media_pod, namespace, ["sha256sum", local_path])
-    assert source_sha256 == local_media_sha256.split(" ")[0]
+    await assert_media_store_contents(kubectl, media_pod, namespace, {content_id: source_sha256})
@@ -24,6 +24,8 @@ from lightkube.resources.apiextensions_v1 import CustomResourceDefinition
 from lightkube.resources.core_v1 import Pod
 from pytest_kubernetes.providers import AClusterManager
 
+from .log_bus import LogBus
+
 retry_options = JitterRetry(
     attempts=12,
     statuses={
@@ -54,6 +56,12 @@ class KubeCtl:
         )
 
 
+def pytest_cache_key(key: str) -> str:
+    """Namespaces a pytest cache key by deployment, so that side by side deployments don't share cached values"""
+    deployment = os.environ.get("ESS_DEPLOYMENT")
+    return f"ess-helm/{deployment}/{key}" if deployment else f"ess-helm/{key}"
+
+
 def docker_config_json(auths: list[DockerAuth]) -> str:
     docker_config_auths = {}
     for auth in auths:
@@ -70,13 +78,77 @@ def b64encode(value: str):
     return base64.b64encode(value.encode("utf-8")).decode("utf-8")
 
 
+class HTTPClientPool:
+    """Keep-alive HTTP clients shared by every request in the session, one per SNI host.
+
+    Requests to the ingress are made to 127.0.0.1 with the server_hostname set. aiohttp doesn't include
+    the SNI host in its connection pool key, so each SNI host needs its own connector to safely reuse
+    connections. Clients are also per event loop as aiohttp sessions can't be shared between loops.
+    """
+
+    def __init__(self, limit_per_host: int = 16, keepalive_timeout: float = 60):
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self._sessions: dict[tuple[asyncio.AbstractEventLoop, SSLContext, str | None], aiohttp.ClientSession] = {}
+        self._clients: dict[tuple[asyncio.AbstractEventLoop, SSLContext, str | None], RetryClient] = {}
+
+    def client(self, ssl_context: SSLContext, sni_host: str | None = None) -> RetryClient:
+        key = (asyncio.get_running_loop(), ssl_context, sni_host)
+        if key not in self._sessions or self._sessions[key].closed:
+            connector = aiohttp.TCPConnector(
+                ssl=ssl_context, limit=0, limit_per_host=self.limit_per_host, keepalive_timeout=self.keepalive_timeout
+            )
+            self._sessions[key] = aiohttp.ClientSession(connector=connector)
+            self._clients[key] = RetryClient(self._sessions[key], retry_options=retry_options, raise_for_status=True)
+        return self._clients[key]
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        for key in [key for key in self._sessions if key[0] is loop]:
+            del self._clients[key]
+            await self._sessions.pop(key).close()
+
+
+http_client_pool = HTTPClientPool()
+
+
+@dataclass
+class PooledClient:
+    """Sends each request with the pooled client for the request's SNI host"""
+
+    ssl_context: SSLContext
+
+    def _client(self, kwargs: dict[str, Any]) -> RetryClient:
+        return http_client_pool.client(self.ssl_context, kwargs.get("server_hostname"))
+
+    def request(self, method: str, url: str, **kwargs):
+        return self._client(kwargs).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs):
+        return self._client(kwargs).get(url, **kwargs)
+
+    def options(self, url: str, **kwargs):
+        return self._client(kwargs).options(url, **kwargs)
+
+    def head(self, url: str, **kwargs):
+        return self._client(kwargs).head(url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self._client(kwargs).post(url, **kwargs)
+
+    def put(self, url: str, **kwargs):
+        return self._client(kwargs).put(url, **kwargs)
+
+    def patch(self, url: str, **kwargs):
+        return self._client(kwargs).patch(url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self._client(kwargs).delete(url, **kwargs)
+
+
 @asynccontextmanager
-async def aiohttp_client(ssl_context: SSLContext) -> AsyncGenerator[RetryClient]:
-    async with (
-        aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context)) as session,
-        RetryClient(session, retry_options=retry_options, raise_for_status=True) as client,
-    ):
-        yield client
+async def aiohttp_client(ssl_context: SSLContext) -> AsyncGenerator[PooledClient]:
+    yield PooledClient(ssl_context)
 
 
 async def aiohttp_get_json(url: str, headers: dict, ssl_context: SSLContext) -> Any:
@@ -185,26 +257,75 @@ def merge(a: dict, b: dict, path=None):
     return a
 
 
+# libyaml is much faster at parsing the 5k lines of the chart values
+YAMLLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_MISSING = object()
+
+
+class ResolvedValues:
+    """The chart values merged with a test values file, as they'd be if the chart was installed/templated.
+
+    The files are parsed once and only re-parsed when either file's mtime changes. The result of looking up
+    each dotted property path is cached alongside the parsed values.
+    """
+
+    def __init__(self, base_values_file: Path, test_values_file: Path):
+        self.files = (base_values_file, test_values_file)
+        self._mtimes: tuple[int, ...] | None = None
+        self._values: dict = {}
+        self._lookups: dict[str, Any] = {}
+
+    def _refresh(self):
+        mtimes = tuple(file.stat().st_mtime_ns for file in self.files)
+        if mtimes == self._mtimes:
+            return
+        base_values, test_values = (yaml.load(file.read_text(), Loader=YAMLLoader) for file in self.files)
+        self._values = merge(base_values, test_values or {})
+        self._lookups = {}
+        self._mtimes = mtimes
+
+    def lookup(self, property_path: str) -> Any:
+        """Returns the value at the dot-separated property path or _MISSING if there isn't one"""
+        self._refresh()
+        if property_path not in self._lookups:
+            data: Any = self._values
+            for key in property_path.split("."):
+                if isinstance(data, dict) and key in data:
+                    data = data[key]
+                else:
+                    data = _MISSING
+                    break
+            self._lookups[property_path] = data
+        return self._lookups[property_path]
+
+
+_resolved_values: dict[tuple[Path, Path], ResolvedValues] = {}
+
+
+def resolved_values() -> ResolvedValues | None:
+    """The process-wide resolved values for TEST_VALUES_FILE, or None if it isn't set"""
+    if not os.environ.get("TEST_VALUES_FILE"):
+        return None
+
+    key = (Path().resolve() / "charts" / "matrix-stack" / "values.yaml", Path(os.environ["TEST_VALUES_FILE"]).resolve())
+    if key not in _resolved_values:
+        _resolved_values[key] = ResolvedValues(*key)
+    return _resolved_values[key]
+
+
 def value_file_has(property_path, expected=None):
     """
     Check if a nested property (given as a dot-separated string) is would be true if the chart was installed/templated.
     """
     # If we do not have TEST_VALUES_FILE defined, we return False by default
-    if not os.environ.get("TEST_VALUES_FILE"):
+    values = resolved_values()
+    if values is None:
         return False
 
-    with (
-        open(Path().resolve() / "charts" / "matrix-stack" / "values.yaml") as base_value_file,
-        open(os.environ["TEST_VALUES_FILE"]) as test_value_file,
-    ):
-        data = merge(yaml.safe_load(base_value_file), yaml.safe_load(test_value_file))
-
-    keys = property_path.split(".")
-    for key in keys:
-        if isinstance(data, dict) and key in data:
-            data = data[key]
-        else:
-            return False
+    data = values.lookup(property_path)
+    if data is _MISSING:
+        return False
     return data == expected if expected is not None else True
 
 
@@ -236,22 +357,29 @@ async def get_pods_matching_labels(kube_client: AsyncClient, namespace: str, lab
             active_pods.remove(pod_name)
 
 
-async def stream_logs_from_pod(kube_client: AsyncClient, namespace: str, pod_name: str, log_queue: asyncio.Queue):
+async def stream_logs_from_pod(
+    kube_client: AsyncClient, namespace: str, pod_name: str, log_queue: asyncio.Queue | LogBus
+):
     async for line in kube_client.log(pod_name, namespace=namespace, follow=True, newlines=False):
         log_queue.put_nowait(line)
 
 
 async def stream_logs_from_pods_matching_labels(
-    kube_client: AsyncClient, namespace: str, labels: dict[str, str], log_queue: asyncio.Queue
+    kube_client: AsyncClient,
+    namespace: str,
+    labels: dict[str, str],
+    log_queue: asyncio.Queue | LogBus,
+    follower_interval: float = 0.5,
 ):
+    """Follows the logs of every matching pod, starting at most one new follower every `follower_interval` seconds.
+
+    This spreads out opening the log streams when many pods start at once, e.g. during a rollout.
+    """
+    next_follower_at = 0.0
     async with asyncio.TaskGroup() as task_group:
         async for pod_name in get_pods_matching_labels(kube_client, namespace, labels):
+            loop_time = asyncio.get_running_loop().time()
+            if next_follower_at > loop_time:
+                await asyncio.sleep(next_follower_at - loop_time)
+            next_follower_at = max(next_follower_at, loop_time) + follower_interval
             task_group.create_task(stream_logs_from_pod(kube_client, namespace, pod_name, log_queue))
-
-
-async def forward_matching_logs(input_logs_queue: asyncio.Queue, output_matchers_to_logs_queues: list):
-    while True:
-        log_line = await input_logs_queue.get()
-        for matcher, output_logs_queue in output_matchers_to_logs_queues:
-            if matcher(log_line):
-                output_logs_queue.put_nowait(log_line)
@@ -0,0 +1,26 @@
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+import pytest
+
+from .lib.deployments import deployment_name, multi_deployment_values_files, run_deployment_tests
+
+
+# Only run when TEST_VALUES_FILES lists multiple values files to deploy side by side in the one cluster
+@pytest.mark.multi_deployment
+@pytest.mark.parametrize("values_file", multi_deployment_values_files(), ids=deployment_name)
+@pytest.mark.asyncio_cooperative
+async def test_deployment(
+    values_file,
+    pytestconfig,
+    cert_manager,
+    delegated_ca,
+    ingress,
+    prometheus_operator_crds,
+    loaded_matrix_tools: dict,
+):
+    pytest_args = ["-vv"] if pytestconfig.get_verbosity() > 0 else []
+    result = await run_deployment_tests(values_file, loaded_matrix_tools, pytest_args)
+    print(result.output)
+    assert result.returncode == 0, f"Integration tests against {values_file} failed"
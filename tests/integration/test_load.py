@@ -0,0 +1,33 @@
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+import os
+
+import pytest
+
+from .fixtures import ESSData, UserProvisioner
+from .lib.load import LoadProfile, run_load
+from .lib.utils import value_file_has
+
+
+# Load generation takes a while and its results depend on the machine, so it only runs when asked for
+@pytest.mark.skipif(not os.environ.get("PYTEST_LOAD_DURATION"), reason="PYTEST_LOAD_DURATION not set")
+@pytest.mark.skipif(value_file_has("synapse.enabled", False), reason="Synapse not deployed")
+@pytest.mark.asyncio_cooperative
+async def test_synapse_under_load(
+    ingress_ready, ssl_context, user_provisioner: UserProvisioner, generated_data: ESSData
+):
+    await ingress_ready("synapse")
+
+    users = await user_provisioner.provision_users(int(os.environ.get("PYTEST_LOAD_USERS", "20")), "load-test")
+    report = await run_load(
+        [user.access_token for user in users if user.access_token],
+        f"synapse.{generated_data.server_name}",
+        generated_data.server_name,
+        ssl_context,
+        LoadProfile(duration=float(os.environ["PYTEST_LOAD_DURATION"])),
+    )
+    print(report.summary())
+
+    assert all(len(stats.latencies) > 0 for stats in report.endpoints.values())
@@ -0,0 +1,69 @@
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+import re
+
+import pytest
+
+from .lib.log_bus import LogBus
+
+
+@pytest.mark.asyncio_cooperative
+async def test_log_bus_dispatches_lines_to_the_subscriptions_that_match():
+    log_bus = LogBus()
+    synapse = log_bus.subscribe(r"synapse-[\w-]+/")
+    media = log_bus.subscribe(substring="/_matrix/media/")
+    everything = log_bus.subscribe()
+
+    log_bus.publish("GET /_matrix/client/versions synapse-main/main-0")
+    log_bus.publish("GET /_matrix/media/v3/download synapse-media-repository/media-0")
+    log_bus.publish("GET /_matrix/media/v3/download element-web/web-0")
+
+    assert list(synapse.lines) == [
+        "GET /_matrix/client/versions synapse-main/main-0",
+        "GET /_matrix/media/v3/download synapse-media-repository/media-0",
+    ]
+    assert list(media.lines) == [
+        "GET /_matrix/media/v3/download synapse-media-repository/media-0",
+        "GET /_matrix/media/v3/download element-web/web-0",
+    ]
+    assert len(everything.lines) == 3
+    assert log_bus.published == 3
+
+
+@pytest.mark.asyncio_cooperative
+async def test_log_bus_drops_lines_that_no_subscription_matches():
+    log_bus = LogBus()
+    subscription = log_bus.subscribe("^synapse")
+
+    log_bus.publish("element-web/web-0 synapse")
+    log_bus.publish("haproxy-0")
+
+    assert list(subscription.lines) == []
+    assert log_bus.published == 2
+
+    subscription.close()
+    log_bus.publish("synapse-main/main-0")
+    assert list(subscription.lines) == []
+    assert log_bus.subscriptions == []
+
+
+@pytest.mark.asyncio_cooperative
+async def test_log_bus_subscriptions_can_reuse_group_names():
+    log_bus = LogBus()
+    status = log_bus.subscribe(r"(?P<status>\d{3}) (?P=status)")
+    status_and_backend = log_bus.subscribe(r"(?P<backend>\S+) (?P<status>\d{3})")
+
+    log_bus.publish("synapse-main 200 200")
+    log_bus.publish("synapse-main 404 200")
+
+    assert list(status.lines) == ["synapse-main 200 200"]
+    assert list(status_and_backend.lines) == ["synapse-main 200 200", "synapse-main 404 200"]
+
+
+@pytest.mark.asyncio_cooperative
+async def test_log_bus_rejects_a_pattern_and_substring():
+    log_bus = LogBus()
+    with pytest.raises(ValueError, match=re.escape("Only one of pattern and substring can be given")):
+        log_bus.subscribe("synapse", substring="synapse")
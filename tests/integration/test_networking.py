@@ -4,6 +4,7 @@
 # SPDX-License-Identifier: AGPL-3.0-only
 
 import asyncio
+import contextlib
 import os
 
 import pytest
@@ -14,10 +15,17 @@ from lightkube.resources.core_v1 import Pod, Service
 from prometheus_client.parser import text_string_to_metric_families
 
 from .fixtures.data import ESSData
-from .lib.helpers import run_pod_with_args, wait_for_all_deployments_rolled_out, wait_for_endpoint_ready
+from .lib.helpers import run_pod_with_args
+from .lib.readiness import ReadinessEngine
 from .lib.utils import read_service_monitor_kind
 
 
+async def wait_for_rollouts(readiness: ReadinessEngine, namespace: str):
+    # Best effort, anything that still hasn't rolled out is reported by the checks that follow
+    with contextlib.suppress(TimeoutError):
+        await readiness.all_rollouts_complete(namespace, timeout=30)
+
+
 @pytest.mark.asyncio_cooperative
 async def test_services_have_matching_labels(kube_client: AsyncClient, generated_data: ESSData, matrix_stack):
     ignored_labels = [
@@ -79,24 +87,26 @@ async def test_services_have_matching_labels(kube_client: AsyncClient, generated
 
 
 @pytest.mark.asyncio_cooperative
-async def test_services_have_endpoints(cluster, kube_client: AsyncClient, generated_data: ESSData, matrix_stack):
+async def test_services_have_endpoints(
+    kube_client: AsyncClient, readiness: ReadinessEngine, generated_data: ESSData, matrix_stack
+):
     # Helm will stop waiting when 1 of replicas are ready
     # We need to wait for all replicas to be ready to check that services all have endpoints
-    await wait_for_all_deployments_rolled_out(kube_client, generated_data.ess_namespace)
+    await wait_for_rollouts(readiness, generated_data.ess_namespace)
     endpoints_to_wait = []
     services = {}
     async for service in kube_client.list(
         Service, namespace=generated_data.ess_namespace, labels={"app.kubernetes.io/part-of": op.in_(["matrix-stack"])}
     ):
         assert service.metadata, f"Encountered a service without metadata : {service}"
+        assert service.metadata.name, f"Encountered a service without a name : {service}"
         assert service.spec, f"Encountered a service without spec : {service}"
-        endpoints_to_wait.append(
-            wait_for_endpoint_ready(service.metadata.name, generated_data.ess_namespace, cluster, kube_client)
-        )
+        endpoints_to_wait.append(readiness.endpoints_ready(service.metadata.name, generated_data.ess_namespace))
         services[service.metadata.name] = service
 
     for endpoint in await asyncio.gather(*endpoints_to_wait):
         assert endpoint.metadata is not None, f"Encountered an endpoint without metadata : {endpoint}"
+        assert endpoint.metadata.name, f"Encountered an endpoint without a name : {endpoint}"
         assert endpoint.subsets, f"Endpoint {endpoint.metadata.name} has no subsets"
 
         ports = []
@@ -125,11 +135,12 @@ async def test_services_have_endpoints(cluster, kube_client: AsyncClient, genera
 @pytest.mark.usefixtures("matrix_stack")
 async def test_pods_monitored(
     kube_client: AsyncClient,
+    readiness: ReadinessEngine,
     generated_data: ESSData,
 ):
     # Helm will stop waiting when 1 of replicas are ready
     # We need to wait for all replicas to be ready to be able to compute monitorable and monitored pods
-    await wait_for_all_deployments_rolled_out(kube_client, generated_data.ess_namespace)
+    await wait_for_rollouts(readiness, generated_data.ess_namespace)
     all_running_pods = list[Pod]()
     all_monitorable_pod_names = set[str]()
     async for pod in kube_client.list(
@@ -207,6 +218,7 @@ async def test_pods_monitored(
 @pytest.mark.usefixtures("matrix_stack")
 async def test_service_monitors_point_to_metrics(
     kube_client: AsyncClient,
+    readiness: ReadinessEngine,
     generated_data: ESSData,
 ):
     async for service_monitor in kube_client.list(
@@ -227,7 +239,7 @@ async def test_service_monitors_point_to_metrics(
                 service_port_names = [port.name for port in service.spec.ports if port.name]
                 if endpoint["port"] in service_port_names:
                     assert await has_actual_metrics_on_endpoint(
-                        kube_client, generated_data, service, service_monitor["spec"]["endpoints"]
+                        kube_client, readiness, generated_data, service, service_monitor["spec"]["endpoints"]
                     )
                     found_metrics = True
         assert found_metrics, (
@@ -236,7 +248,7 @@ async def test_service_monitors_point_to_metrics(
 
 
 async def has_actual_metrics_on_endpoint(
-    kube_client: AsyncClient, generated_data: ESSData, service: Service, endpoints
+    kube_client: AsyncClient, readiness: ReadinessEngine, generated_data: ESSData, service: Service, endpoints
 ):
     assert service.metadata
     assert service.spec
@@ -247,6 +259,7 @@ async def has_actual_metrics_on_endpoint(
             if port_spec.name == endpoint["port"]:
                 metrics_data = await run_pod_with_args(
                     kube_client,
+                    readiness,
                     generated_data,
                     "curlimages/curl:latest",
                     "curl",
@@ -10,8 +10,8 @@ import pytest
 from lightkube import AsyncClient
 
 from .fixtures import ESSData, User
-from .fixtures.users import create_mas_user, get_client_token
 from .lib.helpers import deploy_with_values_patch, get_deployment_marker
+from .lib.matrix_authentication_service import create_mas_user, get_client_token
 from .lib.utils import aiohttp_get_json, aiohttp_post_json, value_file_has
 from .test_matrix_authentication_service import test_matrix_authentication_service_graphql_endpoint
 
@@ -1,28 +1,34 @@
 # Copyright 2024-2025 New Vector Ltd
-# Copyright 2025 Element Creations Ltd
+# Copyright 2025-2026 Element Creations Ltd
 #
 # SPDX-License-Identifier: AGPL-3.0-only
 
 import asyncio
 import hashlib
+import os
 import uuid
 from pathlib import Path
 
 import aiohttp
 import pyhelm3
 import pytest
-from lightkube import AsyncClient
 
 from .fixtures import ESSData, User
 from .lib.helpers import deploy_with_values_patch, get_deployment_marker
-from .lib.synapse import assert_downloaded_content, download_media, upload_media
+from .lib.log_bus import LogBus, Subscription
+from .lib.synapse import (
+    assert_downloaded_content,
+    assert_media_store_contents,
+    download_media,
+    download_media_files,
+    upload_media,
+    upload_media_files,
+)
 from .lib.utils import (
     KubeCtl,
     aiohttp_client,
     aiohttp_get_json,
     aiohttp_post_json,
-    forward_matching_logs,
-    stream_logs_from_pods_matching_labels,
     value_file_has,
 )
 
@@ -99,7 +105,7 @@ async def test_simplified_sliding_sync_syncs(ingress_ready, ssl_context, users,
 )
 @pytest.mark.asyncio_cooperative
 async def test_routes_to_synapse_workers_correctly(
-    ingress_ready, kube_client: AsyncClient, ssl_context, generated_data: ESSData
+    ingress_ready, haproxy_log_bus: LogBus, ssl_context, generated_data: ESSData
 ):
     await ingress_ready("synapse")
 
@@ -137,14 +143,7 @@ async def test_routes_to_synapse_workers_correctly(
         "/_matrix/client/versions": main_backend,
     }
 
-    all_haproxy_logs: asyncio.Queue = asyncio.Queue()
-    haproxy_logs_streaming_task = asyncio.create_task(
-        stream_logs_from_pods_matching_labels(
-            kube_client, generated_data.ess_namespace, {"app.kubernetes.io/name": "haproxy"}, all_haproxy_logs
-        )
-    )
-
-    async def make_request_and_assert_backend_used(path, backend, ssl_context, logs_matching_path: asyncio.Queue):
+    async def make_request_and_assert_backend_used(path, backend, ssl_context, logs_matching_path: Subscription):
         attempt_ids = []
         matching_lines = []
         attempts = 0
@@ -163,7 +162,7 @@ async def test_routes_to_synapse_workers_correctly(
                 # Given we've made at least one request, we know there should be something here and we can block for it
                 # However sometimes it appears that logs aren't emitted from HAProxy so don't block indefinitely
                 try:
-                    log_line = await asyncio.wait_for(logs_matching_path.get(), timeout=1.0)
+                    log_line = await logs_matching_path.get(timeout=1.0)
                 except TimeoutError:
                     print(f"No HAProxy logs relating to {path} emitted after 1s. Retrying")
                     break
@@ -185,19 +184,23 @@ async def test_routes_to_synapse_workers_correctly(
             f"Log lines={'\n*'.join(matching_lines)}"
         )
 
-    async with asyncio.TaskGroup() as task_group:
-        path_matchers_and_log_queues = []
-        for path, backend in paths_to_backends.items():
-            logs_matching_path: asyncio.Queue = asyncio.Queue()
-            path_matchers_and_log_queues.append((lambda log_line, path=path: path in log_line, logs_matching_path))
-            task_group.create_task(make_request_and_assert_backend_used(path, backend, ssl_context, logs_matching_path))
+    subscriptions = [haproxy_log_bus.subscribe(substring=path) for path in paths_to_backends]
+    try:
+        async with asyncio.TaskGroup() as task_group:
+            for (path, backend), logs_matching_path in zip(paths_to_backends.items(), subscriptions, strict=True):
+                task_group.create_task(
+                    make_request_and_assert_backend_used(path, backend, ssl_context, logs_matching_path)
+                )
+    finally:
+        for subscription in subscriptions:
+            subscription.close()
 
-        forward_matching_logs_task = asyncio.create_task(
-            forward_matching_logs(all_haproxy_logs, path_matchers_and_log_queues)
-        )
 
-    haproxy_logs_streaming_task.cancel()
-    forward_matching_logs_task.cancel()
+def media_pod(generated_data: ESSData) -> str:
+    media_pod_suffix = (
+        "synapse-media-repo-0" if value_file_has("synapse.workers.media-repository.enabled", True) else "synapse-main-0"
+    )
+    return f"{generated_data.release_name}-{media_pod_suffix}"
 
 
 @pytest.mark.skipif(value_file_has("synapse.enabled", False), reason="Synapse not deployed")
@@ -230,14 +233,9 @@ async def test_synapse_media_upload_fetch_authenticated(
         ssl_context=ssl_context,
     )
 
-    media_pod_suffix = (
-        "synapse-media-repo-0" if value_file_has("synapse.workers.media-repository.enabled", True) else "synapse-main-0"
-    )
-    media_pod = f"{generated_data.release_name}-{media_pod_suffix}"
-
     await assert_downloaded_content(
         KubeCtl(cluster),
-        media_pod,
+        media_pod(generated_data),
         generated_data.ess_namespace,
         source_sha256,
         content_upload_json["content_uri"].replace(f"mxc://{generated_data.server_name}/", ""),
@@ -245,6 +243,43 @@ async def test_synapse_media_upload_fetch_authenticated(
     )
 
 
+@pytest.mark.skipif(value_file_has("synapse.enabled", False), reason="Synapse not deployed")
+@pytest.mark.parametrize("users", [(User(name="media-upload-many"),)], indirect=True)
+@pytest.mark.asyncio_cooperative
+async def test_synapse_media_upload_fetch_many(
+    cluster,
+    ssl_context,
+    users,
+    generated_data: ESSData,
+    tmp_path: Path,
+):
+    user_access_token = users[0].access_token
+    synapse_fqdn = f"synapse.{generated_data.server_name}"
+
+    # A mix of small files and a few large enough to need many chunks
+    file_paths = []
+    for index, size in enumerate([1024] * 16 + [256 * 1024] * 6 + [8 * 1024 * 1024] * 2):
+        file_path = tmp_path / f"media-{index}.bin"
+        file_path.write_bytes(os.urandom(size))
+        file_paths.append(file_path)
+
+    uploaded_media = await upload_media_files(synapse_fqdn, user_access_token, file_paths, ssl_context)
+    for media in uploaded_media:
+        assert media.sha256 == hashlib.sha256(media.file_path.read_bytes()).hexdigest()
+
+    download_sha256s = await download_media_files(
+        generated_data.server_name, synapse_fqdn, user_access_token, uploaded_media, ssl_context
+    )
+    assert download_sha256s == [media.sha256 for media in uploaded_media]
+
+    await assert_media_store_contents(
+        KubeCtl(cluster),
+        media_pod(generated_data),
+        generated_data.ess_namespace,
+        {media.media_id(generated_data.server_name): media.sha256 for media in uploaded_media},
+    )
+
+
 @pytest.mark.skipif(value_file_has("synapse.enabled", False), reason="Synapse not deployed")
 @pytest.mark.asyncio_cooperative
 async def test_rendezvous_cors_headers_are_only_set_with_mas(ingress_ready, generated_data: ESSData, ssl_context):
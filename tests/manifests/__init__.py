@@ -11,6 +11,7 @@ from typing import Any
 
 class PropertyType(Enum):
     AdditionalConfig = "additional"
+    Autoscaling = "autoscaling"
     Enabled = "enabled"
     Env = "extraEnv"
     ExposedServices = "exposedServices"
@@ -21,6 +22,7 @@ class PropertyType(Enum):
     Labels = "labels"
     LivenessProbe = "livenessProbe"
     NodeSelector = "nodeSelector"
+    PodDisruptionBudget = "podDisruptionBudget"
     PodSecurityContext = "podSecurityContext"
     Postgres = "postgres"
     Replicas = "replicas"
@@ -108,6 +110,8 @@ class DeployableDetails(abc.ABC):
     has_automount_service_account_token: bool = field(default=False, hash=False)
     has_workloads: bool = field(default=True, hash=False)
     has_replicas: bool = field(default=None, hash=False)  # type: ignore[assignment]
+    has_autoscaling: bool = field(default=None, hash=False)  # type: ignore[assignment]
+    has_pod_disruption_budget: bool = field(default=None, hash=False)  # type: ignore[assignment]
     has_service_monitor: bool = field(default=None, hash=False)  # type: ignore[assignment]
     has_storage: bool = field(default=False, hash=False)
     makes_outbound_requests: bool = field(default=None, hash=False)  # type: ignore[assignment]
@@ -140,6 +144,10 @@ class DeployableDetails(abc.ABC):
             self.has_service_monitor = self.has_workloads
         if self.has_replicas is None:
             self.has_replicas = self.has_workloads
+        if self.has_autoscaling is None:
+            self.has_autoscaling = self.has_replicas
+        if self.has_pod_disruption_budget is None:
+            self.has_pod_disruption_budget = self.has_replicas
         if self.makes_outbound_requests is None:
             self.makes_outbound_requests = self.has_workloads
         if self.has_mount_context is None:
@@ -253,6 +261,8 @@ class SidecarDetails(DeployableDetails):
 
         # We dont support replicas
         self.has_replicas = False
+        self.has_autoscaling = False
+        self.has_pod_disruption_budget = False
 
     def create_ownership_link(self, parent: "ComponentDetails | SubComponentDetails"):
         self.parent = parent
@@ -386,7 +396,9 @@ def make_synapse_worker_sub_component(worker_name: str, worker_type: str) -> Sub
         values_file_path_overrides=values_file_path_overrides,
         has_ingress=False,
         is_synapse_process=True,
-        has_replicas=(worker_type == "scalable"),
+        has_replicas=(worker_type in ("scalable", "autoscalable")),
+        # Workers whose instances are listed in Synapse's config can't have their replicas changed underneath it
+        has_autoscaling=(worker_type == "autoscalable"),
         ignore_unreferenced_mounts={"synapse": ("/tmp",)},
         has_mount_context=True,
         content_volumes_mapping={
@@ -401,28 +413,38 @@ synapse_workers_details = tuple(
         "account-data": "single",
         "appservice": "single",
         "background": "single",
-        "client-reader": "scalable",
+        "client-reader": "autoscalable",
         "device-lists": "scalable",
         "encryption": "single",
-        "event-creator": "scalable",
+        "event-creator": "autoscalable",
         "event-persister": "scalable",
-        "federation-inbound": "scalable",
-        "federation-reader": "scalable",
+        "federation-inbound": "autoscalable",
+        "federation-reader": "autoscalable",
         "federation-sender": "scalable",
-        "initial-synchrotron": "scalable",
+        "initial-synchrotron": "autoscalable",
         "media-repository": "single",
         "presence-writer": "single",
         "push-rules": "single",
         "pusher": "scalable",
         "receipts": "scalable",
-        "sliding-sync": "scalable",
+        "sliding-sync": "autoscalable",
         "sso-login": "single",
-        "synchrotron": "scalable",
+        "synchrotron": "autoscalable",
         "typing-persister": "single",
         "user-dir": "single",
     }.items()
 )
 
+# haproxy.cfg has dozens of HTTP Paths but they are not filepaths, likewise the files it loads
+haproxy_config_files = (
+    "haproxy.cfg",
+    "429.http",
+    "path_map_file_exact",
+    "path_map_file_prefix",
+    "path_map_file_regex",
+    "path_map_file_get",
+)
+
 
 all_components_details = [
     ComponentDetails(
@@ -475,12 +497,38 @@ all_components_details = [
         has_additional_config=False,
         has_credentials=False,
         has_ingress=False,
+        sidecars=(
+            SidecarDetails(
+                name="haproxy-reload",
+                values_file_path=ValuesFilePath.read_write("haproxy", "reloader"),
+                values_file_path_overrides={
+                    # No manifests of its own, so no labels to set
+                    PropertyType.Labels: ValuesFilePath.not_supported(),
+                    # Mounts exactly what HAProxy itself mounts
+                    PropertyType.VolumeMounts: ValuesFilePath.not_supported(),
+                },
+                has_additional_config=False,
+                # Uses the matrix-tools image
+                has_image=False,
+                has_ingress=False,
+                has_service_monitor=False,
+                makes_outbound_requests=False,
+                ignore_unreferenced_mounts={
+                    "haproxy-reload": ("/usr/local/etc/haproxy/placeholder",),
+                },
+                # It is given the directories to watch rather than the files in them
+                ignore_paths_mismatches={
+                    "haproxy-reload": ("/usr/local/etc/haproxy", "/synapse", "/well-known"),
+                },
+                skip_path_consistency_for_files=haproxy_config_files,
+            ),
+        ),
         is_shared_component=True,
         makes_outbound_requests=False,
         ignore_unreferenced_mounts={
             "haproxy": ("/usr/local/etc/haproxy/placeholder",),
         },
-        skip_path_consistency_for_files=("haproxy.cfg", "429.http", "path_map_file", "path_map_file_get"),
+        skip_path_consistency_for_files=haproxy_config_files,
     ),
     ComponentDetails(
         name="postgres",
@@ -514,6 +562,29 @@ all_components_details = [
             )
         },
     ),
+    ComponentDetails(
+        name="pgbouncer",
+        has_additional_config=False,
+        has_ingress=False,
+        has_autoscaling=False,
+        sidecars=(
+            SidecarDetails(
+                name="pgbouncer-exporter",
+                values_file_path=ValuesFilePath.read_write("pgbouncer", "pgbouncerExporter"),
+                values_file_path_overrides={
+                    # No manifests of its own, so no labels to set
+                    PropertyType.Labels: ValuesFilePath.not_supported(),
+                },
+                has_additional_config=False,
+                has_ingress=False,
+                has_service_monitor=False,
+                makes_outbound_requests=False,
+            ),
+        ),
+        is_shared_component=True,
+        # Only connects to the chart's own Postgres
+        makes_outbound_requests=False,
+    ),
     ComponentDetails(
         name="redis",
         values_file_path=ValuesFilePath.read_write("redis"),
@@ -657,7 +728,12 @@ all_components_details = [
         has_replicas=False,
         is_synapse_process=True,
         additional_values_files=("synapse-worker-example-values.yaml",),
-        skip_path_consistency_for_files=("path_map_file", "path_map_file_get"),
+        skip_path_consistency_for_files=(
+            "path_map_file_exact",
+            "path_map_file_prefix",
+            "path_map_file_regex",
+            "path_map_file_get",
+        ),
         ignore_unreferenced_mounts={"synapse": ("/tmp",)},
         has_mount_context=True,
         content_volumes_mapping={
@@ -733,6 +809,7 @@ _extra_values_files_to_test: list[str] = [
     "matrix-authentication-service-synapse-syn2mas-migrate-secrets-in-helm-values.yaml",
     "matrix-authentication-service-synapse-syn2mas-migrate-secrets-externally-values.yaml",
     "matrix-rtc-host-mode-values.yaml",
+    "pgbouncer-values.yaml",
 ]
 
 _extra_secret_values_files_to_test = [
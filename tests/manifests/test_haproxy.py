@@ -1,14 +1,15 @@
 # Copyright 2025 New Vector Ltd
-# Copyright 2025 Element Creations Ltd
+# Copyright 2025-2026 Element Creations Ltd
 #
 # SPDX-License-Identifier: AGPL-3.0-only
 
+import json
 import re
 
 import pytest
 
-from . import values_files_to_test
-from .utils import template_id, template_to_deployable_details
+from . import synapse_workers_details, values_files_to_test
+from .utils import helm_template, set_sizing_profile, template_id, template_to_deployable_details
 
 
 @pytest.mark.parametrize("values_file", values_files_to_test)
@@ -79,3 +80,386 @@ async def test_haproxy_config_ends_in_2_newlines(templates):
     assert haproxy_configmap["data"]["haproxy.cfg"].endswith("\n\n"), (
         f"{template_id(haproxy_configmap)}/haproxy.cfg should end with at least 2 \\n"
     )
+
+
+def _haproxy_config(templates) -> str | None:
+    for template in templates:
+        if template["kind"] == "ConfigMap" and template_to_deployable_details(template).name == "haproxy":
+            return template["data"]["haproxy.cfg"]
+    return None
+
+
+def _server_slots_by_backend(haproxy_cfg: str) -> dict[str, int]:
+    server_slots = {}
+    backend = ""
+    for line in haproxy_cfg.splitlines():
+        if line.startswith("backend "):
+            backend = line.split()[1]
+        elif backend and (server_template := re.match(r"\s+server-template \S+ (\d+) ", line)):
+            server_slots[backend] = int(server_template.group(1))
+    return server_slots
+
+
+# The replicas that the sizing profiles give autoscalable Synapse workers without explicit replicas
+sized_synapse_worker_replicas = {None: 1, "small": 1, "medium": 2, "large": 2, "xlarge": 3}
+
+
+def _expected_synapse_server_slots(worker_values: dict) -> int:
+    if "haproxyServerSlots" in worker_values:
+        return worker_values["haproxyServerSlots"]
+    if "replicas" not in worker_values:
+        return 1
+    replicas = worker_values["replicas"]
+    if worker_values.get("autoscaling", {}).get("enabled", False):
+        replicas = worker_values["autoscaling"]["maxReplicas"]
+    return replicas + max(2, replicas // 4)
+
+
+def _assert_synapse_server_slots_track_worker_replicas(values, templates):
+    haproxy_cfg = _haproxy_config(templates)
+    if not haproxy_cfg or not values.get("synapse", {}).get("enabled", True):
+        return
+
+    sized_replicas = sized_synapse_worker_replicas[values.get("sizing", {}).get("profile")]
+    workers_details = {details.name.removeprefix("synapse-"): details for details in synapse_workers_details}
+    server_slots = _server_slots_by_backend(haproxy_cfg)
+    assert server_slots["synapse-main"] == 1
+    for worker_type, worker_values in values["synapse"].get("workers", {}).items():
+        if f"synapse-{worker_type}" not in server_slots:
+            continue
+        worker_details = workers_details[worker_type]
+        # Autoscalable workers get their replicas from the sizing profile and other scalable workers default to 1
+        if worker_details.has_autoscaling:
+            worker_values = {"replicas": sized_replicas} | worker_values
+        elif worker_details.has_replicas:
+            worker_values = {"replicas": 1} | worker_values
+        expected = _expected_synapse_server_slots(worker_values)
+        assert server_slots[f"synapse-{worker_type}"] == expected, (
+            f"synapse-{worker_type} has {server_slots[f'synapse-{worker_type}']} server slots rather than {expected}"
+        )
+
+
+@pytest.mark.parametrize("values_file", values_files_to_test)
+@pytest.mark.asyncio_cooperative
+async def test_haproxy_synapse_server_slots_track_worker_replicas(values, templates):
+    _assert_synapse_server_slots_track_worker_replicas(values, templates)
+
+
+@pytest.mark.parametrize("values_file", ["synapse-worker-example-values.yaml"])
+@pytest.mark.parametrize("profile", sized_synapse_worker_replicas.keys())
+@pytest.mark.parametrize("autoscaled", [False, True])
+@pytest.mark.asyncio_cooperative
+async def test_haproxy_synapse_server_slots_track_sized_and_autoscaled_replicas(
+    values, make_templates, profile, autoscaled
+):
+    if profile is not None:
+        set_sizing_profile(values, profile)
+    if autoscaled:
+        values["synapse"]["workers"]["synchrotron"]["autoscaling"] = {"enabled": True, "maxReplicas": 30}
+        values["synapse"]["workers"]["client-reader"]["autoscaling"] = {"enabled": True, "maxReplicas": 4}
+
+    templates = await make_templates(values)
+    _assert_synapse_server_slots_track_worker_replicas(values, templates)
+    server_slots = _server_slots_by_backend(_haproxy_config(templates))
+    if autoscaled:
+        assert server_slots["synapse-synchrotron"] == 37
+        assert server_slots["synapse-client-reader"] == 6
+    else:
+        sized_replicas = sized_synapse_worker_replicas[profile]
+        assert server_slots["synapse-synchrotron"] == sized_replicas + 2
+
+
+@pytest.mark.parametrize("values_file", ["synapse-worker-example-values.yaml"])
+@pytest.mark.asyncio_cooperative
+async def test_haproxy_synapse_server_slots_can_go_beyond_20(values, make_templates):
+    values["synapse"]["workers"]["synchrotron"]["replicas"] = 40
+    values["synapse"]["workers"]["event-creator"]["replicas"] = 3
+    values["synapse"]["workers"]["client-reader"]["haproxyServerSlots"] = 7
+
+    server_slots = _server_slots_by_backend(_haproxy_config(await make_templates(values)))
+    assert server_slots["synapse-synchrotron"] == 50
+    assert server_slots["synapse-event-creator"] == 5
+    assert server_slots["synapse-client-reader"] == 7
+    # Single workers can't be scaled so don't need more than 1
+    assert server_slots["synapse-media-repository"] == 1
+
+
+# Example Matrix API paths, at least one for every route. /_matrix/client/v3/ paths are tried under every version
+MATRIX_API_PATHS = [
+    "/_matrix/client/versions",
+    "/_matrix/client/v3/sync",
+    "/_matrix/client/r0/sync",
+    "/_matrix/client/v3/events",
+    "/_matrix/client/v3/initialSync",
+    "/_matrix/client/v3/login",
+    "/_matrix/client/v3/logout",
+    "/_matrix/client/v3/account/whoami",
+    "/_matrix/client/v3/account/3pid",
+    "/_matrix/client/v3/account/deactivate",
+    "/_matrix/client/v3/password_policy",
+    "/_matrix/client/v3/capabilities",
+    "/_matrix/client/v3/createRoom",
+    "/_matrix/client/v3/joined_rooms",
+    "/_matrix/client/v3/publicRooms",
+    "/_matrix/client/v3/devices",
+    "/_matrix/client/v3/devices/ABCDEF",
+    "/_matrix/client/v3/delete_devices",
+    "/_matrix/client/v3/keys/query",
+    "/_matrix/client/v3/keys/upload",
+    "/_matrix/client/v3/keys/upload/ABCDEF",
+    "/_matrix/client/v3/keys/claim",
+    "/_matrix/client/v3/keys/changes",
+    "/_matrix/client/v3/keys/device_signing/upload",
+    "/_matrix/client/v3/keys/signatures/upload",
+    "/_matrix/client/v3/room_keys/version",
+    "/_matrix/client/v3/sendToDevice/m.room.encrypted/txn1",
+    "/_matrix/client/v3/pushrules/",
+    "/_matrix/client/v3/pushrules/global/override/.m.rule.master",
+    "/_matrix/client/v3/presence/@alice:example.com/status",
+    "/_matrix/client/v3/profile/@alice:example.com/displayname",
+    "/_matrix/client/v3/user/@alice:example.com/filter",
+    "/_matrix/client/v3/user/@alice:example.com/filter/1",
+    "/_matrix/client/v3/user/@alice:example.com/account_data/m.direct",
+    "/_matrix/client/v3/user/@alice:example.com/rooms/!room:example.com/tags",
+    "/_matrix/client/v3/user/@alice:example.com/rooms/!room:example.com/account_data/m.fully_read",
+    "/_matrix/client/v3/user_directory/search",
+    "/_matrix/client/v3/join/!room:example.com",
+    "/_matrix/client/v3/join/!room:example.com/tags",
+    "/_matrix/client/v3/knock/!room:example.com",
+    "/_matrix/client/v3/rooms/!room:example.com/join",
+    "/_matrix/client/v3/rooms/!room:example.com/leave",
+    "/_matrix/client/v3/rooms/!room:example.com/invite",
+    "/_matrix/client/v3/rooms/!room:example.com/send/m.room.message/txn1",
+    "/_matrix/client/v3/rooms/!room:example.com/state",
+    "/_matrix/client/v3/rooms/!room:example.com/state/m.room.name/",
+    "/_matrix/client/v3/rooms/!room:example.com/messages",
+    "/_matrix/client/v3/rooms/!room:example.com/members",
+    "/_matrix/client/v3/rooms/!room:example.com/joined_members",
+    "/_matrix/client/v3/rooms/!room:example.com/context/$event",
+    "/_matrix/client/v3/rooms/!room:example.com/event/$event",
+    "/_matrix/client/v3/rooms/!room:example.com/receipt/m.read/$event",
+    "/_matrix/client/v3/rooms/!room:example.com/read_markers",
+    "/_matrix/client/v3/rooms/!room:example.com/typing/@alice:example.com",
+    "/_matrix/client/v3/rooms/!room:example.com/redact/$event/txn1",
+    "/_matrix/client/v3/rooms/!room:example.com/initialSync",
+    "/_matrix/client/v3/rooms/!room:example.com/aliases",
+    "/_matrix/client/v1/rooms/!room:example.com/hierarchy",
+    "/_matrix/client/v1/rooms/!room:example.com/relations/$event",
+    "/_matrix/client/v1/rooms/!room:example.com/threads",
+    "/_matrix/client/v1/rooms/!room:example.com/timestamp_to_event",
+    "/_matrix/client/unstable/im.nheko.summary/summary/!room:example.com",
+    "/_matrix/client/v3/directory/room/#alias:example.com",
+    "/_matrix/client/v3/notifications",
+    "/_matrix/client/v3/voip/turnServer",
+    "/_matrix/client/v3/search",
+    "/_matrix/client/v3/register",
+    "/_matrix/client/v3/register/available",
+    "/_matrix/client/v1/register/m.login.registration_token/validity",
+    "/_matrix/client/v3/login/sso/redirect",
+    "/_matrix/client/v3/login/sso/redirect/oidc-provider",
+    "/_matrix/client/v3/login/cas/ticket",
+    "/_matrix/client/v1/media/config",
+    "/_matrix/client/v1/media/download/example.com/abcdef",
+    "/_matrix/client/v1/media/thumbnail/example.com/abcdef",
+    "/_matrix/media/v3/upload",
+    "/_matrix/media/v3/download/example.com/abcdef",
+    "/_matrix/client/unstable/org.matrix.simplified_msc3575/sync",
+    "/_matrix/client/unstable/org.matrix.msc4140/delayed_events",
+    "/_matrix/client/unstable/org.matrix.msc4108/rendezvous",
+    "/_matrix/federation/v1/version",
+    "/_matrix/federation/v1/send/txn1",
+    "/_matrix/federation/v1/event/$event",
+    "/_matrix/federation/v1/state_ids/!room:example.com",
+    "/_matrix/federation/v1/state/!room:example.com",
+    "/_matrix/federation/v1/backfill/!room:example.com",
+    "/_matrix/federation/v1/get_missing_events/!room:example.com",
+    "/_matrix/federation/v1/publicRooms",
+    "/_matrix/federation/v1/query/profile",
+    "/_matrix/federation/v1/make_join/!room:example.com/@alice:example.com",
+    "/_matrix/federation/v1/make_leave/!room:example.com/@alice:example.com",
+    "/_matrix/federation/v1/make_knock/!room:example.com/@alice:example.com",
+    "/_matrix/federation/v2/send_join/!room:example.com/$event",
+    "/_matrix/federation/v2/send_leave/!room:example.com/$event",
+    "/_matrix/federation/v1/send_knock/!room:example.com/$event",
+    "/_matrix/federation/v2/invite/!room:example.com/$event",
+    "/_matrix/federation/v1/query_auth/!room:example.com/$event",
+    "/_matrix/federation/v1/event_auth/!room:example.com/$event",
+    "/_matrix/federation/v1/timestamp_to_event/!room:example.com",
+    "/_matrix/federation/v1/exchange_third_party_invite/!room:example.com",
+    "/_matrix/federation/v1/hierarchy/!room:example.com",
+    "/_matrix/federation/v1/media/download/abcdef",
+    "/_matrix/federation/v1/user/devices/@alice:example.com",
+    "/_matrix/key/v2/server",
+    "/_matrix/key/v2/query",
+    "/_synapse/admin/v1/rooms/!room:example.com",
+    "/_synapse/admin/v1/rooms/!room:example.com/members",
+    "/_synapse/admin/v2/users/@alice:example.com",
+    "/_synapse/admin/v1/users/@alice:example.com/media",
+    "/_synapse/admin/v1/media/example.com/abcdef",
+    "/_synapse/admin/v1/room/!room:example.com/media",
+    "/_synapse/admin/v1/room/!room:example.com/media/quarantine",
+    "/_synapse/admin/v1/user/@alice:example.com/media/quarantine",
+    "/_synapse/admin/v1/quarantine_media/example.com/abcdef",
+    "/_synapse/admin/v1/purge_media_cache",
+    "/_synapse/client/pick_idp",
+    "/_synapse/client/oidc/callback",
+    "/_synapse/client/pick_username/account_details",
+    "/_synapse/client/new_user_consent",
+    "/_synapse/client/sso_register",
+    "/_synapse/client/saml2/authn_response",
+    "/health",
+    "/",
+]
+
+# The versions that /_matrix/client/v3/ example paths are also tried under
+CLIENT_API_VERSIONS = ["api/v1", "r0", "v1", "v3", "unstable"]
+
+# Appended to each example path, to exercise partial matches and overlaps between routes
+PATH_SUFFIXES = ["", "/", "x", "/x", "/tags", "/receipt"]
+
+
+def _path_corpus() -> set[str]:
+    paths = set()
+    for path in MATRIX_API_PATHS:
+        versioned_paths = [path]
+        if path.startswith("/_matrix/client/v3/"):
+            versioned_paths = [path.replace("/v3/", f"/{version}/", 1) for version in CLIENT_API_VERSIONS]
+        for versioned_path in versioned_paths:
+            paths.add(versioned_path.rstrip("/"))
+            paths.update(versioned_path + suffix for suffix in PATH_SUFFIXES)
+    return paths
+
+
+async def _synapse_path_routes(helm_client, temp_chart, release_name, namespace, values) -> list[tuple[str, str]]:
+    """The routing table from element-io.synapse.haproxy.pathRoutes, rendered on its own from a copy of the chart"""
+    for template_path in (temp_chart / "templates").rglob("*"):
+        if template_path.is_file() and not template_path.name.startswith("_"):
+            template_path.unlink()
+    (temp_chart / "templates" / "path-routes.yaml").write_text(
+        'routes: {{ include "element-io.synapse.haproxy.pathRoutes" (dict "root" $) | quote }}\n'
+    )
+    (path_routes,) = await helm_template(await helm_client.get_chart(temp_chart), release_name, namespace, values)
+    return [(route, worker_type) for route, worker_type in json.loads(path_routes["routes"])]
+
+
+def _parse_map_file(contents: str) -> list[tuple[str, str]]:
+    entries = []
+    for line in contents.splitlines():
+        if line.strip() and not line.startswith("#"):
+            key, value = line.rsplit(" ", 1)
+            entries.append((key, value))
+    return entries
+
+
+@pytest.mark.parametrize("values_file", values_files_to_test)
+@pytest.mark.asyncio_cooperative
+async def test_haproxy_compiled_path_maps_route_like_the_routing_table(
+    release_name, namespace, values, templates, helm_client, temp_chart
+):
+    synapse_haproxy_configmap = None
+    for template in templates:
+        if template["kind"] == "ConfigMap" and template["metadata"]["name"].endswith("-synapse-haproxy"):
+            synapse_haproxy_configmap = template
+
+    if not synapse_haproxy_configmap:
+        return
+
+    data = synapse_haproxy_configmap["data"]
+    routes = await _synapse_path_routes(helm_client, temp_chart, release_name, namespace, values)
+    exact = dict(_parse_map_file(data["path_map_file_exact"]))
+    prefixes = _parse_map_file(data["path_map_file_prefix"])
+    regexes = [(re.compile(route), backend) for route, backend in _parse_map_file(data["path_map_file_regex"])]
+    compiled_routes = [(re.compile(route), backend) for route, backend in routes]
+
+    assert len(exact) == len(_parse_map_file(data["path_map_file_exact"])), "Duplicate paths in the exact map"
+    for index, (prefix, _) in enumerate(prefixes):
+        for earlier_prefix, _ in prefixes[:index]:
+            assert not prefix.startswith(earlier_prefix), f"{prefix} is shadowed by {earlier_prefix} in the prefix map"
+
+    paths = _path_corpus()
+    for route, backend in compiled_routes:
+        assert any(route.search(path) for path in paths), (
+            f"No path in MATRIX_API_PATHS is routed to {backend} by {route.pattern}, add an example"
+        )
+
+    for path in paths:
+        # map_reg over the full routing table, first match wins
+        expected = next((backend for route, backend in compiled_routes if route.search(path)), "main")
+
+        # map_str, then map_beg (the longest prefix wins), then map_reg over the remaining routes
+        actual = exact.get(path)
+        if actual is None:
+            matching_prefixes = [(prefix, backend) for prefix, backend in prefixes if path.startswith(prefix)]
+            if matching_prefixes:
+                actual = max(matching_prefixes, key=lambda matching_prefix: len(matching_prefix[0]))[1]
+        if actual is None:
+            actual = next((backend for route, backend in regexes if route.search(path)), "main")
+
+        assert actual == expected, (
+            f"{template_id(synapse_haproxy_configmap)}: {path} is routed to {actual} rather than {expected}"
+        )
+
+
+def _haproxy_deployment(templates) -> dict | None:
+    for template in templates:
+        if template["kind"] == "Deployment" and template_to_deployable_details(template).name == "haproxy":
+            return template
+    return None
+
+
+@pytest.mark.parametrize("values_file", values_files_to_test)
+@pytest.mark.asyncio_cooperative
+async def test_haproxy_reloader_watches_all_config_mounts(templates):
+    deployment = _haproxy_deployment(templates)
+    if not deployment:
+        return
+
+    pod_spec = deployment["spec"]["template"]["spec"]
+    containers_by_name = {container["name"]: container for container in pod_spec["containers"]}
+    haproxy = containers_by_name["haproxy"]
+    assert "haproxy-reload" in containers_by_name, f"{template_id(deployment)} doesn't have the reloader by default"
+    reloader = containers_by_name["haproxy-reload"]
+
+    assert list(haproxy["args"][-3:]) == ["-W", "-S", "/haproxy-run/master.sock"], (
+        f"{template_id(deployment)} doesn't run HAProxy in master-worker mode with a master socket"
+    )
+    assert list(reloader["args"][:3]) == ["haproxy-reload", "-master-socket", "/haproxy-run/master.sock"]
+
+    configmap_volumes = [volume["name"] for volume in pod_spec["volumes"] if "configMap" in volume]
+    watched_paths = []
+    for volume_mount in haproxy["volumeMounts"]:
+        if volume_mount["name"] in configmap_volumes:
+            assert volume_mount in reloader["volumeMounts"], (
+                f"{template_id(deployment)} reloader doesn't mount {volume_mount['name']} like HAProxy does"
+            )
+            watched_paths.append(volume_mount["mountPath"])
+    assert list(reloader["args"][-len(watched_paths) :]) == watched_paths, (
+        f"{template_id(deployment)} reloader doesn't watch all of HAProxy's configuration"
+    )
+
+    for label in deployment["spec"]["template"]["metadata"]["labels"]:
+        assert not re.match(r"^k8s.element.io/[a-z]+-haproxy-config-hash$", label), (
+            f"{template_id(deployment)} has {label} on its Pods despite reloading configuration in place"
+        )
+
+
+@pytest.mark.parametrize("values_file", values_files_to_test)
+@pytest.mark.asyncio_cooperative
+async def test_haproxy_restarts_on_config_changes_without_reloader(values, make_templates):
+    values.setdefault("haproxy", {}).setdefault("reloader", {})["enabled"] = False
+    deployment = _haproxy_deployment(await make_templates(values))
+    if not deployment:
+        return
+
+    pod_spec = deployment["spec"]["template"]["spec"]
+    assert [container["name"] for container in pod_spec["containers"]] == ["haproxy"]
+    assert "-S" not in pod_spec["containers"][0]["args"]
+    assert "haproxy-run" not in [volume["name"] for volume in pod_spec["volumes"]]
+
+    pod_labels = deployment["spec"]["template"]["metadata"]["labels"]
+    assert "k8s.element.io/shared-haproxy-config-hash" in pod_labels, (
+        f"{template_id(deployment)} won't restart its Pods on configuration changes"
+    )
+    for label, value in deployment["metadata"]["labels"].items():
+        if re.match(r"^k8s.element.io/[a-z]+-haproxy-config-hash$", label):
+            assert pod_labels[label] == value
@@ -1,5 +1,5 @@
 # Copyright 2025 New Vector Ltd
-# Copyright 2025 Element Creations Ltd
+# Copyright 2025-2026 Element Creations Ltd
 #
 # SPDX-License-Identifier: AGPL-3.0-only
 
@@ -108,6 +108,13 @@ async def test_pod_spec_labels_are_consistent_with_parent_labels(templates):
         parent_labels = template["metadata"]["labels"].delete("helm.sh/chart")
         pod_labels = template["spec"]["template"]["metadata"]["labels"]
 
+        # HAProxy's reloader picks up config changes in place, so the hashes aren't put on the Pods to restart them
+        containers_names = [container["name"] for container in template["spec"]["template"]["spec"]["containers"]]
+        if "haproxy-reload" in containers_names:
+            for label in parent_labels:
+                if re.match(r"^k8s.element.io/[a-z]+-haproxy-config-hash$", label):
+                    parent_labels = parent_labels.delete(label)
+
         assert parent_labels == pod_labels, (
             f"{template_id(template)} has differing labels between itself and the Pods it would create. "
             f"{parent_labels=} vs {pod_labels=}"
@@ -0,0 +1,215 @@
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+import pyhelm3
+import pytest
+import yaml
+
+from .utils import config_file, set_sizing_profile, template_id
+
+
+def pgbouncer_databases(templates) -> dict[str, dict[str, str]]:
+    pgbouncer_ini = config_file(templates, "pgbouncer.ini")
+    assert pgbouncer_ini is not None, "PgBouncer's config couldn't be found"
+    databases_section = pgbouncer_ini.split("[databases]")[1].split("[pgbouncer]")[0]
+    databases = {}
+    for line in databases_section.strip().splitlines():
+        name, settings = line.split(" = ", 1)
+        databases[name] = dict(setting.split("=", 1) for setting in settings.split())
+    return databases
+
+
+def runtime_config(templates, filename: str) -> dict:
+    config = config_file(templates, filename)
+    assert config is not None, f"{filename} couldn't be found"
+    return yaml.safe_load(config)
+
+
+def database_connections(release_name, templates) -> dict[str, int]:
+    synapse_config = runtime_config(templates, "04-homeserver-overrides.yaml")
+    mas_config = runtime_config(templates, "mas-config-overrides.yaml")
+
+    connections = {"synapse": 0, "matrixauthenticationservice": 0}
+    for template in templates:
+        if template["kind"] == "StatefulSet" and template["metadata"]["name"].startswith(f"{release_name}-synapse-"):
+            connections["synapse"] += template["spec"]["replicas"] * synapse_config["database"]["args"]["cp_max"]
+        elif (
+            template["kind"] == "Deployment"
+            and template["metadata"]["name"] == f"{release_name}-matrix-authentication-service"
+        ):
+            connections["matrixauthenticationservice"] += (
+                template["spec"]["replicas"] * mas_config["database"]["max_connections"]
+            )
+    return connections
+
+
+@pytest.mark.parametrize("values_file", ["pgbouncer-values.yaml"])
+@pytest.mark.asyncio_cooperative
+async def test_databases_are_reached_through_pgbouncer(release_name, namespace, templates):
+    pgbouncer_host = f"{release_name}-pgbouncer.{namespace}.svc.cluster.local."
+    postgres_host = f"{release_name}-postgres.{namespace}.svc.cluster.local."
+
+    synapse_config = runtime_config(templates, "04-homeserver-overrides.yaml")
+    assert synapse_config["database"]["args"]["host"] == pgbouncer_host
+    assert synapse_config["database"]["args"]["port"] == 6432
+
+    mas_config = runtime_config(templates, "mas-config-overrides.yaml")
+    assert f"@{pgbouncer_host}:6432/matrixauthenticationservice?" in mas_config["database"]["uri"]
+
+    databases = pgbouncer_databases(templates)
+    assert set(databases.keys()) == {"synapse", "matrixauthenticationservice"}
+    for name, database in databases.items():
+        assert database["host"] == postgres_host
+        assert database["port"] == "5432"
+        assert database["dbname"] == name
+
+    for template in templates:
+        if template["kind"] not in ["Deployment", "StatefulSet", "Job"]:
+            continue
+        for init_container in template["spec"]["template"]["spec"].get("initContainers", []):
+            if init_container["name"] != "db-wait":
+                continue
+            # Hooks can run before PgBouncer has been deployed
+            if "helm.sh/hook" in template["metadata"].get("annotations", {}):
+                expected_address = f"{postgres_host}:5432"
+            else:
+                expected_address = f"{pgbouncer_host}:6432"
+            assert expected_address in init_container["args"], (
+                f"{template_id(template)} waits for the wrong database host: {init_container['args']}"
+            )
+
+
+@pytest.mark.parametrize("values_file", ["pgbouncer-values.yaml"])
+@pytest.mark.asyncio_cooperative
+async def test_hooks_connect_directly_to_postgres(release_name, namespace, templates):
+    for template in templates:
+        if template["kind"] != "ConfigMap" or "helm.sh/hook" not in template["metadata"].get("annotations", {}):
+            continue
+        if (synapse_config := template["data"].get("04-homeserver-overrides.yaml")) is not None:
+            database_args = yaml.safe_load(synapse_config)["database"]["args"]
+            assert database_args["host"] == f"{release_name}-postgres.{namespace}.svc.cluster.local."
+            assert database_args["port"] == 5432
+            assert "cp_max" not in database_args
+            break
+    else:
+        raise RuntimeError("Could not find the Synapse hook ConfigMap")
+
+
+@pytest.mark.parametrize("values_file", ["pgbouncer-values.yaml"])
+@pytest.mark.asyncio_cooperative
+async def test_pgbouncer_disabled_connects_directly_to_postgres(release_name, namespace, values, make_templates):
+    values["pgbouncer"]["enabled"] = False
+    templates = await make_templates(values)
+
+    assert not [template for template in templates if f"{release_name}-pgbouncer" in template["metadata"]["name"]]
+    synapse_config = runtime_config(templates, "04-homeserver-overrides.yaml")
+    assert synapse_config["database"]["args"]["host"] == f"{release_name}-postgres.{namespace}.svc.cluster.local."
+    assert "cp_max" not in synapse_config["database"]["args"]
+    mas_config = runtime_config(templates, "mas-config-overrides.yaml")
+    assert "max_connections" not in mas_config["database"]
+
+
+@pytest.mark.parametrize("values_file", ["pgbouncer-values.yaml"])
+@pytest.mark.parametrize("pool_mode", ["transaction", "session"])
+@pytest.mark.asyncio_cooperative
+async def test_pgbouncer_pool_mode(values, make_templates, pool_mode):
+    values["pgbouncer"]["poolMode"] = pool_mode
+    databases = pgbouncer_databases(await make_templates(values))
+
+    assert databases["synapse"]["pool_mode"] == pool_mode
+    # Matrix Authentication Service's migrations need session level locks
+    assert databases["matrixauthenticationservice"]["pool_mode"] == "session"
+
+
+@pytest.mark.parametrize("values_file", ["pgbouncer-values.yaml", "synapse-worker-example-values.yaml"])
+@pytest.mark.parametrize("profile", [None, "small", "medium", "large", "xlarge"])
+@pytest.mark.asyncio_cooperative
+async def test_database_connections_fit_in_pgbouncer_pools(release_name, values, make_templates, profile):
+    values.setdefault("pgbouncer", {})["enabled"] = True
+    values.setdefault("matrixAuthenticationService", {})["enabled"] = True
+    values["matrixAuthenticationService"].setdefault("ingress", {})["host"] = "mas.ess.localhost"
+    if profile is not None:
+        set_sizing_profile(values, profile)
+    templates = await make_templates(values)
+
+    databases = pgbouncer_databases(templates)
+    for name, connections in database_connections(release_name, templates).items():
+        assert 0 < connections <= int(databases[name]["pool_size"]), (
+            f"{name} opens up to {connections} connections but its PgBouncer pool is {databases[name]['pool_size']}"
+        )
+
+
+@pytest.mark.parametrize("values_file", ["synapse-worker-example-values.yaml"])
+@pytest.mark.parametrize("profile", [None, "small", "medium", "large", "xlarge"])
+@pytest.mark.asyncio_cooperative
+async def test_pgbouncer_default_pools_grow_with_synapse_workers(values, make_templates, profile):
+    values["pgbouncer"] = {"enabled": True}
+    if profile is not None:
+        set_sizing_profile(values, profile)
+    templates = await make_templates(values)
+
+    # Main & the stream writers must not be left with a single connection each by the many workers
+    database_args = runtime_config(templates, "04-homeserver-overrides.yaml")["database"]["args"]
+    assert database_args["cp_max"] >= 5
+    assert database_args["cp_min"] <= database_args["cp_max"]
+
+
+@pytest.mark.parametrize("values_file", ["synapse-worker-example-values.yaml"])
+@pytest.mark.asyncio_cooperative
+async def test_pgbouncer_pool_too_small_for_synapse_fails(values, make_templates):
+    values["pgbouncer"] = {"enabled": True, "poolSize": {"synapse": 40}}
+    with pytest.raises(pyhelm3.errors.FailedToRenderChartError, match="pgbouncer.poolSize.synapse of 40 is too small"):
+        await make_templates(values)
+
+
+@pytest.mark.parametrize("values_file", ["synapse-worker-example-values.yaml"])
+@pytest.mark.parametrize(
+    ("pgbouncer_values", "synapse_worker_values", "connections_needed"),
+    [
+        ({"replicas": 2}, {}, 260),
+        # The default pools grow with the Synapse workers' maximum replicas
+        ({}, {"synchrotron": {"autoscaling": {"enabled": True, "maxReplicas": 30}}}, 280),
+    ],
+)
+@pytest.mark.asyncio_cooperative
+async def test_pgbouncer_pools_must_fit_in_postgres(
+    values, make_templates, pgbouncer_values, synapse_worker_values, connections_needed
+):
+    values["pgbouncer"] = {"enabled": True} | pgbouncer_values
+    for worker_type, worker_values in synapse_worker_values.items():
+        values["synapse"]["workers"][worker_type] |= worker_values
+    with pytest.raises(
+        pyhelm3.errors.FailedToRenderChartError,
+        match=f"pgbouncer needs {connections_needed} Postgres connections .* but Postgres only allows 256",
+    ):
+        await make_templates(values)
+
+    values["postgres"] = {"resources": {"limits": {"memory": "8Gi"}}}
+    templates = await make_templates(values)
+    databases = pgbouncer_databases(templates)
+    pgbouncer_replicas = pgbouncer_values.get("replicas", 1)
+    for template in templates:
+        if template["kind"] == "StatefulSet" and template["metadata"]["name"].endswith("-postgres"):
+            postgres_args = template["spec"]["template"]["spec"]["containers"][0]["args"]
+            assert "max_connections=512" in postgres_args
+    assert pgbouncer_replicas * int(databases["synapse"]["pool_size"]) + 10 <= 512
+
+
+@pytest.mark.parametrize("values_file", ["pgbouncer-values.yaml"])
+@pytest.mark.asyncio_cooperative
+async def test_pgbouncer_restarts_on_password_changes(values, make_templates):
+    values.setdefault("postgres", {}).setdefault("essPasswords", {})["synapse"] = {"value": "first"}
+
+    def pod_labels(templates):
+        for template in templates:
+            if template["kind"] == "Deployment" and template["metadata"]["name"].endswith("-pgbouncer"):
+                return template["spec"]["template"]["metadata"]["labels"]
+        raise RuntimeError("Could not find the PgBouncer Deployment")
+
+    first_labels = pod_labels(await make_templates(values))
+    values["postgres"]["essPasswords"]["synapse"] = {"value": "second"}
+    second_labels = pod_labels(await make_templates(values))
+
+    label = "k8s.element.io/postgres-password-synapse-hash"
+    assert first_labels[label] != second_labels[label]
@@ -0,0 +1,126 @@
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+import pytest
+from frozendict import deepfreeze
+
+from . import DeployableDetails, PropertyType, values_files_to_test
+from .utils import iterate_deployables_parts, template_id, template_to_deployable_details
+
+
+@pytest.mark.parametrize("values_file", values_files_to_test)
+@pytest.mark.asyncio_cooperative
+async def test_no_horizontal_pod_autoscalers_by_default(templates):
+    for template in templates:
+        assert template["kind"] != "HorizontalPodAutoscaler", (
+            f"{template_id(template)} exists when autoscaling hasn't been enabled"
+        )
+
+
+@pytest.mark.parametrize("values_file", values_files_to_test)
+@pytest.mark.asyncio_cooperative
+async def test_deployments_statefulsets_are_autoscaled_when_enabled(values, make_templates):
+    set_autoscaling_details(values)
+    templates = await make_templates(values)
+
+    horizontal_pod_autoscalers = {
+        (template["spec"]["scaleTargetRef"]["kind"], template["spec"]["scaleTargetRef"]["name"]): template
+        for template in templates
+        if template["kind"] == "HorizontalPodAutoscaler"
+    }
+    for template in templates:
+        if template["kind"] not in ["Deployment", "StatefulSet"]:
+            continue
+
+        deployable_details = template_to_deployable_details(template)
+        horizontal_pod_autoscaler = horizontal_pod_autoscalers.pop(
+            (template["kind"], template["metadata"]["name"]), None
+        )
+        if not deployable_details.has_autoscaling:
+            assert horizontal_pod_autoscaler is None, (
+                f"{template_id(template)} is autoscaled when {deployable_details.name} doesn't support autoscaling"
+            )
+            assert "replicas" in template["spec"], f"{template_id(template)} does not specify replicas"
+            continue
+
+        assert horizontal_pod_autoscaler is not None, f"{template_id(template)} is not autoscaled"
+        assert "replicas" not in template["spec"], (
+            f"{template_id(template)} specifies replicas when they're managed by "
+            f"{template_id(horizontal_pod_autoscaler)}"
+        )
+        assert horizontal_pod_autoscaler["apiVersion"] == "autoscaling/v2"
+        assert template_to_deployable_details(horizontal_pod_autoscaler) == deployable_details, (
+            f"{template_id(horizontal_pod_autoscaler)} isn't labelled as belonging to {deployable_details.name}"
+        )
+        assert horizontal_pod_autoscaler["spec"]["scaleTargetRef"]["apiVersion"] == "apps/v1"
+
+        autoscaling = deployable_details.get_helm_values(values, PropertyType.Autoscaling)
+        assert horizontal_pod_autoscaler["spec"]["minReplicas"] == autoscaling["minReplicas"]
+        assert horizontal_pod_autoscaler["spec"]["maxReplicas"] == autoscaling["maxReplicas"]
+        assert horizontal_pod_autoscaler["spec"]["metrics"] == deepfreeze(
+            [
+                {
+                    "type": "Resource",
+                    # The chart default
+                    "resource": {"name": "cpu", "target": {"type": "Utilization", "averageUtilization": 80}},
+                },
+                {
+                    "type": "Resource",
+                    "resource": {
+                        "name": "memory",
+                        "target": {
+                            "type": "Utilization",
+                            "averageUtilization": autoscaling["targetMemoryUtilizationPercentage"],
+                        },
+                    },
+                },
+            ]
+            + autoscaling["metrics"]
+        ), f"{template_id(horizontal_pod_autoscaler)} has incorrect metrics"
+        assert horizontal_pod_autoscaler["spec"]["behavior"] == deepfreeze(autoscaling["behavior"]), (
+            f"{template_id(horizontal_pod_autoscaler)} has incorrect behavior"
+        )
+
+        if template["kind"] == "Deployment":
+            max_unavailable = template["spec"]["strategy"]["rollingUpdate"]["maxUnavailable"]
+            assert max_unavailable == 1, (
+                f"{template_id(template)} has {max_unavailable=} when it should be 1 with more than 1 minReplicas"
+            )
+
+    assert horizontal_pod_autoscalers == {}, (
+        f"{[template_id(template) for template in horizontal_pod_autoscalers.values()]} target missing workloads"
+    )
+
+
+def set_autoscaling_details(values):
+    # We have a counter that increments for each autoscaling block for each deployable details
+    # That way we can assert a) the correct value is going into the correct field and
+    # b) that the correct part of the values file is being used
+    counter = 1
+
+    def set_autoscaling_details(deployable_details: DeployableDetails):
+        nonlocal counter
+        counter += 1
+        deployable_details.set_helm_values(
+            values,
+            PropertyType.Autoscaling,
+            {
+                "enabled": True,
+                "minReplicas": counter,
+                "maxReplicas": counter + 10,
+                "targetMemoryUtilizationPercentage": 50 + counter,
+                "metrics": [
+                    {
+                        "type": "Pods",
+                        "pods": {
+                            "metric": {"name": f"{deployable_details.name}_requests_per_second"},
+                            "target": {"type": "AverageValue", "averageValue": str(counter)},
+                        },
+                    }
+                ],
+                "behavior": {"scaleDown": {"stabilizationWindowSeconds": counter * 10}},
+            },
+        )
+
+    iterate_deployables_parts(set_autoscaling_details, lambda deployable_details: deployable_details.has_autoscaling)
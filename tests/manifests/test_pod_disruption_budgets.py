@@ -0,0 +1,98 @@
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+from typing import Any
+
+import pytest
+
+from . import DeployableDetails, PropertyType, values_files_to_test
+from .utils import (
+    assert_covers_expected_workloads,
+    find_workload_ids_matching_selector,
+    iterate_deployables_parts,
+    template_id,
+    template_to_deployable_details,
+)
+
+
+def workload_is_multi_replica(workload_template: dict[str, Any]) -> bool:
+    # Autoscaled workloads don't set replicas
+    return workload_template["spec"].get("replicas", 2) > 1
+
+
+def make_workload_ids_covered_by_pod_disruption_budget(values: dict[str, Any]):
+    def workload_ids_covered_by_pod_disruption_budget(
+        pod_disruption_budget_template: dict[str, Any], templates_by_kind: dict[str, list[dict[str, Any]]]
+    ) -> set[str]:
+        deployable_details = template_to_deployable_details(pod_disruption_budget_template)
+        pod_disruption_budget = deployable_details.get_helm_values(values, PropertyType.PodDisruptionBudget)
+        assert pod_disruption_budget is not None, (
+            f"{template_id(pod_disruption_budget_template)} can't configure a PodDisruptionBudget"
+        )
+        if "minAvailable" in pod_disruption_budget:
+            assert pod_disruption_budget_template["spec"]["minAvailable"] == pod_disruption_budget["minAvailable"]
+            assert "maxUnavailable" not in pod_disruption_budget_template["spec"]
+        else:
+            assert pod_disruption_budget_template["spec"]["maxUnavailable"] == pod_disruption_budget.get(
+                "maxUnavailable", 1
+            ), f"{template_id(pod_disruption_budget_template)} has incorrect maxUnavailable"
+            assert "minAvailable" not in pod_disruption_budget_template["spec"]
+
+        return find_workload_ids_matching_selector(
+            templates_by_kind.get("Deployment", []) + templates_by_kind.get("StatefulSet", []),
+            pod_disruption_budget_template["spec"]["selector"]["matchLabels"],
+        )
+
+    return workload_ids_covered_by_pod_disruption_budget
+
+
+@pytest.mark.parametrize("values_file", values_files_to_test)
+@pytest.mark.asyncio_cooperative
+async def test_pod_disruption_budgets_cover_multi_replica_workloads(values, make_templates):
+    # Alternate between 1 & more than 1 replicas so that we see both with & without PodDisruptionBudgets
+    # and between the ways of configuring the budget
+    counter = 0
+
+    def set_replicas_and_budget(deployable_details: DeployableDetails):
+        nonlocal counter
+        counter += 1
+        deployable_details.set_helm_values(values, PropertyType.Replicas, 1 if counter % 3 == 0 else counter)
+        if counter % 2 == 0:
+            deployable_details.set_helm_values(values, PropertyType.PodDisruptionBudget, {"minAvailable": "50%"})
+        else:
+            deployable_details.set_helm_values(values, PropertyType.PodDisruptionBudget, {"maxUnavailable": counter})
+
+    iterate_deployables_parts(
+        set_replicas_and_budget, lambda deployable_details: deployable_details.has_pod_disruption_budget
+    )
+
+    await assert_covers_expected_workloads(
+        values,
+        make_templates,
+        "PodDisruptionBudget",
+        PropertyType.PodDisruptionBudget,
+        lambda deployable_details: deployable_details.has_pod_disruption_budget,
+        make_workload_ids_covered_by_pod_disruption_budget(values),
+        workload_is_multi_replica,
+    )
+
+
+@pytest.mark.parametrize("values_file", values_files_to_test)
+@pytest.mark.asyncio_cooperative
+async def test_pod_disruption_budgets_cover_autoscaled_workloads(values, make_templates):
+    def enable_autoscaling(deployable_details: DeployableDetails):
+        deployable_details.set_helm_values(values, PropertyType.Replicas, 1)
+        deployable_details.set_helm_values(values, PropertyType.Autoscaling, {"enabled": True})
+
+    iterate_deployables_parts(enable_autoscaling, lambda deployable_details: deployable_details.has_autoscaling)
+
+    await assert_covers_expected_workloads(
+        values,
+        make_templates,
+        "PodDisruptionBudget",
+        PropertyType.PodDisruptionBudget,
+        lambda deployable_details: deployable_details.has_pod_disruption_budget,
+        make_workload_ids_covered_by_pod_disruption_budget(values),
+        workload_is_multi_replica,
+    )
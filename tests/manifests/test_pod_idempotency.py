@@ -24,15 +24,14 @@ def assert_manifest_are_idempotent(id, release_name, first_manifest, second_mani
             # This will always vary even when we have a sidecar process to send a reload signal to HAProxy
             if id == f"ConfigMap/{release_name}-synapse-haproxy" and k_path == ["data", "ess-version.json"]:
                 continue
-            # We can either remove this label as a whole or remove `ess-version.json` for the calculation for this label
-            # when we have a sidecar process to send a reload signal to HAProxy. If we have that sidecar process the
-            # rationale for the hash label disappears.
+            # The HAProxy reloader sidecar picks up the changed `ess-version.json` so this label is only on the
+            # Deployment and not its Pods, which aren't restarted.
             # The HAProxy doesn't neccessarily have the label either if it is only being deployed for the well-knowns
-            if (
-                id == f"Deployment/{release_name}-haproxy"
-                and k_path == ["metadata", "labels", "k8s.element.io/synapse-haproxy-config-hash"]
-                or k_path == ["spec", "template", "metadata", "labels", "k8s.element.io/synapse-haproxy-config-hash"]
-            ):
+            if id == f"Deployment/{release_name}-haproxy" and k_path == [
+                "metadata",
+                "labels",
+                "k8s.element.io/synapse-haproxy-config-hash",
+            ]:
                 continue
             assert v == second_manifest[k], f"Error with {id}: {v} != {second_manifest[k]} at path {'.'.join(k_path)}"
 
@@ -1,8 +1,10 @@
 # Copyright 2025 New Vector Ltd
-# Copyright 2025 Element Creations Ltd
+# Copyright 2025-2026 Element Creations Ltd
 #
 # SPDX-License-Identifier: AGPL-3.0-only
 
+import re
+
 import pytest
 
 from . import secret_values_files_to_test, values_files_to_test
@@ -38,3 +40,46 @@ async def test_no_secret_generated_when_unneeded(release_name, values, make_temp
         # if snyapse.enabled=false, we should not have init-secrets when all
         # secrets are specified
         assert not await _find_init_secrets()
+
+
+def init_secrets_args(release_name, templates) -> list[str] | None:
+    for template in templates:
+        if template["kind"] == "Job" and template["metadata"]["name"] == f"{release_name}-init-secrets":
+            return template["spec"]["template"]["spec"]["containers"][0]["args"]
+    return None
+
+
+def init_secrets_digest(release_name, templates) -> str | None:
+    args = init_secrets_args(release_name, templates)
+    assert args is not None, "init-secrets Job not found"
+    if "-digest" not in args:
+        return None
+    return args[args.index("-digest") + 1]
+
+
+@pytest.mark.parametrize("values_file", ["synapse-minimal-values.yaml"])
+@pytest.mark.asyncio_cooperative
+async def test_init_secrets_digest_tracks_requested_secrets_and_labels(release_name, values, make_templates):
+    # helm template has no cluster to lookup the generated Secret in, so the Job is always rendered
+    # and matrix-tools itself short-circuits if the Secret already has this digest
+    digest = init_secrets_digest(release_name, await make_templates(values))
+    assert digest is not None
+    assert re.fullmatch(r"[0-9a-f]{40}", digest)
+
+    values["synapse"].setdefault("resources", {})["requests"] = {"memory": "1Gi"}
+    assert init_secrets_digest(release_name, await make_templates(values)) == digest, (
+        "Changes unrelated to the requested secrets changed the init-secrets digest"
+    )
+
+    values["synapse"]["macaroon"] = {"value": "not-generated"}
+    macaroon_digest = init_secrets_digest(release_name, await make_templates(values))
+    assert macaroon_digest != digest, "Requesting fewer secrets didn't change the init-secrets digest"
+
+    values.setdefault("initSecrets", {})["labels"] = {"extra": "label"}
+    labels_digest = init_secrets_digest(release_name, await make_templates(values))
+    assert labels_digest not in [digest, macaroon_digest], "Changing labels didn't change the init-secrets digest"
+
+    values["initSecrets"]["force"] = True
+    templates = await make_templates(values)
+    assert init_secrets_args(release_name, templates) is not None, "init-secrets Job isn't rendered when forced"
+    assert init_secrets_digest(release_name, templates) is None, "init-secrets Job is passed a digest when forced"
@@ -0,0 +1,248 @@
+# Copyright 2026 Element Creations Ltd
+#
+# SPDX-License-Identifier: AGPL-3.0-only
+
+import re
+from typing import Any
+
+import pytest
+import yaml
+
+from .utils import config_file, set_sizing_profile, template_id
+
+sizing_profiles = ["small", "medium", "large", "xlarge"]
+
+sizing_values_files = ["example-default-enabled-components-values.yaml", "synapse-worker-example-values.yaml"]
+
+# superuser_reserved_connections plus the exporter & any Jobs running alongside the workloads
+postgres_reserved_connections = 10
+
+memory_units = {"Ki": 1024, "Mi": 1024**2, "Gi": 1024**3, "Ti": 1024**4, "k": 1000, "M": 1000**2, "G": 1000**3}
+
+
+def memory_bytes(quantity: str) -> int:
+    match = re.fullmatch(r"(\d+)([KMGT]i|[kMG])?", str(quantity))
+    assert match, f"Unexpected memory quantity {quantity}"
+    return int(match.group(1)) * memory_units.get(match.group(2), 1)
+
+
+def cpu_millicores(quantity: str) -> int:
+    quantity = str(quantity)
+    if quantity.endswith("m"):
+        return int(quantity.removesuffix("m"))
+    return int(float(quantity) * 1000)
+
+
+def sized_summary(release_name: str, templates: list[dict[str, Any]]) -> dict[str, Any]:
+    summary: dict[str, Any] = {"replicas": {}, "resources": {}}
+    for template in templates:
+        if template["kind"] not in ["Deployment", "StatefulSet"]:
+            continue
+        summary["replicas"][template_id(template)] = template["spec"].get("replicas")
+        for container in template["spec"]["template"]["spec"]["containers"]:
+            summary["resources"][f"{template_id(template)}/{container['name']}"] = container.get("resources")
+            if template["metadata"]["name"] == f"{release_name}-postgres" and container["name"] == "postgres":
+                for arg in container["args"]:
+                    if arg.startswith("max_connections="):
+                        summary["postgres_max_connections"] = int(arg.removeprefix("max_connections="))
+
+    if (synapse_underrides := config_file(templates, "01-homeserver-underrides.yaml")) is not None:
+        synapse_underrides = yaml.safe_load(synapse_underrides)
+        # Synapse's own defaults
+        summary["synapse_cp_max"] = synapse_underrides.get("database", {}).get("args", {}).get("cp_max", 10)
+        summary["synapse_caches_global_factor"] = synapse_underrides.get("caches", {}).get("global_factor", 0.5)
+
+    if (mas_underrides := config_file(templates, "mas-config-underrides.yaml")) is not None:
+        # Matrix Authentication Service's own default
+        mas_underrides = yaml.safe_load(mas_underrides)
+        summary["mas_max_connections"] = mas_underrides.get("database", {}).get("max_connections", 10)
+
+    if (pgbouncer_ini := config_file(templates, "pgbouncer.ini")) is not None:
+        databases_section = pgbouncer_ini.split("[databases]")[1].split("[pgbouncer]")[0]
+        summary["pgbouncer_pool_sizes"] = [int(size) for size in re.findall(r"\bpool_size=(\d+)", databases_section)]
+
+    if (haproxy_config := config_file(templates, "haproxy.cfg")) is not None:
+        global_section = haproxy_config.split("\ndefaults\n")[0]
+        match = re.search(r"^\s+maxconn (\d+)$", global_section, re.MULTILINE)
+        summary["haproxy_maxconn"] = int(match.group(1)) if match else None
+
+    return summary
+
+
+@pytest.mark.parametrize("values_file", sizing_values_files)
+@pytest.mark.parametrize("profile", sizing_profiles + [5000])
+@pytest.mark.parametrize("pgbouncer_enabled", [False, True])
+@pytest.mark.asyncio_cooperative
+async def test_sizing_profile_database_connections_fit_in_postgres(
+    release_name, values, make_templates, profile, pgbouncer_enabled
+):
+    set_sizing_profile(values, profile)
+    values.setdefault("pgbouncer", {})["enabled"] = pgbouncer_enabled
+    templates = await make_templates(values)
+    summary = sized_summary(release_name, templates)
+
+    connections_demand = 0
+    if pgbouncer_enabled:
+        # Synapse & Matrix Authentication Service connect to PgBouncer, so only its pools are opened against Postgres
+        pgbouncer_replicas = summary["replicas"][f"Deployment/{release_name}-pgbouncer"]
+        connections_demand = pgbouncer_replicas * sum(summary["pgbouncer_pool_sizes"])
+    else:
+        for template in templates:
+            if template["kind"] != "StatefulSet" or not template["metadata"]["name"].startswith(
+                f"{release_name}-synapse-"
+            ):
+                continue
+            connections_demand += template["spec"]["replicas"] * summary["synapse_cp_max"]
+        if values["matrixAuthenticationService"]["enabled"]:
+            mas_replicas = summary["replicas"][f"Deployment/{release_name}-matrix-authentication-service"]
+            connections_demand += mas_replicas * summary["mas_max_connections"]
+
+    assert connections_demand > 0
+    assert connections_demand + postgres_reserved_connections <= summary["postgres_max_connections"], (
+        f"sizing.profile={profile} with {pgbouncer_enabled=} needs {connections_demand} database connections "
+        f"but Postgres only allows {summary['postgres_max_connections']}"
+    )
+
+
+@pytest.mark.parametrize("values_file", sizing_values_files)
+@pytest.mark.parametrize("profile", sizing_profiles)
+@pytest.mark.asyncio_cooperative
+async def test_sizing_profile_resources_are_coherent(release_name, values, make_templates, profile):
+    set_sizing_profile(values, profile)
+    templates = await make_templates(values)
+    summary = sized_summary(release_name, templates)
+
+    for container_id, resources in summary["resources"].items():
+        requests = (resources or {}).get("requests", {})
+        limits = (resources or {}).get("limits", {})
+        if "memory" in requests and "memory" in limits:
+            assert memory_bytes(requests["memory"]) <= memory_bytes(limits["memory"]), (
+                f"{container_id} requests more memory than its limit with sizing.profile={profile}"
+            )
+        if "cpu" in requests and "cpu" in limits:
+            assert cpu_millicores(requests["cpu"]) <= cpu_millicores(limits["cpu"]), (
+                f"{container_id} requests more CPU than its limit with sizing.profile={profile}"
+            )
+
+    assert summary["haproxy_maxconn"] is not None, f"HAProxy maxconn isn't set with sizing.profile={profile}"
+
+
+@pytest.mark.parametrize("values_file", ["example-default-enabled-components-values.yaml"])
+@pytest.mark.asyncio_cooperative
+async def test_sizing_profiles_scale_up(release_name, values, make_templates):
+    previous_summary = None
+    for profile in sizing_profiles:
+        set_sizing_profile(values, profile)
+        summary = sized_summary(release_name, await make_templates(values))
+        if previous_summary is not None:
+            for key in ["postgres_max_connections", "synapse_caches_global_factor", "haproxy_maxconn"]:
+                assert summary[key] >= previous_summary[key], f"{key} shrinks when moving up to {profile}"
+            for workload_id, replicas in summary["replicas"].items():
+                assert replicas >= previous_summary["replicas"][workload_id], (
+                    f"{workload_id} has fewer replicas when moving up to {profile}"
+                )
+            for container_id, resources in summary["resources"].items():
+                previous_requests = (previous_summary["resources"][container_id] or {}).get("requests", {})
+                requests = (resources or {}).get("requests", {})
+                if "memory" in requests and "memory" in previous_requests:
+                    assert memory_bytes(requests["memory"]) >= memory_bytes(previous_requests["memory"]), (
+                        f"{container_id} requests less memory when moving up to {profile}"
+                    )
+        previous_summary = summary
+
+
+@pytest.mark.parametrize("values_file", sizing_values_files)
+@pytest.mark.asyncio_cooperative
+async def test_sizing_small_profile_matches_chart_defaults(release_name, values, make_templates):
+    default_summary = sized_summary(release_name, await make_templates(values))
+
+    set_sizing_profile(values, "small")
+    small_summary = sized_summary(release_name, await make_templates(values))
+
+    assert small_summary["replicas"] == default_summary["replicas"]
+    assert small_summary["resources"] == default_summary["resources"]
+    assert small_summary["postgres_max_connections"] == default_summary["postgres_max_connections"]
+
+
+@pytest.mark.parametrize("values_file", ["example-default-enabled-components-values.yaml"])
+@pytest.mark.parametrize(
+    ("users", "profile"),
+    [(1, "small"), (100, "small"), (101, "medium"), (5000, "large"), (50000, "xlarge"), (1000000, "xlarge")],
+)
+@pytest.mark.asyncio_cooperative
+async def test_sizing_user_count_picks_the_covering_profile(release_name, values, make_templates, users, profile):
+    set_sizing_profile(values, profile)
+    profile_summary = sized_summary(release_name, await make_templates(values))
+
+    set_sizing_profile(values, users)
+    assert sized_summary(release_name, await make_templates(values)) == profile_summary
+
+
+@pytest.mark.parametrize("values_file", ["example-default-enabled-components-values.yaml"])
+@pytest.mark.asyncio_cooperative
+async def test_sizing_explicit_values_win(release_name, values, make_templates):
+    set_sizing_profile(values, "large")
+    large_summary = sized_summary(release_name, await make_templates(values))
+
+    synapse_resources = {"requests": {"memory": "3Gi", "cpu": "3"}, "limits": {"memory": "6Gi"}}
+    values["haproxy"] = {"replicas": 5}
+    values["synapse"]["resources"] = synapse_resources
+    summary = sized_summary(release_name, await make_templates(values))
+
+    assert summary["replicas"][f"Deployment/{release_name}-haproxy"] == 5
+    assert summary["resources"][f"StatefulSet/{release_name}-synapse-main/synapse"] == synapse_resources
+    for key in ["postgres_max_connections", "mas_max_connections", "haproxy_maxconn"]:
+        assert summary[key] == large_summary[key]
+    for workload_id in [
+        f"Deployment/{release_name}-element-web",
+        f"Deployment/{release_name}-matrix-authentication-service",
+    ]:
+        assert summary["replicas"][workload_id] == large_summary["replicas"][workload_id] == 2
+
+
+@pytest.mark.parametrize("values_file", ["example-default-enabled-components-values.yaml"])
+@pytest.mark.asyncio_cooperative
+async def test_sizing_explicit_values_win_even_when_matching_the_small_profile(release_name, values, make_templates):
+    set_sizing_profile(values, "large")
+    values["haproxy"] = {"replicas": 1, "resources": {"requests": {"memory": "100Mi", "cpu": "100m"}}}
+    values["pgbouncer"] = {"enabled": True, "poolSize": {"synapse": 40}}
+    templates = await make_templates(values)
+    summary = sized_summary(release_name, templates)
+
+    assert summary["replicas"][f"Deployment/{release_name}-haproxy"] == 1
+    # Explicitly set maps are merged over the profile's values
+    assert summary["resources"][f"Deployment/{release_name}-haproxy/haproxy"] == {
+        "requests": {"memory": "100Mi", "cpu": "100m"},
+        "limits": {"memory": "1Gi"},
+    }
+    pgbouncer_ini = config_file(templates, "pgbouncer.ini")
+    assert pgbouncer_ini is not None
+    assert re.search(r"^synapse = .* pool_size=40 ", pgbouncer_ini, re.MULTILINE)
+    assert re.search(r"^matrixauthenticationservice = .* pool_size=40 ", pgbouncer_ini, re.MULTILINE)
+
+
+@pytest.mark.parametrize("values_file", ["synapse-worker-example-values.yaml"])
+@pytest.mark.asyncio_cooperative
+async def test_sizing_profile_sizes_synapse_workers(release_name, values, make_templates):
+    set_sizing_profile(values, "xlarge")
+    values["synapse"]["workers"]["client-reader"]["replicas"] = 1
+    summary = sized_summary(release_name, await make_templates(values))
+
+    main_resources = summary["resources"][f"StatefulSet/{release_name}-synapse-main/synapse"]
+    synchrotron_resources = summary["resources"][f"StatefulSet/{release_name}-synapse-synchrotron/synapse"]
+    assert memory_bytes(synchrotron_resources["requests"]["memory"]) < memory_bytes(
+        main_resources["requests"]["memory"]
+    )
+    assert summary["resources"][f"StatefulSet/{release_name}-synapse-media-repo/synapse"] == synchrotron_resources
+
+    # Workers that can be autoscaled handle requests and so are scaled out
+    assert summary["replicas"][f"StatefulSet/{release_name}-synapse-synchrotron"] > 1
+    assert summary["replicas"][f"StatefulSet/{release_name}-synapse-client-reader"] == 1
+    assert summary["replicas"][f"StatefulSet/{release_name}-synapse-pusher"] == 2
+    assert summary["replicas"][f"StatefulSet/{release_name}-synapse-media-repo"] == 1
+
+    # Explicitly set global Synapse resources are used by all processes
+    synapse_resources = {"requests": {"memory": "3Gi", "cpu": "3"}, "limits": {"memory": "6Gi"}}
+    values["synapse"]["resources"] = synapse_resources
+    summary = sized_summary(release_name, await make_templates(values))
+    assert summary["resources"][f"StatefulSet/{release_name}-synapse-synchrotron/synapse"] == synapse_resources
@@ -1,14 +1,16 @@
 # Copyright 2024-2025 New Vector Ltd
-# Copyright 2025 Element Creations Ltd
+# Copyright 2025-2026 Element Creations Ltd
 #
 # SPDX-License-Identifier: AGPL-3.0-only
 
+import re
 
 import pytest
 import yaml
 
 from . import DeployableDetails, PropertyType
 from .utils import (
+    helm_template,
     iterate_deployables_ingress_parts,
     iterate_deployables_parts,
     template_id,
@@ -179,3 +181,124 @@ async def test_synapse_resources_shared_by_default(values, make_templates):
                     f"{template_id(template)} has container {container['name']} "
                     "which doesn't have the expected resources"
                 )
+
+
+def synapse_pod_templates_by_name(templates) -> dict[str, dict]:
+    return {
+        template["metadata"]["name"]: template["spec"]["template"]
+        for template in templates
+        if template["kind"] == "StatefulSet" and template_to_deployable_details(template).is_synapse_process
+    }
+
+
+@pytest.mark.parametrize("values_file", ["synapse-worker-example-values.yaml"])
+@pytest.mark.parametrize("worker_type", ["client-reader", "event-creator", "sso-login", "synchrotron"])
+@pytest.mark.asyncio_cooperative
+async def test_synapse_worker_changes_only_change_that_workers_pods(
+    release_name, namespace, worker_type, values, make_templates, helm_client, temp_chart
+):
+    worker_statefulset_name = f"{release_name}-synapse-{worker_type}"
+    initial_pod_templates = synapse_pod_templates_by_name(await make_templates(values))
+    assert worker_statefulset_name in initial_pod_templates
+
+    # No Helm values are specific to a single worker's 05-<worker>.yaml, so change what the chart renders into it
+    process_specific_config = temp_chart / "configs/synapse/synapse-05-process-specific.yaml.tpl"
+    process_specific_config.write_text(
+        process_specific_config.read_text()
+        + f'{{{{- if eq .context.processType "{worker_type}" }}}}\nredaction_retention_period: 1d\n{{{{- end }}}}\n'
+    )
+    changed_templates = await helm_template(await helm_client.get_chart(temp_chart), release_name, namespace, values)
+    for template in changed_templates:
+        if template["kind"] == "ConfigMap" and template["metadata"]["name"] == f"{release_name}-synapse":
+            worker_config = yaml.safe_load(template["data"][f"05-{worker_type}.yaml"])
+            assert worker_config["redaction_retention_period"] == "1d"
+            break
+    else:
+        raise RuntimeError("Could not find the Synapse ConfigMap")
+
+    pod_templates = synapse_pod_templates_by_name(changed_templates)
+    assert pod_templates.keys() == initial_pod_templates.keys()
+    for name, pod_template in pod_templates.items():
+        config_hash = pod_template["metadata"]["labels"]["k8s.element.io/synapse-config-hash"]
+        initial_config_hash = initial_pod_templates[name]["metadata"]["labels"]["k8s.element.io/synapse-config-hash"]
+        if name == worker_statefulset_name:
+            assert config_hash != initial_config_hash, f"{name} wasn't restarted by a change to its own config"
+        else:
+            assert pod_template == initial_pod_templates[name], f"{name} was changed by {worker_type}'s config"
+
+    # Each process only has the hash of the configuration files it loads, so no other process restarts when
+    # this worker and its process-specific configuration is removed
+    values["synapse"]["workers"][worker_type]["enabled"] = False
+    pod_templates = synapse_pod_templates_by_name(await make_templates(values))
+    assert pod_templates.keys() == initial_pod_templates.keys() - {worker_statefulset_name}
+    for name, pod_template in pod_templates.items():
+        assert pod_template == initial_pod_templates[name], f"{name} was changed by disabling {worker_type}"
+
+
+def checked_config_hashes_by_step(release_name, templates) -> dict[str, str | None]:
+    checked_config_hashes: dict[str, str | None] = {}
+    for template in templates:
+        if template["kind"] != "Job" or not template["metadata"]["name"].startswith(
+            f"{release_name}-deployment-markers-"
+        ):
+            continue
+
+        step = template["metadata"]["name"].removeprefix(f"{release_name}-deployment-markers-")
+        args = template["spec"]["template"]["spec"]["containers"][0]["args"]
+        markers = args[args.index("-markers") + 1].split(",")
+        checked_config_hashes[step] = None
+        for marker in markers:
+            name, key, new_value, _ = marker.split(":")
+            if key == "SYNAPSE_CHECKED_CONFIG_HASH":
+                assert name == f"{release_name}-markers"
+                checked_config_hashes[step] = new_value
+    return checked_config_hashes
+
+
+def has_check_config_job(release_name, templates) -> bool:
+    return any(
+        template["kind"] == "Job" and template["metadata"]["name"] == f"{release_name}-synapse-check-config"
+        for template in templates
+    )
+
+
+@pytest.mark.parametrize("values_file", ["synapse-minimal-values.yaml"])
+@pytest.mark.asyncio_cooperative
+async def test_synapse_checked_config_is_recorded_by_deployment_markers(release_name, values, make_templates):
+    values.setdefault("deploymentMarkers", {})["enabled"] = True
+
+    templates = await make_templates(values)
+    # There's no existing marker to compare against when templating
+    assert has_check_config_job(release_name, templates)
+    checked_config_hashes = checked_config_hashes_by_step(release_name, templates)
+    # Only recorded once the upgrade, and so the check, has succeeded
+    assert checked_config_hashes["pre"] is None
+    checked_config_hash = checked_config_hashes["post"]
+    assert checked_config_hash is not None
+    assert re.match(r"^[0-9a-f]{40}$", checked_config_hash)
+
+    values["synapse"].setdefault("checkConfigHook", {})["force"] = True
+    templates = await make_templates(values)
+    assert has_check_config_job(release_name, templates)
+    assert checked_config_hashes_by_step(release_name, templates)["post"] == checked_config_hash, (
+        "Forcing the check-config hook changed what is considered checked"
+    )
+
+    values["synapse"].setdefault("additional", {})["checked"] = {"config": "report_stats: true"}
+    templates = await make_templates(values)
+    assert checked_config_hashes_by_step(release_name, templates)["post"] != checked_config_hash, (
+        "Changing the Synapse config didn't change what needs checking"
+    )
+
+    values["synapse"]["checkConfigHook"]["enabled"] = False
+    templates = await make_templates(values)
+    assert not has_check_config_job(release_name, templates)
+    assert not [
+        template
+        for template in templates
+        if template["kind"] in ["ConfigMap", "Secret"]
+        and template["metadata"]["name"] == f"{release_name}-synapse-hook"
+    ], "The check-config hook's ConfigMap and Secret are rendered without the hook"
+    assert checked_config_hashes_by_step(release_name, templates)["post"] is None, (
+        "Synapse config is recorded as checked when the check-config hook is disabled"
+    )
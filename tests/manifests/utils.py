@@ -118,9 +118,11 @@ def generated_secrets(release_name: str, values: dict[str, Any], helm_generated_
 
         container = init_secrets_job.get("spec", {}).get("template", {}).get("spec", {}).get("containers", [{}])[0]
         args: list[str] = container.get("args") or container["command"][1:]
-        assert len(args) == 5, "Unexpected args in the init-secrets job"
+        assert len(args) in (5, 7), "Unexpected args in the init-secrets job"
         assert args[1] == "-secrets", "Can't find the secrets args for the init-secrets job"
         assert args[3] == "-labels", "Can't find the labels args for the init-secrets job"
+        # -digest is only left out when initSecrets.force is set
+        assert len(args) == 5 or args[5] == "-digest", "Can't find the digest args for the init-secrets job"
 
         requested_secrets = args[2].split(",")
         requested_labels = {label.split("=")[0]: label.split("=")[1] for label in args[4].split(",")}
@@ -276,6 +278,7 @@ async def helm_template(
             "values": values,
             "additional_apis": additional_apis,
             "release_name": release_name,
+            "chart": str(chart.ref),
         }
     )
 
@@ -359,6 +362,22 @@ def template_id(template: dict[str, Any]) -> str:
     return f"{template['kind']}/{template['metadata']['name']}"
 
 
+def config_file(templates: list[dict[str, Any]], filename: str) -> str | None:
+    """The file from the ConfigMap the workloads run with, rather than any hook's own ConfigMap"""
+    for template in templates:
+        if (
+            template["kind"] == "ConfigMap"
+            and filename in template.get("data", {})
+            and "helm.sh/hook" not in template["metadata"].get("annotations", {})
+        ):
+            return template["data"][filename]
+    return None
+
+
+def set_sizing_profile(values: dict[str, Any], profile: str | int):
+    values.setdefault("sizing", {})["profile"] = profile
+
+
 def get_or_empty(d, key):
     res = d.get(key, {})
     if res is not None:
@@ -397,6 +416,7 @@ async def assert_covers_expected_workloads(
     toggling_property_type: PropertyType,
     if_condition: Callable[[DeployableDetails], bool],
     workload_ids_covered_by_template: Callable[[dict[str, Any], dict[str, list[dict[str, Any]]]], set[str]],
+    workload_needs_covering: Callable[[dict[str, Any]], bool] = lambda workload_template: True,
 ):
     def disable_covering_templates(deployable_details: DeployableDetails):
         deployable_details.set_helm_values(values, toggling_property_type, {"enabled": False})
@@ -410,7 +430,11 @@ async def assert_covers_expected_workloads(
             f"{template_id(template)} unexpectedly exists when all {covering_kind} should be turned off"
         )
         deployable_details = template_to_deployable_details(template)
-        if template["kind"] in ["Deployment", "StatefulSet"] and if_condition(deployable_details):
+        if (
+            template["kind"] in ["Deployment", "StatefulSet"]
+            and if_condition(deployable_details)
+            and workload_needs_covering(template)
+        ):
             workload_ids_to_cover.add(template_id(template))
 
     def enable_covering_templates(deployable_details: DeployableDetails):